@@ -4,6 +4,7 @@ from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
 from roguelike import colour
+from roguelike.events import Attack, ItemPickedUp
 from roguelike.exceptions import ImpossibleActionError
 
 if TYPE_CHECKING:
@@ -51,7 +52,7 @@ class MovementAction(ActionWithDirection):
         if not self.engine.game_map.in_bounds(dest_x, dest_y):
             # Out of bounds
             raise ImpossibleActionError("That way is blocked.")
-        if not self.engine.game_map.tiles["walkable"][dest_x, dest_y]:
+        if not self.engine.game_map.is_walkable(dest_x, dest_y):
             # Blocked by a tile
             raise ImpossibleActionError("That way is blocked.")
         if self.engine.game_map.get_blocking_entity_at(dest_x, dest_y):
@@ -67,20 +68,10 @@ class MeleeAction(ActionWithDirection):
         if not target:
             raise ImpossibleActionError("Nothing to attack.")
 
-        damage = self.entity.fighter.power - target.fighter.defense
-
-        if self.entity is self.engine.player:
-            atk_colour = colour.PLAYER_ATK
-        else:
-            atk_colour = colour.ENEMY_ATK
-
-        attack_desc = f"{self.entity.name.capitalize()} attacks {target.name} "
+        damage = max(0, self.entity.fighter.power - target.fighter.defense)
+        self.engine.events.emit(Attack(self.entity, target, damage))
         if damage > 0:
-            attack_desc += f"for {damage} hit points"
             target.fighter.take_damage(damage)
-        else:
-            attack_desc += "but does no damage"
-        self.engine.log(attack_desc, atk_colour)
 
 
 class BumpAction(ActionWithDirection):
@@ -123,14 +114,10 @@ class PickupAction(Action):
 
         for item in self.engine.game_map.items:
             if (actor_x, actor_y) == (item.x, item.y):
-                if len(inventory.items) >= inventory.capacity:
-                    raise ImpossibleActionError("Your inventory is full.")
-
+                inventory.add(item)
                 self.engine.game_map.entities.remove(item)
-                item.parent = inventory
-                inventory.items.append(item)
 
-                self.engine.log(f"You picked up {item.name}.")
+                self.engine.events.emit(ItemPickedUp(self.entity, item))
                 return
 
         raise ImpossibleActionError("There is nothing here to pick up.")
@@ -145,9 +132,13 @@ class DropItem(ItemAction):
 
 class TakeStairsAction(Action):
     def perform(self) -> None:
-        if (self.entity.x, self.entity.y) == self.entity.game_map.downstairs_location:
-            self.engine.game_world.generate_floor()
+        location = self.entity.x, self.entity.y
+        if location == self.entity.game_map.downstairs_location:
+            self.engine.game_world.descend()
             self.engine.log("You descend the staircase.", colour.DESCEND)
+        elif location == self.entity.game_map.upstairs_location:
+            self.engine.game_world.ascend()
+            self.engine.log("You ascend the staircase.", colour.DESCEND)
         else:
             raise ImpossibleActionError("There are not stairs here.")
 
@@ -0,0 +1,197 @@
+"""Micro-benchmarks for performance sensitive parts of the game.
+
+Run with `python -m roguelike.benchmarks`.
+"""
+from __future__ import annotations
+
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable
+
+FIRST_FRAME_SCRIPT = """
+import time
+start = time.perf_counter()
+import tcod
+from roguelike import setup_game
+console = tcod.Console(80, 50, order="F")
+setup_game.MainMenu().on_render(console)
+print(time.perf_counter() - start)
+"""
+
+
+def time_subprocess(script: str, repeat: int) -> list[float]:
+    """Run `script` in fresh interpreters and collect the time each one prints."""
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", script], check=True, capture_output=True, text=True
+        ).stdout
+        timings.append(float(output))
+    return timings
+
+
+def time_call(func: Callable[[], object], repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    print(
+        f"{name:<30} min {min(timings) * 1000:8.2f} ms"
+        f"  median {statistics.median(timings) * 1000:8.2f} ms"
+    )
+
+
+def bench_first_frame(repeat: int = 10) -> None:
+    """Cold start: a fresh interpreter, from imports up to the first menu frame."""
+    report("cold start to first frame", time_subprocess(FIRST_FRAME_SCRIPT, repeat))
+
+
+def bench_menu_render(repeat: int = 200) -> None:
+    import tcod
+
+    from roguelike import setup_game
+
+    console = tcod.Console(80, 50, order="F")
+    menu = setup_game.MainMenu()
+    report("main menu frame", time_call(lambda: menu.on_render(console), repeat))
+
+
+def bench_overlay_render(repeat: int = 200) -> None:
+    import tcod
+
+    from roguelike import input_handlers, setup_game
+
+    console = tcod.Console(80, 50, order="F")
+    engine = setup_game.new_game(floors_directory=None)
+    for handler in [
+        input_handlers.InventoryActivateHandler(engine),
+        input_handlers.LevelUpEventHandler(engine),
+        input_handlers.HistoryViewer(engine),
+    ]:
+        report(
+            f"{type(handler).__name__} frame",
+            time_call(lambda: handler.on_render(console), repeat),
+        )
+
+
+def bench_game_frame(repeat: int = 200) -> None:
+    """Time to draw a game frame, without presenting it in a window."""
+    import tcod
+
+    from roguelike import input_handlers, setup_game
+    from roguelike.renderer import FrameBuffer
+
+    console = tcod.Console(80, 50, order="F")
+    handler = input_handlers.MainGameEventHandler(
+        setup_game.new_game(floors_directory=None)
+    )
+    frame_buffer = FrameBuffer()
+
+    def frame() -> None:
+        console.clear()
+        handler.on_render(console)
+        frame_buffer.present(console)
+
+    report("game frame (headless)", time_call(frame, repeat))
+
+
+def bench_chunked_world(turns: int = 500) -> None:
+    """Walk across a 10k x 10k chunked floor, teleporting to force chunk streaming."""
+    import random
+    import tempfile
+    from pathlib import Path
+
+    import tcod
+
+    from roguelike import input_handlers, procgen, setup_game
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = setup_game.new_game(floors_directory=Path(directory))
+        world = engine.game_world
+        world.generators[world.current_floor + 1] = procgen.ChunkedGenerator()
+        world.descend()
+        console = tcod.Console(80, 50, order="F")
+        handler = input_handlers.MainGameEventHandler(engine)
+        player = engine.player
+
+        def turn() -> None:
+            player.place(player.x + random.randint(-40, 40), player.y)
+            engine.handle_enemy_turns()
+            engine.update_fov()
+            handler.on_render(console)
+
+        report("10k x 10k chunked map turn", time_call(turn, turns))
+
+
+def bench_generators(repeat: int = 3, size: int = 1000) -> None:
+    """Time to generate, populate and connect a floor, per million cells."""
+    from roguelike import procgen, setup_game
+
+    engine = setup_game.new_game(floors_directory=None, headless=True)
+    engine.game_world.current_floor = 5
+    megacells = size * size / 1_000_000
+    for generator in [
+        procgen.RoomsGenerator(max_rooms=30, room_min_size=6, room_max_size=10),
+        procgen.BSPGenerator(),
+        procgen.CaveGenerator(),
+        procgen.DrunkardsWalkGenerator(),
+    ]:
+        timings = time_call(
+            lambda: procgen.build_floor(generator, engine, size, size), repeat
+        )
+        report(
+            f"{type(generator).__name__} /Mcell",
+            [timing / megacells for timing in timings],
+        )
+
+
+def bench_continue_game(repeat: int = 10, floors: int = 10) -> None:
+    """Time to load a long game from its save, until it can be drawn or in full."""
+    import tempfile
+    from pathlib import Path
+
+    from roguelike import setup_game
+
+    engine = setup_game.new_game(floors_directory=None)
+    for _ in range(floors - 1):
+        engine.game_world.descend()
+    for i in range(50_000):
+        engine.log(f"Message {i}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = str(Path(directory) / "savegame.sav")
+        engine.save_as(filename)
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            loaded = setup_game.load_game(filename, lazy=True)
+            timings.append(time.perf_counter() - start)
+            # So that the next load isn't slowed down by this one's background work.
+            loaded.finish_loading()
+        report("continue game (first frame)", timings)
+        report(
+            "continue game (whole save)",
+            time_call(lambda: setup_game.load_game(filename), repeat),
+        )
+
+
+def main() -> None:
+    bench_first_frame()
+    bench_menu_render()
+    bench_overlay_render()
+    bench_game_frame()
+    bench_continue_game()
+    bench_chunked_world()
+    bench_generators()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from roguelike.game_map import GameMap
+
+
+class Camera:
+    """The part of the map shown on screen, as a `width` x `height` viewport.
+
+    The viewport is drawn at the top-left corner of the console, and (`x`, `y`) is
+    the map position shown there.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.x = 0
+        self.y = 0
+
+    def follow(self, x: int, y: int, game_map: GameMap) -> None:
+        """Centre the view on (x, y), without showing space beyond the map edges."""
+        self.x = max(0, min(x - self.width // 2, game_map.width - self.width))
+        self.y = max(0, min(y - self.height // 2, game_map.height - self.height))
+
+    @property
+    def bounds(self) -> tuple[int, int, int, int]:
+        """The map region in view, as (x0, y0, x1, y1)."""
+        return self.x, self.y, self.x + self.width, self.y + self.height
+
+    def in_view(self, x: int, y: int) -> bool:
+        """Whether map position (x, y) is in the viewport."""
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+
+    def to_screen(self, x: int, y: int) -> tuple[int, int]:
+        return x - self.x, y - self.y
+
+    def to_map(self, x: int, y: int) -> tuple[int, int]:
+        return x + self.x, y + self.y
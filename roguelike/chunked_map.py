@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+import numpy as np
+from tcod.map import compute_fov
+
+from roguelike import tile_types
+from roguelike.distance_maps import DistanceMaps
+from roguelike.floor_store import dumps_detached, loads_detached
+from roguelike.game_map import EntitySet, GameMap
+from roguelike.types import ndarray
+
+if TYPE_CHECKING:
+    from roguelike.engine import Engine
+    from roguelike.entity import Entity
+    from roguelike.procgen import ChunkGenerator
+
+CHUNK_SIZE = 32
+
+ChunkKey = tuple[int, int]
+
+
+class Chunk:
+    def __init__(self, tiles: ndarray):
+        self.tiles = tiles
+        self.explored = np.full(tiles.shape, fill_value=False, order="F")
+
+    def set_tiles(self, index: Any, tile: int) -> None:
+        self.tiles[index] = tile
+
+
+class ChunkedGameMap(GameMap):
+    """A map whose tiles are split into fixed-size chunks, generated on demand.
+
+    Only the chunks within `keep_radius` chunks of the player are loaded. Chunks
+    further away are compressed, along with the entities standing on them, and
+    written to `directory`, or kept in memory if no directory is given. They are
+    restored when the player comes back. Tiles in chunks that are not loaded read as
+    unexplored walls.
+
+    Like `FloorStore`, the directory is only scratch space: a pickled map carries
+    its evicted chunks with it, and writes them back out once unpickled.
+
+    Visibility is only tracked in the window around the player where FOV was last
+    computed, and distance maps only cover the loaded chunks.
+    """
+
+    # GameMap.__init__ is not called: it would allocate arrays for the whole map.
+    def __init__(
+        self,
+        engine: Engine,
+        width: int,
+        height: int,
+        generator: ChunkGenerator,
+        entities: Iterable[Entity] = (),
+        keep_radius: int = 2,
+        directory: Path | None = None,
+    ) -> None:
+        self.engine = engine
+        self.width, self.height = width, height
+        self.entities = EntitySet(entities)
+        self.downstairs_location = (0, 0)
+        self.upstairs_location: tuple[int, int] | None = None
+        self.tiles_version = 0
+        self.explored_version = 0
+        self.distance_maps = DistanceMaps(self)
+
+        self.generator = generator
+        self.keep_radius = keep_radius
+        self.chunks: dict[ChunkKey, Chunk] = {}
+        self.directory = directory
+        self.evicted: dict[ChunkKey, bytes] = {}
+        self.evicted_on_disk: set[ChunkKey] = set()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.fov_origin = (0, 0)
+        self.fov_visible = np.full((0, 0), fill_value=False, order="F")
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {**vars(self), "evicted": self.all_evicted(), "evicted_on_disk": set()}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        super().__setstate__(state)
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            evicted, self.evicted = self.evicted, {}
+            for key, data in evicted.items():
+                self._write_chunk(key, data)
+
+    def all_evicted(self) -> dict[ChunkKey, bytes]:
+        """Every evicted chunk, compressed, whether in memory or on disk."""
+        return {
+            **self.evicted,
+            **{key: self._chunk_path(key).read_bytes() for key in self.evicted_on_disk},
+        }
+
+    def _overlaps(
+        self, x0: int, y0: int, x1: int, y1: int
+    ) -> Iterator[tuple[Chunk, tuple[slice, slice], tuple[slice, slice]]]:
+        """Loaded chunks overlapping a region, with the overlap in both frames."""
+        for cx in range(x0 // CHUNK_SIZE, (x1 - 1) // CHUNK_SIZE + 1):
+            for cy in range(y0 // CHUNK_SIZE, (y1 - 1) // CHUNK_SIZE + 1):
+                chunk = self.chunks.get((cx, cy))
+                if chunk is None:
+                    continue
+                ox, oy = cx * CHUNK_SIZE, cy * CHUNK_SIZE
+                ax0, ay0 = max(x0, ox), max(y0, oy)
+                ax1, ay1 = min(x1, ox + CHUNK_SIZE), min(y1, oy + CHUNK_SIZE)
+                yield (
+                    chunk,
+                    (slice(ax0 - ox, ax1 - ox), slice(ay0 - oy, ay1 - oy)),
+                    (slice(ax0 - x0, ax1 - x0), slice(ay0 - y0, ay1 - y0)),
+                )
+
+    def _chunk_at(self, x: int, y: int) -> Chunk | None:
+        return self.chunks.get((x // CHUNK_SIZE, y // CHUNK_SIZE))
+
+    def is_walkable(self, x: int, y: int) -> bool:
+        chunk = self._chunk_at(x, y)
+        if chunk is None:
+            return False
+        tile = chunk.tiles[x % CHUNK_SIZE, y % CHUNK_SIZE]
+        return bool(tile_types.TILES["walkable"][tile])
+
+    def is_visible(self, x: int, y: int) -> bool:
+        vx, vy = x - self.fov_origin[0], y - self.fov_origin[1]
+        width, height = self.fov_visible.shape
+        return 0 <= vx < width and 0 <= vy < height and bool(self.fov_visible[vx, vy])
+
+    def is_explored(self, x: int, y: int) -> bool:
+        chunk = self._chunk_at(x, y)
+        return chunk is not None and bool(
+            chunk.explored[x % CHUNK_SIZE, y % CHUNK_SIZE]
+        )
+
+    def _coordinates(self, index: Any) -> tuple[ndarray, ndarray]:
+        """The map positions selected by `index`, as flat arrays of x and y."""
+        if isinstance(index, np.ndarray) and index.dtype == bool:
+            xs, ys = np.nonzero(index)
+        elif isinstance(index, tuple) and all(isinstance(i, slice) for i in index):
+            xs, ys = np.meshgrid(
+                np.arange(*index[0].indices(self.width)),
+                np.arange(*index[1].indices(self.height)),
+                indexing="ij",
+            )
+        else:
+            xs, ys = np.broadcast_arrays(*index)
+        return np.ravel(xs), np.ravel(ys)
+
+    def set_tiles(self, index: Any, tile: int) -> None:
+        """Set the tiles at `index`, which indexes the whole map like a NumPy array.
+
+        The tiles are set in every chunk they cover, which must all be loaded.
+        """
+        xs, ys = self._coordinates(index)
+        cxs, cys = xs // CHUNK_SIZE, ys // CHUNK_SIZE
+        chunk_keys, chunk_of_tile = np.unique(
+            cxs * (self.height // CHUNK_SIZE + 1) + cys, return_inverse=True
+        )
+        # Every chunk is checked first, so that no tiles are set if any is missing.
+        chunks = []
+        for i in range(len(chunk_keys)):
+            in_chunk = chunk_of_tile == i
+            chunk = self._chunk_at(int(xs[in_chunk][0]), int(ys[in_chunk][0]))
+            assert chunk is not None, "Tiles can only be set on loaded chunks."
+            chunks.append((chunk, in_chunk))
+
+        for chunk, in_chunk in chunks:
+            chunk.set_tiles(
+                (xs[in_chunk] % CHUNK_SIZE, ys[in_chunk] % CHUNK_SIZE), tile
+            )
+        self.tiles_version += 1
+
+    def set_tile(self, x: int, y: int, tile: int) -> None:
+        chunk = self._chunk_at(x, y)
+        assert chunk is not None, "Tiles can only be set on loaded chunks."
+        chunk.set_tiles((x % CHUNK_SIZE, y % CHUNK_SIZE), tile)
+        self.tiles_version += 1
+
+    def get_tiles(self, x0: int, y0: int, x1: int, y1: int) -> ndarray:
+        tiles = np.full(
+            (x1 - x0, y1 - y0), fill_value=tile_types.wall, dtype=np.uint8, order="F"
+        )
+        for chunk, chunk_slice, region_slice in self._overlaps(x0, y0, x1, y1):
+            tiles[region_slice] = chunk.tiles[chunk_slice]
+        return tiles
+
+    # Chunks are small and short-lived, so their derived arrays are not cached.
+    def get_walkable(self, x0: int, y0: int, x1: int, y1: int) -> ndarray:
+        walkable: ndarray = tile_types.TILES["walkable"][self.get_tiles(x0, y0, x1, y1)]
+        return walkable
+
+    def get_transparent(self, x0: int, y0: int, x1: int, y1: int) -> ndarray:
+        transparent: ndarray = tile_types.TILES["transparent"][
+            self.get_tiles(x0, y0, x1, y1)
+        ]
+        return transparent
+
+    def get_explored(self, x0: int, y0: int, x1: int, y1: int) -> ndarray:
+        explored = np.full((x1 - x0, y1 - y0), fill_value=False, order="F")
+        for chunk, chunk_slice, region_slice in self._overlaps(x0, y0, x1, y1):
+            explored[region_slice] = chunk.explored[chunk_slice]
+        return explored
+
+    def get_visible(self, x0: int, y0: int, x1: int, y1: int) -> ndarray:
+        visible = np.full((x1 - x0, y1 - y0), fill_value=False, order="F")
+        fx0, fy0 = self.fov_origin
+        fx1, fy1 = fx0 + self.fov_visible.shape[0], fy0 + self.fov_visible.shape[1]
+        ax0, ay0, ax1, ay1 = max(x0, fx0), max(y0, fy0), min(x1, fx1), min(y1, fy1)
+        if ax0 < ax1 and ay0 < ay1:
+            region = slice(ax0 - x0, ax1 - x0), slice(ay0 - y0, ay1 - y0)
+            window = slice(ax0 - fx0, ax1 - fx0), slice(ay0 - fy0, ay1 - fy0)
+            visible[region] = self.fov_visible[window]
+        return visible
+
+    def pathing_bounds(
+        self, x0: int, y0: int, x1: int, y1: int
+    ) -> tuple[int, int, int, int]:
+        return self.clip(
+            min(x0, x1) - CHUNK_SIZE,
+            min(y0, y1) - CHUNK_SIZE,
+            max(x0, x1) + CHUNK_SIZE + 1,
+            max(y0, y1) + CHUNK_SIZE + 1,
+        )
+
+    def distance_bounds(self) -> tuple[int, int, int, int]:
+        if not self.chunks:
+            return 0, 0, 0, 0
+        cxs = [cx for cx, _ in self.chunks]
+        cys = [cy for _, cy in self.chunks]
+        return self.clip(
+            min(cxs) * CHUNK_SIZE,
+            min(cys) * CHUNK_SIZE,
+            (max(cxs) + 1) * CHUNK_SIZE,
+            (max(cys) + 1) * CHUNK_SIZE,
+        )
+
+    def update_fov(self, x: int, y: int, radius: int) -> None:
+        self.stream_around(x, y)
+
+        x0, y0, x1, y1 = self.clip(
+            x - radius, y - radius, x + radius + 1, y + radius + 1
+        )
+        self.fov_origin = x0, y0
+        self.fov_visible = compute_fov(
+            self.get_transparent(x0, y0, x1, y1),
+            (x - x0, y - y0),
+            radius=radius,
+        )
+        for chunk, chunk_slice, region_slice in self._overlaps(x0, y0, x1, y1):
+            seen = self.fov_visible[region_slice]
+            if (seen & ~chunk.explored[chunk_slice]).any():
+                chunk.explored[chunk_slice] |= seen
+                self.explored_version += 1
+
+    def stream_around(self, x: int, y: int) -> None:
+        """Load the chunks near (x, y) and evict the ones that are far from it.
+
+        Chunks are evicted one chunk further out than they are loaded, so walking
+        back and forth over a chunk border does not thrash.
+        """
+        pcx, pcy = x // CHUNK_SIZE, y // CHUNK_SIZE
+        max_cx = (self.width - 1) // CHUNK_SIZE
+        max_cy = (self.height - 1) // CHUNK_SIZE
+
+        radius = self.keep_radius
+        for cx in range(max(0, pcx - radius), min(max_cx, pcx + radius) + 1):
+            for cy in range(max(0, pcy - radius), min(max_cy, pcy + radius) + 1):
+                self.load_chunk(cx, cy)
+
+        for cx, cy in list(self.chunks):
+            if max(abs(cx - pcx), abs(cy - pcy)) > self.keep_radius + 1:
+                self.evict_chunk(cx, cy)
+
+    def load_chunk(self, cx: int, cy: int) -> Chunk:
+        key = cx, cy
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            return chunk
+
+        data = self._read_chunk(key)
+        if data is not None:
+            chunk, entities = loads_detached(zlib.decompress(data), self)
+            self.entities.update(entities)
+        else:
+            chunk = Chunk(self.generator.generate(self, cx, cy))
+
+        self.chunks[key] = chunk
+        self.tiles_version += 1
+        return chunk
+
+    def evict_chunk(self, cx: int, cy: int) -> None:
+        chunk = self.chunks.pop((cx, cy))
+        self.tiles_version += 1
+        entities = [
+            e
+            for e in self.entities
+            if (e.x // CHUNK_SIZE, e.y // CHUNK_SIZE) == (cx, cy)
+            and e is not self.engine.player
+        ]
+        self.entities.difference_update(entities)
+        data = zlib.compress(dumps_detached((chunk, entities), self))
+        self._write_chunk((cx, cy), data)
+
+    def _chunk_path(self, key: ChunkKey) -> Path:
+        assert self.directory is not None
+        return self.directory / f"chunk-{key[0]}-{key[1]}.bin"
+
+    def _write_chunk(self, key: ChunkKey, data: bytes) -> None:
+        if self.directory is None:
+            self.evicted[key] = data
+        else:
+            self._chunk_path(key).write_bytes(data)
+            self.evicted_on_disk.add(key)
+
+    def _read_chunk(self, key: ChunkKey) -> bytes | None:
+        """The data of an evicted chunk, which is no longer evicted, or None if it
+        was never evicted.
+        """
+        if key in self.evicted:
+            return self.evicted.pop(key)
+        if key in self.evicted_on_disk:
+            self.evicted_on_disk.discard(key)
+            return self._chunk_path(key).read_bytes()
+        return None
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-import random
 from abc import ABC
-from typing import TYPE_CHECKING, cast
+from collections import deque
+from typing import TYPE_CHECKING, Iterable, cast
 
 import numpy as np
 import tcod.path
@@ -14,10 +14,56 @@ from roguelike.actions import (
     MovementAction,
     WaitAction,
 )
+from roguelike.distance_maps import DistanceMap
+from roguelike.events import ConfusionEnded
 from roguelike.types import ndarray
 
 if TYPE_CHECKING:
+    from roguelike.engine import Engine
     from roguelike.entity import Actor
+    from roguelike.game_map import GameMap
+
+
+def path_cost(game_map: GameMap, bounds: tuple[int, int, int, int]) -> ndarray:
+    """Cost of moving onto each tile of a region, for `find_path`.
+
+    Tiles with something blocking them cost more, so paths go around them if it's
+    not too long a detour.
+    """
+    x0, y0, x1, y1 = bounds
+    cost: ndarray = np.array(game_map.get_walkable(x0, y0, x1, y1), dtype=np.int8)
+
+    for entity in game_map.entities:
+        x, y = entity.x - x0, entity.y - y0
+        if (
+            entity.blocks_movement
+            and 0 <= x < cost.shape[0]
+            and 0 <= y < cost.shape[1]
+            and cost[x, y]
+        ):
+            cost[x, y] += 10
+    return cost
+
+
+def find_path(
+    cost: ndarray,
+    origin: tuple[int, int],
+    start: tuple[int, int],
+    goal: tuple[int, int],
+) -> list[tuple[int, int]]:
+    """Path from `start`, excluded, to `goal`, over `cost`, whose first tile is at
+    `origin`. Only reads its arguments, so it can run on any thread.
+    """
+    x0, y0 = origin
+    graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
+    pathfinder = tcod.path.Pathfinder(graph)
+
+    pathfinder.add_root((start[0] - x0, start[1] - y0))
+    path = cast(
+        list[list[int]], pathfinder.path_to((goal[0] - x0, goal[1] - y0))[1:].tolist()
+    )
+
+    return [(x + x0, y + y0) for x, y in path]
 
 
 class BaseAI(Action, ABC):
@@ -27,25 +73,48 @@ class BaseAI(Action, ABC):
         ...
 
     def get_path_to(self, dest_x: int, dest_y: int) -> list[tuple[int, int]]:
-        cost: ndarray = np.array(self.entity.game_map.tiles["walkable"], dtype=np.int8)
-
-        for entity in self.entity.game_map.entities:
-            if entity.blocks_movement and cost[entity.x, entity.y]:
-                cost[entity.x, entity.y] += 10
+        game_map = self.entity.game_map
+        start = self.entity.x, self.entity.y
+        bounds = game_map.pathing_bounds(*start, dest_x, dest_y)
+        return find_path(
+            path_cost(game_map, bounds), bounds[:2], start, (dest_x, dest_y)
+        )
 
-        graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
-        pathfinder = tcod.path.Pathfinder(graph)
 
-        pathfinder.add_root((self.entity.x, self.entity.y))
-        path = cast(list[list[int]], pathfinder.path_to((dest_x, dest_y))[1:].tolist())
+class HostileEnemy(BaseAI):
+    """Chases the player while it can see them, and attacks when adjacent.
 
-        return [(x, y) for x, y in path]
+    The path to the player is kept between turns. When the player takes a step, the
+    path is extended to their new position, or trimmed if they stepped back onto
+    it. It's only planned again when its next step can't be taken, or when it has
+    become more than `replan_slack` steps longer than the distance to the player.
+    """
 
+    flee_below = 0.0
+    """Fraction of its max HP under which it runs from the player, if it can."""
+    replan_slack = 4
 
-class HostileEnemy(BaseAI):
     def __init__(self, entity: Actor):
         super().__init__(entity)
-        self.path: list[tuple[int, int]] = []
+        self.path: deque[tuple[int, int]] = deque()
+        self.planned = False
+        """Whether this turn's path was already planned, by `plan_turn`."""
+
+    @property
+    def is_chasing(self) -> bool:
+        """Whether it will move towards the player this turn."""
+        entity = self.entity
+        target = self.engine.player
+        return (
+            self.engine.game_map.is_visible(entity.x, entity.y)
+            and not self.is_afraid
+            and max(abs(target.x - entity.x), abs(target.y - entity.y)) > 1
+        )
+
+    @property
+    def is_afraid(self) -> bool:
+        fighter = self.entity.fighter
+        return fighter.hp < fighter.max_hp * self.flee_below
 
     def perform(self) -> None:
         target = self.engine.player
@@ -53,19 +122,130 @@ class HostileEnemy(BaseAI):
         dy = target.y - self.entity.y
         dist = max(abs(dx), abs(dy))
 
-        if self.engine.game_map.visible[self.entity.x, self.entity.y]:
+        if self.engine.game_map.is_visible(self.entity.x, self.entity.y):
+            if self.is_afraid:
+                step = self.engine.game_map.distance_maps.step_towards(
+                    "flee", self.entity.x, self.entity.y
+                )
+                if step is not None:
+                    self.path.clear()
+                    return MovementAction(self.entity, *step).perform()
             if dist <= 1:
                 return MeleeAction(self.entity, dx, dy).perform()
-            self.path = self.get_path_to(target.x, target.y)
+            if not self.planned:
+                self.update_path(target.x, target.y, dist)
+        self.planned = False
 
-        if self.path:
-            dest_x, dest_y = self.path.pop(0)
+        if self.can_follow_path():
+            dest_x, dest_y = self.path.popleft()
             return MovementAction(
                 self.entity, dest_x - self.entity.x, dest_y - self.entity.y
             ).perform()
 
         return WaitAction(self.entity).perform()
 
+    def can_follow_path(self) -> bool:
+        """Whether the next step of the path can be taken, e.g. it's not blocked.
+
+        Confusion can move the entity off its path, in which case it can't either.
+        """
+        if not self.path:
+            return False
+        x, y = self.path[0]
+        if max(abs(x - self.entity.x), abs(y - self.entity.y)) != 1:
+            return False
+        return self.engine.game_map.get_blocking_entity_at(x, y) is None
+
+    def update_path(self, target_x: int, target_y: int, distance: int) -> None:
+        """Make the path lead to the target, at (target_x, target_y)."""
+        if self.follow_target(target_x, target_y, distance):
+            self.path = deque(self.get_path_to(target_x, target_y))
+
+    def follow_target(self, target_x: int, target_y: int, distance: int) -> bool:
+        """Adjust the path to where the target moved, and return whether it must be
+        planned again.
+        """
+        path = self.path
+        target = target_x, target_y
+        if path and path[-1] != target:
+            end_x, end_y = path[-1]
+            if target in path:
+                while path[-1] != target:
+                    path.pop()
+            elif max(abs(target_x - end_x), abs(target_y - end_y)) <= 1:
+                path.append(target)
+            else:
+                path.clear()
+
+        return not self.can_follow_path() or len(path) > distance + self.replan_slack
+
+
+class Pack:
+    """Enemies chasing the player together, planned as a group.
+
+    Instead of each member searching for its own path, the whole pack follows one
+    distance field to the player, computed over the area around them. Members are
+    planned in the order they act, and each reserves the tile it steps into, and
+    frees the one it leaves, so that they don't get in each other's way.
+    """
+
+    margin = 8
+    """How far beyond the pack and the player the distance field extends."""
+    min_size = 2
+    """Enemies chasing alone plan their own path, as it's cheaper."""
+
+    def __init__(self, engine: Engine, members: list[Actor]):
+        self.engine = engine
+        self.members = members
+
+    @classmethod
+    def gather(cls, engine: Engine, actors: Iterable[Actor]) -> Pack | None:
+        """The pack of enemies that will chase the player this turn, if any."""
+        members = [
+            actor
+            for actor in actors
+            if isinstance(actor.ai, HostileEnemy) and actor.ai.is_chasing
+        ]
+        if len(members) < cls.min_size:
+            return None
+        return cls(engine, members)
+
+    def bounds(self) -> tuple[int, int, int, int]:
+        target = self.engine.player
+        xs = [target.x, *(member.x for member in self.members)]
+        ys = [target.y, *(member.y for member in self.members)]
+        return self.engine.game_map.clip(
+            min(xs) - self.margin,
+            min(ys) - self.margin,
+            max(xs) + self.margin + 1,
+            max(ys) + self.margin + 1,
+        )
+
+    def plan(self, field: DistanceMap) -> None:
+        """Give every member its path for this turn, from the distance field to the
+        player over `bounds`.
+        """
+        game_map = self.engine.game_map
+        occupied = {(e.x, e.y) for e in game_map.entities if e.blocks_movement}
+        for member in self.members:
+            ai = cast(HostileEnemy, member.ai)
+            ai.planned = True
+            step = field.step_from(member.x, member.y, lambda x, y: (x, y) in occupied)
+            if step is None:
+                ai.path.clear()
+                continue
+
+            x, y = member.x + step[0], member.y + step[1]
+            occupied.discard((member.x, member.y))
+            occupied.add((x, y))
+            ai.path = deque([(x, y), *field.path_from(x, y)])
+
+
+class CowardlyEnemy(HostileEnemy):
+    """Runs away when badly hurt, and fights back when cornered."""
+
+    flee_below = 0.3
+
 
 class ConfusedEnemy(BaseAI):
     def __init__(self, entity: Actor, previous_ai: BaseAI | None, turns_remaining: int):
@@ -75,11 +255,11 @@ class ConfusedEnemy(BaseAI):
 
     def perform(self) -> None:
         if self.turns_remainig <= 0:
-            self.engine.log(f"The {self.entity.name} is no longer confused.")
+            self.engine.events.emit(ConfusionEnded(self.entity))
             self.entity.ai = self.previous_ai
             return
 
-        dir_x, dir_y = random.choice(
+        dir_x, dir_y = self.engine.rng.choice(
             [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
         )
         self.turns_remainig -= 1
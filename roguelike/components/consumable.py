@@ -3,10 +3,12 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
-from roguelike import actions, colour
+from roguelike import actions, colour, targeting
+from roguelike.colour import RGB
 from roguelike.components import ai
 from roguelike.components.base_component import BaseComponent
 from roguelike.components.inventory import Inventory
+from roguelike.events import ItemUsed
 from roguelike.exceptions import ImpossibleActionError
 from roguelike.input_handlers import (
     ActionOrHandler,
@@ -28,11 +30,15 @@ class Consumable(BaseComponent, ABC):
     def activate(self, action: actions.ItemAction) -> None:
         ...
 
+    @abstractmethod
+    def describe(self, event: ItemUsed) -> list[tuple[str, RGB]]:
+        """Messages for the log about this item being used."""
+
     def consume(self) -> None:
         entity = self.parent
         inventory = entity.parent
         if isinstance(inventory, Inventory):
-            inventory.items.remove(entity)
+            inventory.remove(entity)
 
 
 class HealingConsumable(Consumable):
@@ -44,14 +50,21 @@ class HealingConsumable(Consumable):
         recovered = consumer.fighter.heal(self.amount)
 
         if recovered > 0:
-            self.engine.log(
-                f"You consume the {self.parent.name}, and recover" f" {recovered} HP!",
-                colour.HEALTH_RECOVERED,
+            self.engine.events.emit(
+                ItemUsed(consumer, self.parent, (consumer,), recovered)
             )
             self.consume()
         else:
             raise ImpossibleActionError("Your health is already full.")
 
+    def describe(self, event: ItemUsed) -> list[tuple[str, RGB]]:
+        return [
+            (
+                f"You consume the {event.item.name}, and recover {event.amount} HP!",
+                colour.HEALTH_RECOVERED,
+            )
+        ]
+
 
 class LightningDamageConsumable(Consumable):
     def __init__(self, damage: int, max_range: int):
@@ -60,25 +73,28 @@ class LightningDamageConsumable(Consumable):
 
     def activate(self, action: actions.ItemAction) -> None:
         consumer = action.entity
-        target: Actor | None = None
-        closest_distance = self.max_range + 1.0
-
-        for actor in self.engine.game_map.actors:
-            if actor is not consumer and self.parent.game_map.visible[actor.x, actor.y]:
-                distance = consumer.distance(actor.x, actor.y)
-                if distance < closest_distance:
-                    target = actor
-                    closest_distance = distance
+        target = targeting.nearest_visible_actor(
+            self.engine.game_map, consumer.x, consumer.y, self.max_range, consumer
+        )
 
         if target:
-            self.engine.log(
-                f"A lightning bolt strikes {target.name} for {self.damage} damage"
+            self.engine.events.emit(
+                ItemUsed(consumer, self.parent, (target,), self.damage)
             )
             target.fighter.take_damage(self.damage)
             self.consume()
         else:
             raise ImpossibleActionError("No enemy close enough to strike")
 
+    def describe(self, event: ItemUsed) -> list[tuple[str, RGB]]:
+        return [
+            (
+                f"A lightning bolt strikes {target.name} for {event.amount} damage",
+                colour.WHITE,
+            )
+            for target in event.targets
+        ]
+
 
 class ConfusionConsumable(Consumable):
     def __init__(self, number_of_turns: int):
@@ -95,22 +111,30 @@ class ConfusionConsumable(Consumable):
         consumer = action.entity
         target = action.target_actor
 
-        if not self.engine.game_map.visible[action.target_xy]:
+        if not self.engine.game_map.is_visible(*action.target_xy):
             raise ImpossibleActionError("You cannot target an area you cannot see.")
         if not target:
             raise ImpossibleActionError("You must select an enemy to target.")
         if target is consumer:
             raise ImpossibleActionError("You cannot confuse yourself.")
 
-        self.engine.log(
-            f"The eyes of the {target.name} look vacant as it stumbles around",
-            colour.STATUS_EFFECT_APPLIED,
+        self.engine.events.emit(
+            ItemUsed(consumer, self.parent, (target,), self.number_of_turns)
         )
         target.ai = ai.ConfusedEnemy(
             entity=target, previous_ai=target.ai, turns_remaining=self.number_of_turns
         )
         self.consume()
 
+    def describe(self, event: ItemUsed) -> list[tuple[str, RGB]]:
+        return [
+            (
+                f"The eyes of the {target.name} look vacant as it stumbles around",
+                colour.STATUS_EFFECT_APPLIED,
+            )
+            for target in event.targets
+        ]
+
 
 class FireballDamageConsumable(Consumable):
     def __init__(self, damage: int, radius: int):
@@ -128,19 +152,28 @@ class FireballDamageConsumable(Consumable):
     def activate(self, action: actions.ItemAction) -> None:
         target_xy = action.target_xy
 
-        if not self.engine.game_map.visible[target_xy]:
+        if not self.engine.game_map.is_visible(*target_xy):
             raise ImpossibleActionError("You cannot target an are that you cannot see.")
 
-        targets_hit = False
-        for actor in self.engine.game_map.actors:
-            if actor.distance(*target_xy) <= self.radius:
-                self.engine.log(
-                    f"The {actor.name} is engulfed in a fiery explosion "
-                    f"taking {self.damage} damage"
-                )
-                actor.fighter.take_damage(self.damage)
-                targets_hit = True
-
-        if not targets_hit:
+        targets = targeting.actors_in_blast(
+            self.engine.game_map, *target_xy, self.radius
+        )
+        if not targets:
             raise ImpossibleActionError("There are no targets in the radius.")
+
+        self.engine.events.emit(
+            ItemUsed(action.entity, self.parent, tuple(targets), self.damage)
+        )
+        for actor in targets:
+            actor.fighter.take_damage(self.damage)
         self.consume()
+
+    def describe(self, event: ItemUsed) -> list[tuple[str, RGB]]:
+        return [
+            (
+                f"The {target.name} is engulfed in a fiery explosion "
+                f"taking {event.amount} damage",
+                colour.WHITE,
+            )
+            for target in event.targets
+        ]
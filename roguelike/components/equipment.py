@@ -4,74 +4,75 @@ from typing import TYPE_CHECKING
 
 from roguelike.components.base_component import BaseComponent
 from roguelike.equipment_types import EquipmentType
+from roguelike.events import EquipmentChanged
+from roguelike.exceptions import ImpossibleActionError
 
 if TYPE_CHECKING:
     from roguelike.entity import Actor, Item
 
 
 class Equipment(BaseComponent):
+    """Items equipped by an actor, one per `EquipmentType` slot.
+
+    `items` maps each occupied slot to its item, and `slot_of` is the reverse index.
+    """
+
     parent: Actor
 
-    def __init__(self, weapon: Item | None = None, armour: Item | None = None):
-        self.weapon = weapon
-        self.armour = armour
+    def __init__(self) -> None:
+        self.items: dict[EquipmentType, Item] = {}
+        self.slot_of: dict[Item, EquipmentType] = {}
 
     @property
     def defense_bonus(self) -> int:
-        bonus = 0
-
-        if self.weapon is not None and self.weapon.equippable is not None:
-            bonus += self.weapon.equippable.defense_bonus
-        if self.armour is not None and self.armour.equippable is not None:
-            bonus += self.armour.equippable.defense_bonus
-
-        return bonus
+        return sum(
+            item.equippable.defense_bonus
+            for item in self.items.values()
+            if item.equippable is not None
+        )
 
     @property
     def power_bonus(self) -> int:
-        bonus = 0
-
-        if self.weapon is not None and self.weapon.equippable is not None:
-            bonus += self.weapon.equippable.power_bonus
-        if self.armour is not None and self.armour.equippable is not None:
-            bonus += self.armour.equippable.power_bonus
-
-        return bonus
+        return sum(
+            item.equippable.power_bonus
+            for item in self.items.values()
+            if item.equippable is not None
+        )
 
     def item_is_equipped(self, item: Item) -> bool:
-        return self.weapon == item or self.armour == item
+        return item in self.slot_of
 
-    def unequip_message(self, item_name: str) -> None:
-        self.parent.game_map.engine.log(f"You remove the {item_name}.")
+    def unequip_message(self, item: Item) -> None:
+        self.engine.events.emit(EquipmentChanged(self.parent, item, equipped=False))
 
-    def equip_message(self, item_name: str) -> None:
-        self.parent.game_map.engine.log(f"You equip the {item_name}.")
+    def equip_message(self, item: Item) -> None:
+        self.engine.events.emit(EquipmentChanged(self.parent, item, equipped=True))
 
-    def equip_to_slot(self, slot: str, item: Item, add_message: bool) -> None:
-        current_item = getattr(self, slot)
-        if current_item is not None:
+    def equip_to_slot(self, slot: EquipmentType, item: Item, add_message: bool) -> None:
+        if slot in self.items:
             self.unequip_from_slot(slot, add_message)
 
-        setattr(self, slot, item)
+        self.items[slot] = item
+        self.slot_of[item] = slot
+        self.parent.fighter.invalidate_stats()
         if add_message:
-            self.equip_message(item.name)
+            self.equip_message(item)
 
-    def unequip_from_slot(self, slot: str, add_message: bool) -> None:
-        current_item = getattr(self, slot)
+    def unequip_from_slot(self, slot: EquipmentType, add_message: bool) -> None:
+        current_item = self.items.pop(slot)
+        del self.slot_of[current_item]
+        self.parent.fighter.invalidate_stats()
         if add_message:
-            self.unequip_message(current_item.name)
-        setattr(self, slot, None)
+            self.unequip_message(current_item)
 
     def toggle_equip(self, equippable_item: Item, add_message: bool = True) -> None:
-        if (
-            equippable_item.equippable
-            and equippable_item.equippable.equipment_type == EquipmentType.WEAPON
-        ):
-            slot = "weapon"
-        else:
-            slot = "armour"
+        if equippable_item.equippable is None:
+            raise ImpossibleActionError(
+                f"The {equippable_item.name} can't be equipped."
+            )
+        slot = equippable_item.equippable.equipment_type
 
-        if getattr(self, slot) == equippable_item:
+        if self.items.get(slot) is equippable_item:
             self.unequip_from_slot(slot, add_message)
         else:
             self.equip_to_slot(slot, equippable_item, add_message)
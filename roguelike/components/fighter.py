@@ -1,15 +1,20 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
 
-from roguelike import colour
 from roguelike.components.base_component import BaseComponent
+from roguelike.events import Damaged, Death
 from roguelike.render_order import RenderOrder
 
 if TYPE_CHECKING:
     from roguelike.entity import Actor
 
 
+class StatBlock(NamedTuple):
+    power: int
+    defense: int
+
+
 class Fighter(BaseComponent):
     parent: Actor
 
@@ -18,6 +23,7 @@ class Fighter(BaseComponent):
         self._hp = hp
         self.base_defense = base_defense
         self.base_power = base_power
+        self._stats: StatBlock | None = None
 
     def __post_init__(self) -> None:
         self._hp = self.max_hp
@@ -32,13 +38,29 @@ class Fighter(BaseComponent):
         if self._hp == 0 and self.parent.ai:
             self.die()
 
+    @property
+    def stats(self) -> StatBlock:
+        """Stats with all bonuses applied. Cached until `invalidate_stats` is called.
+
+        Anything that changes the base stats or the equipment must call it.
+        """
+        if self._stats is None:
+            self._stats = StatBlock(
+                power=self.base_power + self.power_bonus,
+                defense=self.base_defense + self.defense_bonus,
+            )
+        return self._stats
+
+    def invalidate_stats(self) -> None:
+        self._stats = None
+
     @property
     def defense(self) -> int:
-        return self.base_defense + self.defense_bonus
+        return self.stats.defense
 
     @property
     def power(self) -> int:
-        return self.base_power + self.power_bonus
+        return self.stats.power
 
     @property
     def defense_bonus(self) -> int:
@@ -53,13 +75,7 @@ class Fighter(BaseComponent):
         return 0
 
     def die(self) -> None:
-        if self.parent is self.engine.player:
-            death_msg = "You died!"
-            death_msg_colour = colour.PLAYER_DIE
-        else:
-            death_msg = f"{self.parent.name} is dead!"
-            death_msg_colour = colour.ENEMY_DIE
-
+        name = self.parent.name
         self.parent.char = "%"
         self.parent.colour = (191, 0, 0)
         self.parent.blocks_movement = False
@@ -67,11 +83,14 @@ class Fighter(BaseComponent):
         self.parent.name = f"remains of {self.parent.name}"
         self.parent.render_order = RenderOrder.CORPSE
 
-        self.engine.log(death_msg, death_msg_colour)
+        self.engine.events.emit(Death(self.parent, name))
 
         self.engine.player.level.add_xp(self.parent.level.xp_given)
 
     def take_damage(self, amount: int) -> None:
+        lost = max(0, min(amount, self.hp))
+        if lost > 0:
+            self.engine.events.emit(Damaged(self.parent, lost))
         self.hp -= amount
 
     def heal(self, amount: int) -> int:
@@ -1,21 +1,119 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Hashable, Iterator, NamedTuple
 
 from roguelike.components.base_component import BaseComponent
+from roguelike.events import ItemDropped
+from roguelike.exceptions import ImpossibleActionError
 
 if TYPE_CHECKING:
     from roguelike.entity import Actor, Item
 
 
+def stack_key(item: Item) -> Hashable:
+    """Consumables with the same name stack. Every other item is its own stack."""
+    if item.consumable is not None:
+        return item.name
+    return item
+
+
+class Layout(NamedTuple):
+    """The order of the items of an inventory, as of one of its versions."""
+
+    version: int
+    rows: list[Item]
+    items: list[Item]
+    positions: dict[Item, int]
+
+
 class Inventory(BaseComponent):
+    """Items carried by an actor, grouped in stacks of the same kind.
+
+    Stacks are kept in the order their kind was first picked up, and the items in
+    a stack in the order they were added. Adding and removing items is O(1).
+
+    `version` is bumped whenever items are added or removed. The rows of the menu
+    and the positions of the items are cached until it changes.
+    """
+
     parent: Actor
 
     def __init__(self, capacity: int):
         self.capacity = capacity
-        self.items: list[Item] = []
+        self.stacks: dict[Hashable, dict[Item, None]] = {}
+        self.size = 0
+        self.version = 0
+        self._layout: Layout | None = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {**vars(self), "_layout": None}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Item]:
+        for stack in self.stacks.values():
+            yield from stack
+
+    def __contains__(self, item: Item) -> bool:
+        return item in self.stacks.get(stack_key(item), ())
+
+    @property
+    def is_full(self) -> bool:
+        return self.size >= self.capacity
+
+    def count(self, item: Item) -> int:
+        """Number of items in the same stack as `item`."""
+        return len(self.stacks.get(stack_key(item), ()))
+
+    def layout(self) -> Layout:
+        if self._layout is None or self._layout.version != self.version:
+            items = list(self)
+            self._layout = Layout(
+                version=self.version,
+                rows=[next(iter(stack)) for stack in self.stacks.values()],
+                items=items,
+                positions={item: i for i, item in enumerate(items)},
+            )
+        return self._layout
+
+    def rows(self) -> list[Item]:
+        """The first item of each stack, as shown in the inventory menu."""
+        return self.layout().rows
+
+    def index(self, item: Item) -> int:
+        """Position of `item` when iterating over the inventory."""
+        position = self.layout().positions.get(item)
+        if position is None:
+            raise ValueError(f"{item.name} is not in the inventory.")
+        return position
+
+    def item_at(self, index: int) -> Item:
+        """Inverse of `index`."""
+        items = self.layout().items
+        if not 0 <= index < len(items):
+            raise IndexError("Inventory index out of range.")
+        return items[index]
+
+    def add(self, item: Item) -> None:
+        if self.is_full:
+            raise ImpossibleActionError("Your inventory is full.")
+
+        item.parent = self
+        self.stacks.setdefault(stack_key(item), {})[item] = None
+        self.size += 1
+        self.version += 1
+
+    def remove(self, item: Item) -> None:
+        key = stack_key(item)
+        stack = self.stacks[key]
+        del stack[item]
+        if not stack:
+            del self.stacks[key]
+        self.size -= 1
+        self.version += 1
 
     def drop(self, item: Item) -> None:
-        self.items.remove(item)
+        self.remove(item)
         item.place(self.parent.x, self.parent.y, self.game_map)
-        self.engine.log(f"You dropped the {item.name}.")
+        self.engine.events.emit(ItemDropped(self.parent, item))
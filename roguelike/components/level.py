@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from roguelike.components.base_component import BaseComponent
+from roguelike.events import StatIncreased, XPGained
 
 if TYPE_CHECKING:
     from roguelike.entity import Actor
@@ -38,10 +39,7 @@ class Level(BaseComponent):
             return
 
         self.current_xp += xp
-        self.engine.log(f"You gained {xp} experience points.")
-
-        if self.requires_level_up:
-            self.engine.log(f"You advance to {self.current_level + 1}")
+        self.engine.events.emit(XPGained(self.parent, xp))
 
     def increase_level(self) -> None:
         self.current_xp -= self.xp_to_next_level
@@ -51,17 +49,30 @@ class Level(BaseComponent):
         self.parent.fighter.max_hp += amount
         self.parent.fighter.hp += amount
 
-        self.engine.log("Your health improves!")
+        self.engine.events.emit(StatIncreased(self.parent, "max_hp"))
         self.increase_level()
 
     def increase_power(self, amount: int = 1) -> None:
         self.parent.fighter.base_power += amount
+        self.parent.fighter.invalidate_stats()
 
-        self.engine.log("You feel stronger!")
+        self.engine.events.emit(StatIncreased(self.parent, "power"))
         self.increase_level()
 
     def increase_defense(self, amount: int = 1) -> None:
         self.parent.fighter.base_defense += amount
+        self.parent.fighter.invalidate_stats()
 
-        self.engine.log("Your movements are getting swifter!")
+        self.engine.events.emit(StatIncreased(self.parent, "defense"))
         self.increase_level()
+
+    def increase_stat(self, choice: int) -> None:
+        """Apply a level up choice: 0 for max HP, 1 for power, 2 for defense."""
+        if choice == 0:
+            self.increase_max_hp()
+        elif choice == 1:
+            self.increase_power()
+        elif choice == 2:
+            self.increase_defense()
+        else:
+            raise ValueError(f"Invalid level up choice: {choice}")
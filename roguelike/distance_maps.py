@@ -0,0 +1,186 @@
+"""Named Dijkstra maps of a floor, shared by the AIs and the player's commands.
+
+A distance map holds the walking distance from every tile to the closest of its
+sources, e.g. the player or the unexplored tiles. Following it downhill from any
+tile leads to a source, so any number of actors can use the same map instead of
+pathfinding on their own.
+
+Maps are computed lazily and cached. Each one is only recomputed when the map's
+walkable tiles or its sources have changed since it was last computed.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Hashable, NamedTuple
+
+import numpy as np
+import tcod.path
+
+from roguelike.types import ndarray
+
+if TYPE_CHECKING:
+    from roguelike.game_map import GameMap
+
+UNREACHABLE = np.iinfo(np.int32).max
+
+# Moves cost the same as in `BaseAI.get_path_to`.
+CARDINAL_COST = 2
+DIAGONAL_COST = 3
+
+# How much further than the player's distance a fleeing actor is willing to go to
+# get away. Larger values make it prefer running away over cutting corners.
+FLEE_FACTOR = 1.2
+
+DIRECTIONS = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+Bounds = tuple[int, int, int, int]
+
+
+def dijkstra(walkable: ndarray, distance: ndarray) -> ndarray:
+    """Relax `distance` in place over the walkable tiles, and return it.
+
+    Sources are the tiles already set to a finite distance, every other tile must
+    be set to `UNREACHABLE`.
+    """
+    tcod.path.dijkstra2d(
+        distance,
+        walkable.astype(np.int8),
+        CARDINAL_COST,
+        DIAGONAL_COST,
+        out=distance,
+    )
+    return distance
+
+
+def from_sources(walkable: ndarray, sources: ndarray) -> ndarray:
+    """Distance from every tile to the nearest tile where `sources` is set."""
+    distance = np.full(walkable.shape, UNREACHABLE, dtype=np.int32, order="F")
+    distance[sources] = 0
+    return dijkstra(walkable, distance)
+
+
+class DistanceMap(NamedTuple):
+    key: Hashable
+    """What the map was computed from. The map is stale when this changes."""
+    origin: tuple[int, int]
+    """Map position of `distance[0, 0]`."""
+    distance: ndarray
+
+    def at(self, x: int, y: int) -> int:
+        """Distance from (x, y), `UNREACHABLE` if it's outside the map."""
+        dx, dy = x - self.origin[0], y - self.origin[1]
+        width, height = self.distance.shape
+        if 0 <= dx < width and 0 <= dy < height:
+            return int(self.distance[dx, dy])
+        return UNREACHABLE
+
+    def step_from(
+        self, x: int, y: int, is_blocked: Callable[[int, int], bool] | None = None
+    ) -> tuple[int, int] | None:
+        """The move from (x, y) that goes furthest downhill, avoiding the tiles
+        where `is_blocked` is true.
+
+        Returns None if no move gets closer, e.g. when (x, y) is already a source.
+        """
+        best = self.at(x, y)
+        step = None
+        for dx, dy in DIRECTIONS:
+            distance = self.at(x + dx, y + dy)
+            if distance < best and not (is_blocked and is_blocked(x + dx, y + dy)):
+                best = distance
+                step = dx, dy
+        return step
+
+    def path_from(self, x: int, y: int) -> list[tuple[int, int]]:
+        """Positions from (x, y), excluded, to the closest source.
+
+        Entities are ignored, as they will likely have moved by the time the path
+        gets to them.
+        """
+        x0, y0 = self.origin
+        if self.at(x, y) == UNREACHABLE:
+            return []
+        path = tcod.path.hillclimb2d(self.distance, (x - x0, y - y0), True, True)
+        return [(int(px) + x0, int(py) + y0) for px, py in path[1:]]
+
+
+def point_mask(x: int, y: int, bounds: Bounds) -> ndarray:
+    """Mask of `bounds` with only (x, y) set, if it's inside."""
+    x0, y0, x1, y1 = bounds
+    mask = np.full((x1 - x0, y1 - y0), fill_value=False, order="F")
+    if x0 <= x < x1 and y0 <= y < y1:
+        mask[x - x0, y - y0] = True
+    return mask
+
+
+def distance_field(walkable: ndarray, bounds: Bounds, x: int, y: int) -> DistanceMap:
+    """Distance to (x, y) over the region `bounds`, whose tiles are `walkable`."""
+    distance = from_sources(walkable, point_mask(x, y, bounds))
+    return DistanceMap(None, bounds[:2], distance)
+
+
+class DistanceMaps:
+    """The distance maps of a floor, by name.
+
+    - "player": to the player.
+    - "downstairs": to the down stairs.
+    - "unexplored": to the closest walkable tile that was never seen.
+    - "flee": away from the player, towards wherever is safest. Unlike simply
+      maximising the distance to the player, it doesn't lead into dead ends when
+      there is a way around.
+    """
+
+    def __init__(self, game_map: GameMap):
+        self.game_map = game_map
+        self.maps: dict[str, DistanceMap] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Cheap to recompute, so not worth storing with saved games or snapshots.
+        return {**vars(self), "maps": {}}
+
+    def __getitem__(self, name: str) -> DistanceMap:
+        game_map = self.game_map
+        bounds = game_map.distance_bounds()
+        key = (game_map.tiles_version, bounds, self._source_key(name))
+
+        cached = self.maps.get(name)
+        if cached is not None and cached.key == key:
+            return cached
+
+        walkable = game_map.get_walkable(*bounds)
+        if name == "flee":
+            towards_player = self["player"].distance
+            reachable = towards_player != UNREACHABLE
+            distance = np.full_like(towards_player, UNREACHABLE)
+            distance[reachable] = towards_player[reachable] * -FLEE_FACTOR
+            distance = dijkstra(walkable, distance)
+        elif name == "unexplored":
+            unexplored = walkable & ~game_map.get_explored(*bounds)
+            distance = from_sources(walkable, unexplored)
+        else:
+            distance = from_sources(walkable, point_mask(*self._position(name), bounds))
+
+        self.maps[name] = DistanceMap(key, bounds[:2], distance)
+        return self.maps[name]
+
+    def _position(self, name: str) -> tuple[int, int]:
+        if name == "player":
+            player = self.game_map.engine.player
+            return player.x, player.y
+        if name == "downstairs":
+            return self.game_map.downstairs_location
+        raise KeyError(f"Unknown distance map: {name!r}")
+
+    def _source_key(self, name: str) -> Hashable:
+        if name == "unexplored":
+            return self.game_map.explored_version
+        if name == "flee":
+            return self._source_key("player")
+        return self._position(name)
+
+    def step_towards(self, name: str, x: int, y: int) -> tuple[int, int] | None:
+        """The move from (x, y) down map `name` that isn't blocked by an entity."""
+
+        def is_blocked(x: int, y: int) -> bool:
+            return self.game_map.get_blocking_entity_at(x, y) is not None
+
+        return self[name].step_from(x, y, is_blocked)
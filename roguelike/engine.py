@@ -1,33 +1,57 @@
-import lzma
-import pickle
+from __future__ import annotations
+
+import random
+from concurrent.futures import Future
+from typing import Any
 
 from tcod.console import Console
-from tcod.map import compute_fov
 
 from roguelike import colour
+from roguelike.actions import Action
+from roguelike.camera import Camera
 from roguelike.colour import RGB
 from roguelike.entity import Actor
+from roguelike.events import EventBus
 from roguelike.exceptions import ImpossibleActionError
 from roguelike.game_map import GameMap, GameWorld
 from roguelike.message_log import MessageLog
+from roguelike.planner import plan_turn
 from roguelike.render_functions import (
     render_bar,
     render_dungeon_level,
     render_names_at_mouse_loc,
 )
+from roguelike.replay import ActionLog
+from roguelike.save_file import Deferred, dump_save, merge_deferred, write_save
 
 
 class Engine:
     game_map: GameMap
     game_world: GameWorld
+    pending_load: Future[Deferred] | None = None
+    """The rest of a lazily loaded save, see `save_file`."""
+
+    def __init__(self, player: Actor, seed: int | None = None, headless: bool = False):
+        if seed is None:
+            seed = random.getrandbits(32)
+        # All randomness in the game must come from `rng`, so that a game can be
+        # replayed from its seed and the actions in `action_log`.
+        self.rng = random.Random(seed)
+        self.action_log = ActionLog(seed)
 
-    def __init__(self, player: Actor):
         self.player = player
+        self.events = EventBus()
         self.message_log = MessageLog()
+        # Headless games have no one to read the log, so no messages are written.
+        self.headless = headless
+        if not headless:
+            self.message_log.subscribe(self.events, player)
         self.mouse_location = (0, 0)
+        self.camera = Camera(width=80, height=43)
 
     def render(self, console: Console) -> None:
-        self.game_map.render(console)
+        self.camera.follow(self.player.x, self.player.y, self.game_map)
+        self.game_map.render(console, self.camera)
         self.message_log.render(console=console, x=21, y=45, width=40, height=5)
 
         render_bar(
@@ -42,13 +66,23 @@ class Engine:
         render_names_at_mouse_loc(console=console, x=21, y=44, engine=self)
 
     def update_fov(self) -> None:
-        self.game_map.visible[:] = compute_fov(
-            self.game_map.tiles["transparent"], (self.player.x, self.player.y), radius=8
-        )
-        self.game_map.explored |= self.game_map.visible
+        self.game_map.update_fov(self.player.x, self.player.y, radius=8)
+
+    def play_turn(self, action: Action) -> None:
+        """Perform the player's action, then let the rest of the world act.
+
+        Raises `ImpossibleActionError` if the action can't be performed, in which
+        case no turn passes.
+        """
+        action.perform()
+        self.handle_enemy_turns()
+        self.update_fov()
 
     def handle_enemy_turns(self) -> None:
-        for entity in set(self.game_map.actors) - {self.player}:
+        enemies = [a for a in self.game_map.actors if a is not self.player]
+        plan_turn(self, enemies)
+
+        for entity in enemies:
             if entity.ai is not None:
                 try:
                     entity.ai.perform()
@@ -56,9 +90,22 @@ class Engine:
                     pass
 
     def log(self, text: str, fg: RGB = colour.WHITE, *, stack: bool = True) -> None:
-        self.message_log.add_message(text=text, fg=fg, stack=stack)
+        if not self.headless:
+            self.message_log.add_message(text=text, fg=fg, stack=stack)
+
+    def finish_loading(self) -> None:
+        """Wait for the rest of a lazily loaded save, and merge it into the game.
+
+        Raises whatever failed to load, only once. The game is then incomplete and
+        must be dropped.
+        """
+        pending, self.pending_load = self.pending_load, None
+        if pending is not None:
+            merge_deferred(self, pending.result())
+
+    def __getstate__(self) -> dict[str, Any]:
+        self.finish_loading()
+        return vars(self)
 
     def save_as(self, filename: str) -> None:
-        save_data = lzma.compress(pickle.dumps(self))
-        with open(filename, "wb") as f:
-            f.write(save_data)
+        write_save(dump_save(self), filename)
@@ -47,6 +47,12 @@ class Entity:
     def move(self, dx: int, dy: int) -> None:
         self.x += dx
         self.y += dy
+        self.moved()
+
+    def moved(self) -> None:
+        """Let the map know the position changed, which it tracks for actors."""
+        if self._parent is not None and not isinstance(self._parent, Inventory):
+            self._parent.entities.moved(self)
 
     def __hash__(self) -> int:
         return id(self)
@@ -74,6 +80,7 @@ class Entity:
     def place(self, x: int, y: int, game_map: GameMap | None = None) -> None:
         self.x = x
         self.y = y
+        self.moved()
         if game_map:
             if self._parent is not None and self._parent is self.game_map:
                 self.game_map.entities.remove(self)
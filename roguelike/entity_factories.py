@@ -1,6 +1,6 @@
 from roguelike.colour import WHITE
 from roguelike.components import consumable, equippable
-from roguelike.components.ai import HostileEnemy
+from roguelike.components.ai import CowardlyEnemy, HostileEnemy
 from roguelike.components.equipment import Equipment
 from roguelike.components.fighter import Fighter
 from roguelike.components.inventory import Inventory
@@ -27,6 +27,17 @@ orc = Actor(
     level=Level(xp_given=35),
     equipment=Equipment(),
 )
+# Not in the spawn tables of procgen, as it would change the balance of the game.
+cowardly_orc = Actor(
+    char="o",
+    colour=(63, 127, 63),
+    name="Orc",
+    ai_cls=CowardlyEnemy,
+    fighter=Fighter(hp=10, base_defense=0, base_power=3),
+    inventory=Inventory(capacity=0),
+    level=Level(xp_given=35),
+    equipment=Equipment(),
+)
 troll = Actor(
     char="t",
     colour=(0, 127, 0),
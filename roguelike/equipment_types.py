@@ -2,5 +2,7 @@ from enum import Enum, auto
 
 
 class EquipmentType(Enum):
+    """The slot an item is equipped to. Each slot holds one item."""
+
     WEAPON = auto()
     ARMOUR = auto()
@@ -0,0 +1,96 @@
+"""Game events, and the bus that delivers them to whoever is interested.
+
+Events are plain records of what happened. Turning them into text is left to the
+subscribers, like the message log, so nothing is formatted when no one listens.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, TypeVar
+
+if TYPE_CHECKING:
+    from roguelike.entity import Actor, Item
+
+E = TypeVar("E")
+
+
+class Attack(NamedTuple):
+    """A melee attack. `damage` is 0 if it did no damage."""
+
+    attacker: Actor
+    target: Actor
+    damage: int
+
+
+class Damaged(NamedTuple):
+    """`actor` lost `amount` HP, from any source. Never more than it had left."""
+
+    actor: Actor
+    amount: int
+
+
+class Death(NamedTuple):
+    actor: Actor
+    name: str
+    """The name of the actor before it died."""
+
+
+class XPGained(NamedTuple):
+    actor: Actor
+    amount: int
+
+
+class StatIncreased(NamedTuple):
+    """A level up choice: "max_hp", "power" or "defense"."""
+
+    actor: Actor
+    stat: str
+
+
+class ItemPickedUp(NamedTuple):
+    actor: Actor
+    item: Item
+
+
+class ItemDropped(NamedTuple):
+    actor: Actor
+    item: Item
+
+
+class EquipmentChanged(NamedTuple):
+    """`item` was equipped, or removed if not `equipped`."""
+
+    actor: Actor
+    item: Item
+    equipped: bool
+
+
+class ConfusionEnded(NamedTuple):
+    actor: Actor
+
+
+class ItemUsed(NamedTuple):
+    """A consumable was used. What `amount` means depends on the consumable, e.g.
+    damage dealt to each target or HP recovered.
+    """
+
+    user: Actor
+    item: Item
+    targets: tuple[Actor, ...]
+    amount: int
+
+
+class EventBus:
+    """Calls the handlers subscribed to each type of event, in subscription order."""
+
+    def __init__(self) -> None:
+        self.handlers: dict[type, list[Callable[[Any], None]]] = {}
+
+    def subscribe(self, event_type: type[E], handler: Callable[[E], None]) -> None:
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type: type[E], handler: Callable[[E], None]) -> None:
+        self.handlers[event_type].remove(handler)
+
+    def emit(self, event: object) -> None:
+        for handler in self.handlers.get(type(event), ()):
+            handler(event)
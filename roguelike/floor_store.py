@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import io
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from roguelike.game_map import GameMap
+
+if TYPE_CHECKING:
+    from roguelike.engine import Engine
+
+# Dense arrays are stored as raw NumPy buffers. Everything else is pickled, except
+# for the engine, which is shared by all floors, and the arrays derived from
+# `tiles`, which are recomputed. `visible` is kept as it was when the player left,
+# since enemies act on it before the player's FOV is updated on their return.
+# Maps without dense arrays (`ChunkedGameMap`) are pickled whole, with their
+# `__getstate__`.
+ARRAY_ATTRS = ("tiles", "explored", "visible")
+DERIVED_ATTRS = ("_walkable", "_transparent")
+SKIPPED_ATTRS = ("engine", *DERIVED_ATTRS, *ARRAY_ATTRS)
+
+
+class _FloorPickler(pickle.Pickler):
+    """Pickles references to the engine, player and the map itself by name."""
+
+    def __init__(self, file: io.BytesIO, game_map: GameMap):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.game_map = game_map
+
+    def persistent_id(self, obj: Any) -> str | None:
+        if obj is self.game_map:
+            return "game_map"
+        if obj is self.game_map.engine:
+            return "engine"
+        if obj is self.game_map.engine.player:
+            return "player"
+        return None
+
+
+class _FloorUnpickler(pickle.Unpickler):
+    def __init__(self, file: io.BytesIO, game_map: GameMap):
+        super().__init__(file)
+        self.game_map = game_map
+
+    def persistent_load(self, pid: Any) -> Any:
+        if pid == "game_map":
+            return self.game_map
+        if pid == "engine":
+            return self.game_map.engine
+        if pid == "player":
+            return self.game_map.engine.player
+        raise pickle.UnpicklingError(f"Unknown persistent id: {pid!r}")
+
+
+def dumps_detached(obj: Any, game_map: GameMap) -> bytes:
+    """Pickle `obj`, which belongs to `game_map`, without the engine or the map."""
+    out = io.BytesIO()
+    _FloorPickler(out, game_map).dump(obj)
+    return out.getvalue()
+
+
+def loads_detached(data: bytes, game_map: GameMap) -> Any:
+    """Inverse of `dumps_detached`, reattaching to `game_map` and its engine."""
+    return _FloorUnpickler(io.BytesIO(data), game_map).load()
+
+
+def serialize_floor(game_map: GameMap) -> bytes:
+    state = {k: v for k, v in game_map.__getstate__().items() if k not in SKIPPED_ATTRS}
+    state_data = dumps_detached((type(game_map), state), game_map)
+
+    arrays = {
+        name: getattr(game_map, name) for name in ARRAY_ATTRS if name in vars(game_map)
+    }
+    out = io.BytesIO()
+    np.savez_compressed(out, state=np.frombuffer(state_data, dtype=np.uint8), **arrays)
+    return out.getvalue()
+
+
+def deserialize_floor(data: bytes, engine: Engine) -> GameMap:
+    with np.load(io.BytesIO(data)) as arrays:
+        map_arrays = {name: arrays[name] for name in ARRAY_ATTRS if name in arrays}
+        state_data = arrays["state"].tobytes()
+
+    # The class is only known after unpickling, but the unpickler needs the map
+    # instance to resolve references to it, so the class is fixed up afterwards.
+    game_map = GameMap.__new__(GameMap)
+    game_map.engine = engine
+    cls, state = loads_detached(state_data, game_map)
+    game_map.__class__ = cls
+    game_map.__setstate__(state)
+
+    for name, array in map_arrays.items():
+        setattr(game_map, name, np.asfortranarray(array))
+    if "tiles" in map_arrays:
+        game_map.invalidate_tiles()
+    if "explored" in map_arrays and "visible" not in map_arrays:
+        # Serialized before `visible` was kept.
+        game_map.visible = np.full(game_map.explored.shape, False, order="F")
+    return game_map
+
+
+class FloorStore:
+    """Keeps the most recently visited floors in memory and the rest serialized.
+
+    Serialized floors are written to `directory`, or kept as compressed bytes in
+    memory if no directory is given. The directory is only scratch space: files
+    left there by other games are ignored, and a pickled store carries its floors
+    with it, so saves don't depend on the directory.
+    """
+
+    def __init__(
+        self, engine: Engine, directory: Path | None = None, max_loaded: int = 3
+    ):
+        assert max_loaded >= 1, "The current floor must always stay loaded."
+        self.engine = engine
+        self.directory = directory
+        self.max_loaded = max_loaded
+        self.loaded: OrderedDict[int, GameMap] = OrderedDict()
+        self.serialized: dict[int, bytes] = {}
+        self.on_disk: set[int] = set()
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {**vars(self), "serialized": self.all_serialized(), "on_disk": set()}
+
+    def __contains__(self, floor: int) -> bool:
+        return floor in self.loaded or floor in self.serialized or floor in self.on_disk
+
+    def get(self, floor: int) -> GameMap | None:
+        if floor in self.loaded:
+            self.loaded.move_to_end(floor)
+            return self.loaded[floor]
+        if floor not in self:
+            return None
+
+        game_map = deserialize_floor(self._read(floor), self.engine)
+        self.put(floor, game_map)
+        return game_map
+
+    def all_serialized(self) -> dict[int, bytes]:
+        """Every floor that isn't loaded, serialized, whether in memory or on disk."""
+        return {
+            **self.serialized,
+            **{floor: self._path(floor).read_bytes() for floor in self.on_disk},
+        }
+
+    def put(self, floor: int, game_map: GameMap) -> None:
+        self.loaded[floor] = game_map
+        self.loaded.move_to_end(floor)
+
+        while len(self.loaded) > self.max_loaded:
+            old_floor, old_map = self.loaded.popitem(last=False)
+            self._write(old_floor, serialize_floor(old_map))
+
+    def add_serialized(self, floor: int, data: bytes) -> None:
+        """Add a floor serialized with `serialize_floor`, e.g. by a save."""
+        self._write(floor, data)
+
+    def _path(self, floor: int) -> Path:
+        assert self.directory is not None
+        return self.directory / f"floor-{floor}.npz"
+
+    def _write(self, floor: int, data: bytes) -> None:
+        if self.directory is None:
+            self.serialized[floor] = data
+        else:
+            self._path(floor).write_bytes(data)
+            self.on_disk.add(floor)
+
+    def _read(self, floor: int) -> bytes:
+        # Floors of an unpickled store are in memory, even if it has a directory.
+        if floor in self.serialized:
+            return self.serialized.pop(floor)
+        self.on_disk.discard(floor)
+        return self._path(floor).read_bytes()
@@ -1,46 +1,324 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Iterable, Iterator
+from collections.abc import MutableSet
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Mapping, cast
 
 import numpy as np
 from tcod.console import Console
+from tcod.map import compute_fov
 
 from roguelike import tile_types
+from roguelike.distance_maps import DistanceMaps
 from roguelike.entity import Actor, Entity, Item
+from roguelike.types import ndarray
 
 if TYPE_CHECKING:
+    from roguelike.camera import Camera
     from roguelike.engine import Engine
+    from roguelike.procgen import DungeonGenerator
+
+
+class ActorPositions:
+    """The positions of a set of actors, as arrays, to find actors with masks.
+
+    Every actor added gets the next slot, and slots are only reused when the arrays
+    are compacted, which keeps their order. So actors found in slot order are in
+    the order they were added.
+    """
+
+    def __init__(self, actors: Iterable[Actor]):
+        self.compact(list(actors))
+
+    def compact(self, actors: list[Actor]) -> None:
+        self.actors: list[Actor | None] = [*actors]
+        self.slots = {actor: i for i, actor in enumerate(actors)}
+        capacity = max(16, 2 * len(actors))
+        self.xs = np.zeros(capacity, dtype=np.intp)
+        self.ys = np.zeros(capacity, dtype=np.intp)
+        self.present = np.zeros(capacity, dtype=bool)
+        for i, actor in enumerate(actors):
+            self.xs[i], self.ys[i] = actor.x, actor.y
+        self.present[: len(actors)] = True
+
+    def add(self, actor: Actor) -> None:
+        if actor in self.slots:
+            return
+        slot = len(self.actors)
+        if slot == len(self.xs):
+            live = [a for a in self.actors if a is not None]
+            if len(live) < slot // 2:
+                self.compact(live)
+            else:
+                for name in ("xs", "ys", "present"):
+                    array = getattr(self, name)
+                    setattr(self, name, np.resize(array, 2 * len(array)))
+                self.present[slot:] = False
+            slot = len(self.actors)
+
+        self.actors.append(actor)
+        self.slots[actor] = slot
+        self.xs[slot], self.ys[slot] = actor.x, actor.y
+        self.present[slot] = True
+
+    def remove(self, actor: Actor) -> None:
+        slot = self.slots.pop(actor, None)
+        if slot is not None:
+            self.actors[slot] = None
+            self.present[slot] = False
+
+    def moved(self, actor: Actor) -> None:
+        slot = self.slots.get(actor)
+        if slot is not None:
+            self.xs[slot], self.ys[slot] = actor.x, actor.y
+
+    def in_mask(self, origin: tuple[int, int], mask: ndarray) -> list[Actor]:
+        """Actors standing on a tile where `mask` is set. `mask[0, 0]` is at
+        `origin`.
+        """
+        used = len(self.actors)
+        xs = self.xs[:used] - origin[0]
+        ys = self.ys[:used] - origin[1]
+        width, height = mask.shape
+        inside = self.present[:used] & (xs >= 0) & (xs < width)
+        inside &= (ys >= 0) & (ys < height)
+        hit = np.zeros(used, dtype=bool)
+        hit[inside] = mask[xs[inside], ys[inside]]
+        return [cast(Actor, self.actors[i]) for i in np.flatnonzero(hit)]
+
+
+class EntitySet(MutableSet["Entity"]):
+    """A set of entities that iterates in insertion order.
+
+    Iteration order decides things like which monster acts first, so it must not
+    depend on memory addresses for a game to be reproducible from its seed.
+
+    The positions of the actors are also kept as arrays, built on the first query
+    and then kept up to date, so entities must report when they move.
+    """
+
+    def __init__(self, entities: Iterable[Entity] = ()):
+        self._entities = dict.fromkeys(entities)
+        self._actor_positions: ActorPositions | None = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Rebuilt from the entities when needed, as they may not be fully unpickled
+        # yet when the set is.
+        return {**vars(self), "_actor_positions": None}
+
+    def __contains__(self, entity: object) -> bool:
+        return entity in self._entities
+
+    def __iter__(self) -> Iterator[Entity]:
+        return iter(self._entities)
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def add(self, entity: Entity) -> None:
+        self._entities[entity] = None
+        if self._actor_positions is not None and isinstance(entity, Actor):
+            self._actor_positions.add(entity)
+
+    def discard(self, entity: Entity) -> None:
+        self._entities.pop(entity, None)
+        if self._actor_positions is not None and isinstance(entity, Actor):
+            self._actor_positions.remove(entity)
+
+    def update(self, entities: Iterable[Entity]) -> None:
+        for entity in entities:
+            self.add(entity)
+
+    def difference_update(self, entities: Iterable[Entity]) -> None:
+        for entity in entities:
+            self.discard(entity)
+
+    def moved(self, entity: Entity) -> None:
+        if self._actor_positions is not None and isinstance(entity, Actor):
+            self._actor_positions.moved(entity)
+
+    def actors_in_mask(self, origin: tuple[int, int], mask: ndarray) -> list[Actor]:
+        """Actors, dead or alive, standing on a tile where `mask` is set, in the
+        order of the set. `mask[0, 0]` is at `origin`.
+        """
+        if self._actor_positions is None:
+            self._actor_positions = ActorPositions(
+                e for e in self._entities if isinstance(e, Actor)
+            )
+        return self._actor_positions.in_mask(origin, mask)
 
 
 class GameMap:
+    """A map backed by dense arrays covering its whole area.
+
+    Code that should also work on `ChunkedGameMap` must go through the accessor
+    methods (`is_walkable`, `get_tiles`, `update_fov`, ...) rather than the arrays.
+
+    `tiles` holds tile IDs (see `tile_types`). The walkable and transparent arrays
+    derived from it are cached, so tiles must only be changed with `set_tiles`.
+
+    `tiles_version` and `explored_version` are bumped whenever the walkable tiles
+    or the explored tiles change, to tell when `distance_maps` are stale.
+    """
+
+    fov_window = (0, 0, 0, 0)
+    """Region computed by the last `update_fov`. A class default for older saves."""
+
     def __init__(
         self, engine: Engine, width: int, height: int, entities: Iterable[Entity] = ()
     ) -> None:
         self.engine = engine
         self.width, self.height = width, height
-        self.entities = set(entities)
-        self.tiles = np.full((width, height), fill_value=tile_types.wall, order="F")
+        self.entities = EntitySet(entities)
+        self.tiles = np.full(
+            (width, height), fill_value=tile_types.wall, dtype=np.uint8, order="F"
+        )
+        self.tiles_version = 0
+        self.invalidate_tiles()
 
         self.visible = np.full((width, height), fill_value=False, order="F")
         self.explored = np.full((width, height), fill_value=False, order="F")
+        self.explored_version = 0
         self.downstairs_location = (0, 0)
+        self.upstairs_location: tuple[int, int] | None = None
+        self.distance_maps = DistanceMaps(self)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return vars(self)
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        vars(self).update(state)
 
     def in_bounds(self, x: int, y: int) -> bool:
         return 0 <= x < self.width and 0 <= y < self.height
 
-    def render(self, console: Console) -> None:
+    def clip(self, x0: int, y0: int, x1: int, y1: int) -> tuple[int, int, int, int]:
+        """Clip the region [x0, x1) x [y0, y1) to the map bounds."""
+        return (
+            max(0, x0),
+            max(0, y0),
+            max(0, min(x1, self.width)),
+            max(0, min(y1, self.height)),
+        )
+
+    def invalidate_tiles(self) -> None:
+        """Drop the arrays derived from `tiles`, after it was replaced."""
+        self._walkable: ndarray | None = None
+        self._transparent: ndarray | None = None
+        self.tiles_version += 1
+
+    @property
+    def walkable(self) -> ndarray:
+        if self._walkable is None:
+            self._walkable = tile_types.TILES["walkable"][self.tiles]
+        return self._walkable
+
+    @property
+    def transparent(self) -> ndarray:
+        if self._transparent is None:
+            self._transparent = tile_types.TILES["transparent"][self.tiles]
+        return self._transparent
+
+    def set_tiles(self, index: Any, tile: int) -> None:
+        """Set the tiles at `index`, anything that can index a NumPy array."""
+        self.tiles[index] = tile
+        self.tiles_version += 1
+        if self._walkable is not None:
+            self._walkable[index] = tile_types.TILES["walkable"][tile]
+        if self._transparent is not None:
+            self._transparent[index] = tile_types.TILES["transparent"][tile]
+
+    def set_tile(self, x: int, y: int, tile: int) -> None:
+        self.set_tiles((x, y), tile)
+
+    def is_walkable(self, x: int, y: int) -> bool:
+        return bool(self.walkable[x, y])
+
+    def is_visible(self, x: int, y: int) -> bool:
+        return bool(self.visible[x, y])
+
+    def is_explored(self, x: int, y: int) -> bool:
+        return bool(self.explored[x, y])
+
+    def get_tiles(self, x0: int, y0: int, x1: int, y1: int) -> ndarray:
+        """Tile IDs in a region already clipped to the map. Treat it as read-only."""
+        return self.tiles[x0:x1, y0:y1]
+
+    def get_walkable(self, x0: int, y0: int, x1: int, y1: int) -> ndarray:
+        return self.walkable[x0:x1, y0:y1]
+
+    def get_transparent(self, x0: int, y0: int, x1: int, y1: int) -> ndarray:
+        return self.transparent[x0:x1, y0:y1]
+
+    def get_visible(self, x0: int, y0: int, x1: int, y1: int) -> ndarray:
+        return self.visible[x0:x1, y0:y1]
+
+    def get_explored(self, x0: int, y0: int, x1: int, y1: int) -> ndarray:
+        return self.explored[x0:x1, y0:y1]
+
+    def pathing_bounds(
+        self, x0: int, y0: int, x1: int, y1: int
+    ) -> tuple[int, int, int, int]:
+        """Region to search for a path between (x0, y0) and (x1, y1)."""
+        return 0, 0, self.width, self.height
+
+    def distance_bounds(self) -> tuple[int, int, int, int]:
+        """Region covered by `distance_maps`."""
+        return 0, 0, self.width, self.height
+
+    def update_fov(self, x: int, y: int, radius: int) -> None:
+        """Recompute the visible area around (x, y).
+
+        Nothing beyond `radius` can be seen, so FOV is only computed in that window.
+        """
+        # Only the window of the last update can have anything visible.
+        px0, py0, px1, py1 = self.fov_window
+        self.visible[px0:px1, py0:py1] = False
+        x0, y0, x1, y1 = self.clip(
+            x - radius, y - radius, x + radius + 1, y + radius + 1
+        )
+        self.fov_window = x0, y0, x1, y1
+        window = self.visible[x0:x1, y0:y1]
+        window[:] = compute_fov(
+            self.get_transparent(x0, y0, x1, y1), (x - x0, y - y0), radius=radius
+        )
+        explored = self.explored[x0:x1, y0:y1]
+        if (window & ~explored).any():
+            explored |= window
+            self.explored_version += 1
+
+    def render(self, console: Console, camera: Camera) -> None:
+        """Render the map region in view of `camera`. Cost depends only on its size."""
+        x0, y0, x1, y1 = self.clip(*camera.bounds)
+        sx0, sy0 = camera.to_screen(x0, y0)
+        screen = slice(sx0, sx0 + x1 - x0), slice(sy0, sy0 + y1 - y0)
+        tiles = self.get_tiles(x0, y0, x1, y1)
         # noinspection PyTypeChecker
-        console.tiles_rgb[: self.width, : self.height] = np.select(
-            condlist=[self.visible, self.explored],
-            choicelist=[self.tiles["light"], self.tiles["dark"]],
+        console.tiles_rgb[screen] = np.select(
+            condlist=[
+                self.get_visible(x0, y0, x1, y1),
+                self.get_explored(x0, y0, x1, y1),
+            ],
+            choicelist=[
+                tile_types.TILES["light"][tiles],
+                tile_types.TILES["dark"][tiles],
+            ],
             default=tile_types.SHROUD,
         )
 
-        entities = sorted(self.entities, key=lambda x: x.render_order.value)
+        entities = sorted(
+            (
+                e
+                for e in self.entities
+                if camera.in_view(e.x, e.y) and self.is_visible(e.x, e.y)
+            ),
+            key=lambda x: x.render_order.value,
+        )
 
         for entity in entities:
-            if self.visible[entity.x, entity.y]:
-                console.print(entity.x, entity.y, entity.char, fg=entity.colour)
+            console.print(
+                *camera.to_screen(entity.x, entity.y), entity.char, fg=entity.colour
+            )
 
     def get_blocking_entity_at(self, x: int, y: int) -> Entity | None:
         for e in self.entities:
@@ -78,7 +356,16 @@ class GameWorld:
         room_min_size: int,
         room_max_size: int,
         current_floor: int = 0,
+        floors_directory: Path | None = None,
+        max_loaded_floors: int = 3,
+        generators: Mapping[int, DungeonGenerator] | None = None,
     ):
+        """`generators` chooses the generator of specific floors, e.g. a
+        `procgen.ChunkedGenerator` for a very large one. Other floors use
+        `procgen.default_generator`.
+        """
+        from roguelike.floor_store import FloorStore
+
         self.engine = engine
         self.map_width = map_width
         self.map_height = map_height
@@ -86,16 +373,49 @@ class GameWorld:
         self.room_min_size = room_min_size
         self.room_max_size = room_max_size
         self.current_floor = current_floor
-
-    def generate_floor(self) -> None:
-        from roguelike.procgen import generate_dungeon
-
-        self.current_floor += 1
-        self.engine.game_map = generate_dungeon(
-            max_rooms=self.max_rooms,
-            room_min_size=self.room_min_size,
-            room_max_size=self.room_max_size,
-            map_width=self.map_width,
-            map_height=self.map_height,
-            engine=self.engine,
+        self.generators = dict(generators or {})
+        self.floors = FloorStore(
+            engine, directory=floors_directory, max_loaded=max_loaded_floors
         )
+
+    def descend(self) -> None:
+        self.change_floor(self.current_floor + 1)
+
+    def ascend(self) -> None:
+        self.change_floor(self.current_floor - 1)
+
+    def change_floor(self, floor: int) -> None:
+        """Move the player to `floor`, restoring it if visited before.
+
+        A restored floor puts the player on the staircase they came through.
+        """
+        previous_floor = self.current_floor
+        self.current_floor = floor
+
+        game_map = self.floors.get(floor)
+        if game_map is None:
+            game_map = self.generate_floor()
+        else:
+            if floor > previous_floor:
+                assert game_map.upstairs_location is not None
+                x, y = game_map.upstairs_location
+            else:
+                x, y = game_map.downstairs_location
+            self.engine.player.place(x, y, game_map)
+
+        self.floors.put(floor, game_map)
+        self.engine.game_map = game_map
+
+    def generator_for(self, floor: int) -> DungeonGenerator:
+        from roguelike.procgen import default_generator
+
+        generator = self.generators.get(floor)
+        if generator is None:
+            generator = default_generator(self, floor)
+        return generator
+
+    def generate_floor(self) -> GameMap:
+        from roguelike.procgen import build_floor
+
+        generator = self.generator_for(self.current_floor)
+        return build_floor(generator, self.engine, self.map_width, self.map_height)
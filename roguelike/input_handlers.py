@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import functools
+import shutil
+import traceback
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import TYPE_CHECKING, Callable, Optional, Union
@@ -16,11 +19,13 @@ from roguelike.actions import (
     TakeStairsAction,
     WaitAction,
 )
-from roguelike.entity import Item
 from roguelike.exceptions import ImpossibleActionError, QuitWithoutSaving
+from roguelike.render_functions import render_frame
+from roguelike.travel import Travel
 
 if TYPE_CHECKING:
     from roguelike.engine import Engine
+    from roguelike.entity import Item
 
 MOVE_KEYS = {
     # Arrow keys.
@@ -65,6 +70,13 @@ CURSOR_Y_KEYS = {
     tcod.event.K_PAGEDOWN: 10,
 }
 
+PAGE_KEYS = {
+    tcod.event.K_LEFT: -1,
+    tcod.event.K_RIGHT: 1,
+    tcod.event.K_PAGEUP: -1,
+    tcod.event.K_PAGEDOWN: 1,
+}
+
 CONFIRM_KEYS = {
     tcod.event.K_KP_ENTER,
     tcod.event.K_RETURN,
@@ -100,21 +112,45 @@ class EventHandler(BaseEventHandler):
         self.engine = engine
 
     def handle_events(self, event: tcod.event.Event) -> BaseEventHandler:
+        try:
+            self.engine.finish_loading()
+        except Exception as ex:
+            from roguelike.setup_game import MainMenu
+
+            traceback.print_exc()
+            return PopupMessage(MainMenu(), f"Failed to load save:\n{ex}")
+
         action_or_state = self.dispatch(event)
         if isinstance(action_or_state, BaseEventHandler):
             return action_or_state
         if self.handle_action(action_or_state):
             if not self.engine.player.is_alive:
                 return GameOverEventHandler(self.engine)
+            if self.engine.player.level.requires_level_up:
+                return LevelUpEventHandler(self.engine)
             return MainGameEventHandler(self.engine)
         return self
 
     def ev_mousemotion(self, event: tcod.event.MouseMotion) -> Action | None:
-        x, y = event.tile
-        if self.engine.game_map.in_bounds(x, y):
-            self.engine.mouse_location = (x, y)
+        location = self.map_location_at(event.tile)
+        if location is not None:
+            self.engine.mouse_location = location
         return None
 
+    def map_location_at(self, tile: tuple[int, int]) -> tuple[int, int] | None:
+        """The map position under a console tile, if it shows one."""
+        camera = self.engine.camera
+        x, y = camera.to_map(*tile)
+        if camera.in_view(x, y) and self.engine.game_map.in_bounds(x, y):
+            return x, y
+        return None
+
+    def panel_x(self) -> int:
+        """Column for side panels, on the half of the screen away from the player."""
+        player = self.engine.player
+        player_x, _ = self.engine.camera.to_screen(player.x, player.y)
+        return 40 if player_x <= 30 else 0
+
     def on_render(self, console: tcod.Console) -> None:
         self.engine.render(console)
 
@@ -122,14 +158,13 @@ class EventHandler(BaseEventHandler):
         if action is None:
             return False
 
+        self.engine.action_log.record(action)
         try:
-            action.perform()
+            self.engine.play_turn(action)
         except ImpossibleActionError as ex:
             self.engine.log(ex.args[0], colour.IMPOSSIBLE)
             return False
 
-        self.engine.handle_enemy_turns()
-        self.engine.update_fov()
         return True
 
 
@@ -142,12 +177,19 @@ class MainGameEventHandler(EventHandler):
 
         player = self.engine.player
 
-        if key == tcod.event.K_PERIOD and modifier & tcod.event.KMOD_SHIFT:
+        if (
+            key in (tcod.event.K_PERIOD, tcod.event.K_COMMA)
+            and modifier & tcod.event.KMOD_SHIFT
+        ):
             return TakeStairsAction(player)
 
         if key in MOVE_KEYS:
             dx, dy = MOVE_KEYS[key]
             action = BumpAction(player, dx, dy)
+        elif key == tcod.event.K_o:
+            return self.travel("unexplored")
+        elif key == tcod.event.K_t:
+            return self.travel_to_stairs()
         elif key in WAIT_KEYS:
             action = WaitAction(player)
         elif key == tcod.event.K_ESCAPE:
@@ -167,6 +209,25 @@ class MainGameEventHandler(EventHandler):
 
         return action
 
+    def travel(self, map_name: str) -> EventHandler | None:
+        """Take turns until `Travel` stops. The screen is only redrawn after."""
+        travel = Travel(self.engine, map_name)
+        action = travel.next_action()
+        while action is not None and self.handle_action(action):
+            if not self.engine.player.is_alive:
+                return GameOverEventHandler(self.engine)
+            action = travel.next_action()
+        if self.engine.player.level.requires_level_up:
+            return LevelUpEventHandler(self.engine)
+        return None
+
+    def travel_to_stairs(self) -> EventHandler | None:
+        game_map = self.engine.game_map
+        if not game_map.is_explored(*game_map.downstairs_location):
+            self.engine.log("You haven't found the stairs yet.", colour.IMPOSSIBLE)
+            return None
+        return self.travel("downstairs")
+
 
 class GameOverEventHandler(EventHandler):
     def ev_keydown(self, event: tcod.event.KeyDown) -> Action | None:
@@ -179,12 +240,21 @@ class GameOverEventHandler(EventHandler):
         save = Path("savegame.sav")
         if save.exists():
             save.unlink()
+        shutil.rmtree("savegame.floors", ignore_errors=True)
         raise QuitWithoutSaving()
 
     def ev_quit(self, event: tcod.event.Quit) -> None:
         return self.on_quit()
 
 
+@functools.lru_cache(maxsize=4)
+def history_frame_layer(width: int, height: int) -> tcod.Console:
+    layer = tcod.Console(width, height)
+    layer.draw_frame(0, 0, width, height)
+    layer.print_box(0, 0, width, 1, "┤Message history├", alignment=tcod.CENTER)
+    return layer
+
+
 class HistoryViewer(EventHandler):
     def __init__(self, engine: Engine):
         super().__init__(engine)
@@ -193,22 +263,17 @@ class HistoryViewer(EventHandler):
 
     def on_render(self, console: tcod.Console) -> None:
         super().on_render(console)
-        log_console = tcod.Console(console.width - 6, console.height - 6)
-
-        log_console.draw_frame(0, 0, log_console.width, log_console.height)
-        log_console.print_box(
-            0, 0, log_console.width, 1, "┤Message history├", alignment=tcod.CENTER
-        )
+        log_frame = history_frame_layer(console.width - 6, console.height - 6)
+        log_frame.blit(console, 3, 3)
 
         self.engine.message_log.render_messages(
-            log_console,
-            1,
-            1,
-            log_console.width - 2,
-            log_console.height - 2,
+            console,
+            4,
+            4,
+            log_frame.width - 2,
+            log_frame.height - 2,
             self.engine.message_log.messages[: self.cursor + 1],
         )
-        log_console.blit(console, 3, 3)
 
     def ev_keydown(self, event: tcod.event.KeyDown) -> MainGameEventHandler | None:
         key = event.sym
@@ -254,52 +319,70 @@ class AskUserEventHandler(EventHandler):
 
 
 class InventoryEventHandler(AskUserEventHandler, ABC):
+    """Lists the inventory one stack per row, a page of up to 26 rows at a time."""
+
     title = "<missing title>"
+    page_size = 26
+
+    def __init__(self, engine: Engine):
+        super().__init__(engine)
+        self.page = 0
+
+    def page_rows(self) -> list[Item]:
+        # Stacks may be gone since the page was chosen, e.g. after a drop.
+        self.page = min(self.page, self.page_count - 1)
+        start = self.page * self.page_size
+        end = start + self.page_size
+        return self.engine.player.inventory.rows()[start:end]
+
+    @property
+    def page_count(self) -> int:
+        n_rows = len(self.engine.player.inventory.stacks)
+        return max(1, -(-n_rows // self.page_size))
 
     def on_render(self, console: tcod.Console) -> None:
         super().on_render(console)
-        n_items_inventory = len(self.engine.player.inventory.items)
-        height = max(n_items_inventory + 2, 3)
+        inventory = self.engine.player.inventory
+        rows = self.page_rows()
+        height = max(len(rows) + 2, 3)
 
-        x = 40 if self.engine.player.x <= 30 else 0
+        x = self.panel_x()
         y = 0
         width = len(self.title) + 4
 
-        console.draw_frame(
-            x=x,
-            y=y,
-            width=width,
-            height=height,
-            title=self.title,
-            clear=True,
-            fg=colour.WHITE,
-            bg=colour.BLACK,
-        )
+        render_frame(console, x=x, y=y, width=width, height=height, title=self.title)
 
-        if n_items_inventory > 0:
-            for i, item in enumerate(self.engine.player.inventory.items):
+        if rows:
+            for i, item in enumerate(rows):
                 item_key = chr(ord("a") + i)
                 is_equip = self.engine.player.equipment.item_is_equipped(item)
 
                 item_str = f"({item_key}) {item.name}"
+                count = inventory.count(item)
+                if count > 1:
+                    item_str = f"{item_str} x{count}"
                 if is_equip:
                     item_str = f"{item_str} (E)"
                 console.print(x + 1, y + i + 1, item_str)
         else:
             console.print(x + 1, y + 1, "(Empty)")
 
+        if self.page_count > 1:
+            console.print(x + 1, y + height - 1, f"<{self.page + 1}/{self.page_count}>")
+
     def ev_keydown(self, event: tcod.event.KeyDown) -> ActionOrHandler | None:
-        player = self.engine.player
         key = event.sym
         index = key - tcod.event.K_a
 
-        if 0 <= index <= 26:
-            try:
-                selected = player.inventory.items[index]
-            except IndexError:
+        if key in PAGE_KEYS:
+            self.page = (self.page + PAGE_KEYS[key]) % self.page_count
+            return None
+        if 0 <= index < self.page_size:
+            rows = self.page_rows()
+            if index >= len(rows):
                 self.engine.log("Invalid entry.", colour.INVALID)
                 return None
-            return self.on_item_selected(selected)
+            return self.on_item_selected(rows[index])
         return super().ev_keydown(event)
 
     @abstractmethod
@@ -333,7 +416,7 @@ class SelectIndexHandler(AskUserEventHandler, ABC):
 
     def on_render(self, console: tcod.Console) -> None:
         super().on_render(console)
-        x, y = self.engine.mouse_location
+        x, y = self.engine.camera.to_screen(*self.engine.mouse_location)
         console.tiles_rgb["bg"][x, y] = colour.WHITE
         console.tiles_rgb["fg"][x, y] = colour.WHITE
 
@@ -352,8 +435,9 @@ class SelectIndexHandler(AskUserEventHandler, ABC):
             dx, dy = MOVE_KEYS[key]
             x += dx * modifier
             y += dy * modifier
-            x = max(0, min(x, self.engine.game_map.width - 1))
-            y = max(0, min(y, self.engine.game_map.height - 1))
+            x0, y0, x1, y1 = self.engine.game_map.clip(*self.engine.camera.bounds)
+            x = max(x0, min(x, x1 - 1))
+            y = max(y0, min(y, y1 - 1))
             self.engine.mouse_location = x, y
             return None
         elif key in CONFIRM_KEYS:
@@ -363,9 +447,10 @@ class SelectIndexHandler(AskUserEventHandler, ABC):
     def ev_mousebuttondown(
         self, event: tcod.event.MouseButtonDown
     ) -> ActionOrHandler | None:
-        if self.engine.game_map.in_bounds(*event.tile):
+        location = self.map_location_at(event.tile)
+        if location is not None:
             if event.button == 1:
-                return self.on_index_selected(*event.tile)
+                return self.on_index_selected(*location)
         return super().ev_mousebuttondown(event)
 
     @abstractmethod
@@ -399,7 +484,7 @@ class AreaRangedAttackHandler(SelectIndexHandler):
     def on_render(self, console: tcod.Console) -> None:
         super().on_render(console)
 
-        x, y = self.engine.mouse_location
+        x, y = self.engine.camera.to_screen(*self.engine.mouse_location)
         console.draw_frame(
             x=x - self.radius - 1,
             y=y - self.radius - 1,
@@ -442,21 +527,9 @@ class LevelUpEventHandler(AskUserEventHandler):
     def on_render(self, console: tcod.Console) -> None:
         super().on_render(console)
 
-        if self.engine.player.x <= 30:
-            x = 40
-        else:
-            x = 0
+        x = self.panel_x()
 
-        console.draw_frame(
-            x=x,
-            y=0,
-            width=35,
-            height=8,
-            title=self.TITLE,
-            clear=True,
-            fg=colour.WHITE,
-            bg=colour.BLACK,
-        )
+        render_frame(console, x=x, y=0, width=35, height=8, title=self.TITLE)
 
         console.print(x=x, y=1, string="Congratulations! You level up!")
         console.print(x=x, y=2, string="Select and attribute to increase.")
@@ -471,12 +544,9 @@ class LevelUpEventHandler(AskUserEventHandler):
         index = key - tcod.event.K_a
         player = self.engine.player
 
-        if index == 0:
-            player.level.increase_max_hp()
-        elif index == 1:
-            player.level.increase_power()
-        elif index == 2:
-            player.level.increase_defense()
+        if 0 <= index <= 2:
+            self.engine.action_log.record_level_up(index)
+            player.level.increase_stat(index)
         else:
             self.engine.log("Invalid entry.", colour.INVALID)
             return None
@@ -495,20 +565,11 @@ class CharacterScreenEventHandler(AskUserEventHandler):
     def on_render(self, console: tcod.Console) -> None:
         super().on_render(console)
 
-        x = 40 if self.engine.player.x <= 30 else 0
+        x = self.panel_x()
         y = 0
         width = len(self.TITLE) + 4
 
-        console.draw_frame(
-            x=x,
-            y=y,
-            width=width,
-            height=8,
-            title=self.TITLE,
-            clear=True,
-            fg=colour.WHITE,
-            bg=colour.BLACK,
-        )
+        render_frame(console, x=x, y=y, width=width, height=8, title=self.TITLE)
 
         level = self.engine.player.level
         fighter = self.engine.player.fighter
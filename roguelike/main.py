@@ -1,49 +1,180 @@
-import importlib.resources
+"""The game's main loop, driven by asyncio.
+
+Input polling, rendering, game logic and autosaving are separate tasks. Game logic
+runs on a single worker thread, so that the window keeps responding while a turn
+takes long, e.g. when it builds a new floor or loads a save. Meanwhile, the last
+frame stays on screen with a busy indicator, and input is queued for when the
+turn is over. Autosaves take their snapshot on the logic thread, between turns,
+and are compressed and written on another thread.
+"""
+import asyncio
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
 
 import tcod
 
-from roguelike import colour, exceptions, input_handlers, resources, setup_game
+from roguelike import colour, exceptions, input_handlers, setup_game
+from roguelike.renderer import Renderer, TcodRenderer, load_tileset
+from roguelike.save_file import dump_save, write_save
+
+T = TypeVar("T")
+
+FRAME_INTERVAL = 1 / 60
+"""Seconds between polls for input."""
+BUSY_FRAME_INTERVAL = 0.1
+"""Seconds between frames of the busy indicator."""
+AUTOSAVE_INTERVAL = 60.0
+"""Seconds between autosaves."""
+BUSY_FRAMES = "|/-\\"
+
+
+class GameLoop:
+    def __init__(
+        self,
+        renderer: Renderer,
+        console: tcod.Console,
+        handler: input_handlers.BaseEventHandler,
+    ):
+        self.renderer = renderer
+        self.console = console
+        self.handler = handler
+        self.logic = ThreadPoolExecutor(max_workers=1, thread_name_prefix="logic")
+        self.pending = 0
+        """Jobs queued or running on the logic thread."""
+        self.busy_frame = 0
+
+    async def run(self) -> SystemExit:
+        """Run until the game exits, and return the `SystemExit` it exited with.
+
+        It's returned rather than raised, as asyncio treats a raised `SystemExit` as
+        a crash of the event loop.
+        """
+        # Created here, as they must belong to the running event loop.
+        self.events: asyncio.Queue[tcod.event.Event] = asyncio.Queue()
+        self.redraw = asyncio.Event()
+        self.redraw.set()
+
+        game = asyncio.create_task(self.handle_input())
+        others = [
+            asyncio.create_task(self.poll_input()),
+            asyncio.create_task(self.render()),
+            asyncio.create_task(self.autosave()),
+        ]
+        try:
+            await asyncio.wait([game, *others], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in [game, *others]:
+                task.cancel()
+            self.logic.shutdown()
+
+        for task in others:
+            if task.done() and not task.cancelled():
+                task.result()
+        return game.result()
+
+    @property
+    def busy(self) -> bool:
+        """Whether the game state may be changing, so it must not be drawn."""
+        return self.pending > 0
+
+    async def run_logic(self, function: Callable[..., T], *args: Any) -> T:
+        """Run `function` on the logic thread, animating the busy indicator until
+        it's done. Nothing else may touch the game state meanwhile.
+        """
+        self.pending += 1
+        try:
+            job = asyncio.get_running_loop().run_in_executor(
+                self.logic, function, *args
+            )
+            while not job.done():
+                await asyncio.wait({job}, timeout=BUSY_FRAME_INTERVAL)
+                if not job.done():
+                    self.busy_frame += 1
+                    self.redraw.set()
+            return job.result()
+        finally:
+            self.pending -= 1
+
+    async def poll_input(self) -> None:
+        while True:
+            for event in tcod.event.get():
+                self.renderer.convert_event(event)
+                self.events.put_nowait(event)
+            await asyncio.sleep(FRAME_INTERVAL)
+
+    async def render(self) -> None:
+        while True:
+            await self.redraw.wait()
+            self.redraw.clear()
+            if self.busy:
+                # Draw over the last frame, as the game state may be changing.
+                frame = BUSY_FRAMES[self.busy_frame % len(BUSY_FRAMES)]
+                self.console.print(self.console.width - 1, 0, frame)
+            else:
+                self.console.clear()
+                self.handler.on_render(console=self.console)
+            self.renderer.present(self.console)
+
+    async def handle_input(self) -> SystemExit:
+        while True:
+            events = [await self.events.get()]
+            while not self.events.empty():
+                events.append(self.events.get_nowait())
+            try:
+                await self.run_logic(self.handle_events, events)
+            except SystemExit as exit:
+                return exit
+            self.redraw.set()
+
+    def handle_events(self, events: list[tcod.event.Event]) -> None:
+        # The handler is updated after every event, so that if one of them exits,
+        # the game is saved from the right handler.
+        for event in events:
+            try:
+                self.handler = self.handler.handle_events(event)
+            except Exception:
+                traceback.print_exc()
+                handler = self.handler
+                if isinstance(handler, input_handlers.EventHandler):
+                    handler.engine.log(traceback.format_exc(), colour.ERROR)
+
+    async def autosave(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(AUTOSAVE_INTERVAL)
+            handler = self.handler
+            if (
+                isinstance(handler, input_handlers.EventHandler)
+                and handler.engine.player.is_alive
+            ):
+                data = await self.run_logic(dump_save, handler.engine)
+                await loop.run_in_executor(None, write_save, data, "savegame.sav")
 
 
 def main() -> None:
     screen_width = 80
     screen_height = 50
 
-    with importlib.resources.path(resources, "dejavu10x10_gs_tc.png") as p:
-        tile_set = tcod.tileset.load_tilesheet(p, 32, 8, tcod.tileset.CHARMAP_TCOD)
-
-    handler: input_handlers.BaseEventHandler = setup_game.MainMenu()
-
     with tcod.context.new_terminal(
         screen_width,
         screen_height,
-        tileset=tile_set,
+        tileset=load_tileset(),
         title="Roguelike",
         vsync=True,
     ) as context:
         root_console = tcod.Console(screen_width, screen_height, order="F")
+        game = GameLoop(TcodRenderer(context), root_console, setup_game.MainMenu())
         try:
-            while True:
-                root_console.clear()
-                handler.on_render(console=root_console)
-                context.present(root_console)
-
-                try:
-                    for event in tcod.event.wait():
-                        context.convert_event(event)
-                        handler = handler.handle_events(event)
-                except Exception:
-                    traceback.print_exc()
-                    if isinstance(handler, input_handlers.EventHandler):
-                        handler.engine.log(traceback.format_exc(), colour.ERROR)
+            raise asyncio.run(game.run())
         except exceptions.QuitWithoutSaving:
+            save_replay(game.handler, "savegame.replay")
             raise
         except SystemExit:
-            save_game(handler, "savegame.sav")
+            save_game(game.handler, "savegame.sav")
             raise
         except BaseException:
-            save_game(handler, "savegame.sav")
+            save_game(game.handler, "savegame.sav")
             raise
 
 
@@ -51,6 +182,12 @@ def save_game(handler: input_handlers.BaseEventHandler, filename: str) -> None:
     if isinstance(handler, input_handlers.EventHandler):
         handler.engine.save_as(filename)
         print("Game saved.")
+    save_replay(handler, "savegame.replay")
+
+
+def save_replay(handler: input_handlers.BaseEventHandler, filename: str) -> None:
+    if isinstance(handler, input_handlers.EventHandler):
+        handler.engine.action_log.save(filename)
 
 
 if __name__ == "__main__":
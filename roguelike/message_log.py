@@ -2,11 +2,34 @@ from __future__ import annotations
 
 import textwrap
 from collections.abc import Iterable, Reversible
+from typing import TYPE_CHECKING
 
 import tcod
 
 from roguelike import colour
 from roguelike.colour import RGB
+from roguelike.events import (
+    Attack,
+    ConfusionEnded,
+    Death,
+    EquipmentChanged,
+    EventBus,
+    ItemDropped,
+    ItemPickedUp,
+    ItemUsed,
+    StatIncreased,
+    XPGained,
+)
+
+if TYPE_CHECKING:
+    from roguelike.entity import Actor
+
+
+STAT_INCREASED = {
+    "max_hp": "Your health improves!",
+    "power": "You feel stronger!",
+    "defense": "Your movements are getting swifter!",
+}
 
 
 class Message:
@@ -34,6 +57,67 @@ class MessageLog:
         else:
             self.messages.append(Message(text, fg))
 
+    def subscribe(self, events: EventBus, player: Actor) -> None:
+        """Describe the game events that `player` should read about."""
+        self.player = player
+        events.subscribe(Attack, self.on_attack)
+        events.subscribe(Death, self.on_death)
+        events.subscribe(XPGained, self.on_xp_gained)
+        events.subscribe(ItemUsed, self.on_item_used)
+        events.subscribe(StatIncreased, self.on_stat_increased)
+        events.subscribe(ItemPickedUp, self.on_item_picked_up)
+        events.subscribe(ItemDropped, self.on_item_dropped)
+        events.subscribe(EquipmentChanged, self.on_equipment_changed)
+        events.subscribe(ConfusionEnded, self.on_confusion_ended)
+
+    def on_attack(self, event: Attack) -> None:
+        attack_desc = f"{event.attacker.name.capitalize()} attacks {event.target.name} "
+        if event.damage > 0:
+            attack_desc += f"for {event.damage} hit points"
+        else:
+            attack_desc += "but does no damage"
+
+        if event.attacker is self.player:
+            self.add_message(attack_desc, colour.PLAYER_ATK)
+        else:
+            self.add_message(attack_desc, colour.ENEMY_ATK)
+
+    def on_death(self, event: Death) -> None:
+        if event.actor is self.player:
+            self.add_message("You died!", colour.PLAYER_DIE)
+        else:
+            self.add_message(f"{event.name} is dead!", colour.ENEMY_DIE)
+
+    def on_xp_gained(self, event: XPGained) -> None:
+        level = event.actor.level
+        self.add_message(f"You gained {event.amount} experience points.")
+        if level.requires_level_up:
+            self.add_message(f"You advance to {level.current_level + 1}")
+
+    def on_item_used(self, event: ItemUsed) -> None:
+        consumable = event.item.consumable
+        if consumable is not None:
+            for text, fg in consumable.describe(event):
+                self.add_message(text, fg)
+
+    def on_stat_increased(self, event: StatIncreased) -> None:
+        self.add_message(STAT_INCREASED[event.stat])
+
+    def on_item_picked_up(self, event: ItemPickedUp) -> None:
+        self.add_message(f"You picked up {event.item.name}.")
+
+    def on_item_dropped(self, event: ItemDropped) -> None:
+        self.add_message(f"You dropped the {event.item.name}.")
+
+    def on_equipment_changed(self, event: EquipmentChanged) -> None:
+        if event.equipped:
+            self.add_message(f"You equip the {event.item.name}.")
+        else:
+            self.add_message(f"You remove the {event.item.name}.")
+
+    def on_confusion_ended(self, event: ConfusionEnded) -> None:
+        self.add_message(f"The {event.actor.name} is no longer confused.")
+
     def render(
         self, console: tcod.Console, x: int, y: int, width: int, height: int
     ) -> None:
@@ -0,0 +1,56 @@
+"""Planning of the enemies' turns, before any of them acts.
+
+Every path the enemies need for a turn is planned up front, against the map as it
+is at the end of the player's turn. Only then do the enemies act, in order.
+
+The searches run on the thread that plays the game. A turn's searches are over
+the area between each enemy and the player, which on the maps the game generates
+takes far less than handing them to other threads would. The game loop already
+plays turns off the thread that draws the UI, so a slow turn never blocks it.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from roguelike.components.ai import HostileEnemy, Pack, find_path, path_cost
+from roguelike.distance_maps import distance_field
+
+if TYPE_CHECKING:
+    from roguelike.engine import Engine
+    from roguelike.entity import Actor
+
+
+def plan_turn(engine: Engine, enemies: list[Actor]) -> None:
+    """Plan the paths of the enemies chasing the player, before they act."""
+    game_map = engine.game_map
+    target = engine.player
+
+    pack = Pack.gather(engine, enemies)
+    if pack is not None:
+        bounds = pack.bounds()
+        pack.plan(
+            distance_field(game_map.get_walkable(*bounds), bounds, target.x, target.y)
+        )
+
+    for actor in enemies:
+        ai = actor.ai
+        if not isinstance(ai, HostileEnemy) or not ai.is_chasing:
+            continue
+        if pack is not None and actor in pack.members:
+            continue
+
+        ai.planned = True
+        distance = max(abs(target.x - actor.x), abs(target.y - actor.y))
+        if not ai.follow_target(target.x, target.y, distance):
+            continue
+
+        bounds = game_map.pathing_bounds(actor.x, actor.y, target.x, target.y)
+        ai.path.clear()
+        ai.path.extend(
+            find_path(
+                path_cost(game_map, bounds),
+                bounds[:2],
+                (actor.x, actor.y),
+                (target.x, target.y),
+            )
+        )
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
 import random
-from typing import Iterator
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Iterator
 
+import numpy as np
 import tcod
 
 from roguelike import entity_factories, tile_types
+from roguelike.chunked_map import CHUNK_SIZE, Chunk, ChunkedGameMap
+from roguelike.distance_maps import UNREACHABLE, from_sources, point_mask
 from roguelike.engine import Engine
 from roguelike.entity import Entity
 from roguelike.game_map import GameMap
+from roguelike.types import ndarray
+
+if TYPE_CHECKING:
+    from roguelike.game_map import GameWorld
 
 max_items_by_floor = [
     (1, 1),
@@ -47,6 +55,7 @@ def get_rand_entity(
     floor_weighted_chances: dict[int, list[tuple[Entity, int]]],
     number_of_entities: int,
     floor: int,
+    rng: random.Random,
 ) -> list[Entity]:
     entity_weighted_chances = {}
 
@@ -59,7 +68,7 @@ def get_rand_entity(
     entities = list(entity_weighted_chances.keys())
     entity_weights = list(entity_weighted_chances.values())
 
-    chosen_entities = random.choices(
+    chosen_entities = rng.choices(
         entities, weights=entity_weights, k=number_of_entities
     )
     return chosen_entities
@@ -104,44 +113,44 @@ def generate_dungeon(
     dungeon = GameMap(engine, map_width, map_height, entities=[player])
     rooms: list[RectangularRoom] = []
 
-    centre_of_last_room = (0, 0)
+    current_floor = engine.game_world.current_floor
+    rng = engine.rng
 
     for _ in range(max_rooms):
-        room_width = random.randint(room_min_size, room_max_size)
-        room_height = random.randint(room_min_size, room_max_size)
+        room_width = rng.randint(room_min_size, room_max_size)
+        room_height = rng.randint(room_min_size, room_max_size)
 
-        x = random.randint(0, dungeon.width - room_width - 1)
-        y = random.randint(0, dungeon.height - room_height - 1)
+        x = rng.randint(0, dungeon.width - room_width - 1)
+        y = rng.randint(0, dungeon.height - room_height - 1)
         new_room = RectangularRoom(x, y, room_width, room_height)
         if any(new_room.intersects(other) for other in rooms):
             continue
 
-        dungeon.tiles[new_room.inner] = tile_types.floor
+        dungeon.set_tiles(new_room.inner, tile_types.floor)
 
         if len(rooms) == 0:
             player.place(*new_room.center, game_map=dungeon)
         else:
-            for x, y in tunnel_between(rooms[-1].center, new_room.center):
-                dungeon.tiles[x, y] = tile_types.floor
-            centre_of_last_room = new_room.center
-
-        place_entities(new_room, dungeon, engine.game_world.current_floor)
-
-        dungeon.tiles[centre_of_last_room] = tile_types.downstairs
-        dungeon.downstairs_location = centre_of_last_room
+            for x, y in tunnel_between(rooms[-1].center, new_room.center, rng):
+                dungeon.set_tile(x, y, tile_types.floor)
 
+        place_entities(new_room, dungeon, current_floor, rng)
         rooms.append(new_room)
 
+    if current_floor > 1:
+        dungeon.set_tile(*rooms[0].center, tile_types.upstairs)
+        dungeon.upstairs_location = rooms[0].center
+
     return dungeon
 
 
 def tunnel_between(
-    start: tuple[int, int], end: tuple[int, int]
+    start: tuple[int, int], end: tuple[int, int], rng: random.Random
 ) -> Iterator[tuple[int, int]]:
     x1, y1 = start
     x2, y2 = end
 
-    if random.random() < 0.5:
+    if rng.random() < 0.5:
         corner_x, corner_y = x2, y1
     else:
         corner_x, corner_y = x1, y2
@@ -154,19 +163,579 @@ def tunnel_between(
         yield x, y
 
 
-def place_entities(room: RectangularRoom, dungeon: GameMap, floor_number: int) -> None:
-    n_monsters = random.randint(
+def choose_entities(floor_number: int, rng: random.Random) -> list[Entity]:
+    """Monsters and items for one room's worth of space."""
+    n_monsters = rng.randint(
         0, get_max_value_for_floor(max_monsters_by_floor, floor_number)
     )
-    n_items = random.randint(
-        0, get_max_value_for_floor(max_items_by_floor, floor_number)
+    n_items = rng.randint(0, get_max_value_for_floor(max_items_by_floor, floor_number))
+    monsters: list[Entity] = get_rand_entity(
+        enemy_chances, n_monsters, floor_number, rng
     )
-    monsters: list[Entity] = get_rand_entity(enemy_chances, n_monsters, floor_number)
-    items: list[Entity] = get_rand_entity(item_chances, n_items, floor_number)
+    items: list[Entity] = get_rand_entity(item_chances, n_items, floor_number, rng)
+    return monsters + items
+
+
+def place_entities(
+    room: RectangularRoom,
+    dungeon: GameMap,
+    floor_number: int,
+    rng: random.Random,
+    occupied: set[tuple[int, int]] | None = None,
+) -> None:
+    """Spawn monsters and items in `room`, on tiles without entities.
+
+    Pass the positions of all entities on the map as `occupied` to avoid looking
+    them up for every room. It's updated with the new entities.
+    """
+    if occupied is None:
+        occupied = {(e.x, e.y) for e in dungeon.entities}
+
+    for entity in choose_entities(floor_number, rng):
+        x = rng.randint(room.x1 + 1, room.x2 - 1)
+        y = rng.randint(room.y1 + 1, room.y2 - 1)
+
+        if (x, y) not in occupied:
+            entity.spawn(dungeon, x, y)
+            occupied.add((x, y))
+
+
+class ChunkGenerator:
+    """Generates the chunks of a `ChunkedGameMap` as small rooms-and-corridors maps.
+
+    Each chunk is seeded from its coordinates, and has corridors reaching the middle
+    of every edge shared with another chunk, so neighbouring chunks always connect.
+    """
+
+    def __init__(
+        self,
+        *,
+        seed: int,
+        floor: int,
+        max_rooms: int,
+        room_min_size: int,
+        room_max_size: int,
+    ):
+        self.seed = seed
+        self.floor = floor
+        self.max_rooms = max_rooms
+        self.room_min_size = room_min_size
+        self.room_max_size = room_max_size
+
+    def rng_for(self, cx: int, cy: int) -> random.Random:
+        return random.Random(f"{self.seed}:{cx}:{cy}")
+
+    def carve(
+        self, game_map: ChunkedGameMap, cx: int, cy: int, rng: random.Random
+    ) -> tuple[ndarray, list[RectangularRoom]]:
+        """Carve the tiles of chunk (cx, cy). Rooms are given in map coordinates."""
+        size = CHUNK_SIZE
+        ox, oy = cx * size, cy * size
+        width = min(size, game_map.width - ox)
+        height = min(size, game_map.height - oy)
+
+        tiles = np.full(
+            (size, size), fill_value=tile_types.wall, dtype=np.uint8, order="F"
+        )
+        rooms: list[RectangularRoom] = []
+
+        def dig(x: int, y: int) -> None:
+            tiles[x - ox, y - oy] = tile_types.floor
+
+        for _ in range(self.max_rooms):
+            room_width = rng.randint(self.room_min_size, self.room_max_size)
+            room_height = rng.randint(self.room_min_size, self.room_max_size)
+            if room_width + 1 >= width or room_height + 1 >= height:
+                continue
+
+            x = ox + rng.randint(0, width - room_width - 1)
+            y = oy + rng.randint(0, height - room_height - 1)
+            new_room = RectangularRoom(x, y, room_width, room_height)
+            if any(new_room.intersects(other) for other in rooms):
+                continue
+
+            inner_x, inner_y = new_room.inner
+            tiles[
+                slice(inner_x.start - ox, inner_x.stop - ox),
+                slice(inner_y.start - oy, inner_y.stop - oy),
+            ] = tile_types.floor
+
+            if rooms:
+                for x, y in tunnel_between(rooms[-1].center, new_room.center, rng):
+                    dig(x, y)
+            rooms.append(new_room)
+
+        hub = rooms[0].center if rooms else (ox + width // 2, oy + height // 2)
+        connectors = []
+        if ox > 0:
+            connectors.append((ox, oy + size // 2))
+        if oy > 0:
+            connectors.append((ox + size // 2, oy))
+        if ox + size < game_map.width:
+            connectors.append((ox + size - 1, oy + size // 2))
+        if oy + size < game_map.height:
+            connectors.append((ox + size // 2, oy + size - 1))
+        for connector in connectors:
+            for x, y in tunnel_between(hub, connector, rng):
+                dig(x, y)
+
+        return tiles, rooms
+
+    def generate(self, game_map: ChunkedGameMap, cx: int, cy: int) -> ndarray:
+        rng = self.rng_for(cx, cy)
+        tiles, rooms = self.carve(game_map, cx, cy, rng)
+        for room in rooms:
+            place_entities(room, game_map, self.floor, rng)
+        return tiles
+
+
+def generate_chunked_dungeon(
+    *,
+    map_width: int,
+    map_height: int,
+    max_rooms: int,
+    room_min_size: int,
+    room_max_size: int,
+    engine: Engine,
+) -> ChunkedGameMap:
+    """Create a map too large to hold in memory, with chunks made on demand.
 
-    for entity in monsters + items:
-        x = random.randint(room.x1 + 1, room.x2 - 1)
-        y = random.randint(room.y1 + 1, room.y2 - 1)
+    Evicted chunks are written next to the floors of the game, if they are written
+    to a directory.
+    """
+    player = engine.player
+    current_floor = engine.game_world.current_floor
+    floors_directory = engine.game_world.floors.directory
+    generator = ChunkGenerator(
+        seed=engine.rng.getrandbits(32),
+        floor=current_floor,
+        max_rooms=max_rooms,
+        room_min_size=room_min_size,
+        room_max_size=room_max_size,
+    )
+    dungeon = ChunkedGameMap(
+        engine,
+        map_width,
+        map_height,
+        generator=generator,
+        entities=[player],
+        directory=(
+            None
+            if floors_directory is None
+            else floors_directory / f"chunks-{current_floor}"
+        ),
+    )
 
-        if not any((e.x, e.y) == (x, y) for e in dungeon.entities):
-            entity.spawn(dungeon, x, y)
+    # The starting chunk is built by hand so the player's room stays empty.
+    cx, cy = map_width // 2 // CHUNK_SIZE, map_height // 2 // CHUNK_SIZE
+    rng = generator.rng_for(cx, cy)
+    tiles, rooms = generator.carve(dungeon, cx, cy, rng)
+    dungeon.chunks[cx, cy] = Chunk(tiles)
+
+    start = rooms[0].center if rooms else (cx * CHUNK_SIZE, cy * CHUNK_SIZE)
+    player.place(*start, game_map=dungeon)
+    for room in rooms[1:]:
+        place_entities(room, dungeon, current_floor, rng)
+
+    if len(rooms) > 1:
+        dungeon.downstairs_location = rooms[-1].center
+        dungeon.set_tile(*rooms[-1].center, tile_types.downstairs)
+    if current_floor > 1:
+        dungeon.upstairs_location = start
+        dungeon.set_tile(*start, tile_types.upstairs)
+
+    return dungeon
+
+
+def carve_tunnel(
+    dungeon: GameMap, start: tuple[int, int], end: tuple[int, int], rng: random.Random
+) -> None:
+    """Carve an L-shaped corridor, like `tunnel_between`, one slice per leg."""
+    (x1, y1), (x2, y2) = start, end
+    if rng.random() < 0.5:
+        corner = x2, y1
+    else:
+        corner = x1, y2
+
+    for (ax, ay), (bx, by) in ((start, corner), (corner, end)):
+        leg = slice(min(ax, bx), max(ax, bx) + 1), slice(min(ay, by), max(ay, by) + 1)
+        dungeon.set_tiles(leg, tile_types.floor)
+
+
+def count_neighbours(mask: ndarray) -> ndarray:
+    """Number of set cells in the 3x3 neighbourhood of each cell, itself included.
+
+    Cells beyond the edges of `mask` count as set.
+    """
+    width, height = mask.shape
+    padded = np.pad(mask, 1, constant_values=True).astype(np.uint8)
+    counts = np.zeros((width, height), dtype=np.uint8, order="F")
+    for dx in range(3):
+        for dy in range(3):
+            counts += padded[slice(dx, dx + width), slice(dy, dy + height)]
+    return counts
+
+
+# Disconnected floor regions smaller than this are filled in rather than connected.
+MIN_REGION_SIZE = 20
+
+
+def distance_map(walkable: ndarray, start: tuple[int, int]) -> ndarray:
+    """Walking distance from `start`, with the costs used for pathfinding.
+
+    Cells that can't be reached are set to `UNREACHABLE`.
+    """
+    width, height = walkable.shape
+    return from_sources(walkable, point_mask(*start, (0, 0, width, height)))
+
+
+def reachable_from(walkable: ndarray, start: tuple[int, int]) -> ndarray:
+    """Mask of the walkable cells that can be reached from `start`."""
+    reachable: ndarray = distance_map(walkable, start) != UNREACHABLE
+    return reachable
+
+
+def label_regions(walkable: ndarray) -> ndarray:
+    """Label each region of walkable cells connected in any of the eight directions.
+
+    A region's label is the flat index of its first cell, in C order. Cells that
+    aren't walkable are labelled -1.
+    """
+    width, height = walkable.shape
+    index = np.arange(width * height).reshape(width, height)
+    firsts, seconds = [], []
+    for dx, dy in ((1, 0), (0, 1), (1, 1), (1, -1)):
+        first = slice(0, width - dx), slice(max(0, -dy), height - max(0, dy))
+        second = slice(dx, width), slice(max(0, dy), height - max(0, -dy))
+        linked = walkable[first] & walkable[second]
+        firsts.append(index[first][linked])
+        seconds.append(index[second][linked])
+    a, b = np.concatenate(firsts), np.concatenate(seconds)
+
+    # Hook the larger root of every link onto the smaller one, then flatten the
+    # trees, until every link is within a single tree.
+    parent = index.ravel()
+    while True:
+        root_a, root_b = parent[a], parent[b]
+        apart = root_a != root_b
+        if not apart.any():
+            break
+        a, b, root_a, root_b = a[apart], b[apart], root_a[apart], root_b[apart]
+        np.minimum.at(parent, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+        while not np.array_equal(grandparent := parent[parent], parent):
+            parent = grandparent
+
+    labels: ndarray = np.where(walkable, parent.reshape(width, height), -1)
+    return labels
+
+
+def connect_regions(dungeon: GameMap, start: tuple[int, int]) -> ndarray:
+    """Make every floor tile reachable from `start`, and return its distance map.
+
+    Regions that can't be reached are filled in, with their entities, if they're
+    smaller than `MIN_REGION_SIZE`. Every other one is connected by a corridor from
+    its tile closest to the start's region. All the corridors follow a single flood
+    from that region, so they join up rather than each going all the way.
+    """
+    walkable = dungeon.walkable
+    labels = label_regions(walkable)
+    start_label = labels[start]
+    sizes = np.bincount(labels[walkable])
+    stranded = walkable & (labels != start_label)
+
+    small = stranded & (sizes[np.maximum(labels, 0)] < MIN_REGION_SIZE)
+    if small.any():
+        dungeon.set_tiles(small, tile_types.wall)
+        dungeon.entities.difference_update(
+            [e for e in dungeon.entities if small[e.x, e.y]]
+        )
+        stranded &= ~small
+
+    if stranded.any():
+        # Cardinal steps through anything, so corridors can be walked and dug.
+        flood = np.full(walkable.shape, UNREACHABLE, dtype=np.int32, order="F")
+        flood[labels == start_label] = 0
+        tcod.path.dijkstra2d(flood, np.ones(walkable.shape, np.int8), 1, 0, out=flood)
+
+        xs, ys = np.nonzero(stranded)
+        order = np.lexsort((flood[xs, ys], labels[xs, ys]))
+        region_labels = labels[xs[order], ys[order]]
+        closest = order[np.r_[True, region_labels[1:] != region_labels[:-1]]]
+        corridors = np.zeros(walkable.shape, dtype=bool, order="F")
+        for x, y in zip(xs[closest], ys[closest]):
+            path = tcod.path.hillclimb2d(flood, (x, y), True, False)
+            corridors[tuple(path.T)] = True
+        dungeon.set_tiles(corridors & ~walkable, tile_types.floor)
+
+    return distance_map(dungeon.walkable, start)
+
+
+def place_downstairs(dungeon: GameMap, distance: ndarray) -> None:
+    """Put the down stairs on the reachable tile furthest from the start."""
+    old_x, old_y = dungeon.downstairs_location
+    if dungeon.tiles[old_x, old_y] == tile_types.downstairs:
+        dungeon.set_tile(old_x, old_y, tile_types.floor)
+
+    furthest = np.where(distance == UNREACHABLE, -1, distance)
+    x, y = np.unravel_index(np.argmax(furthest), furthest.shape)
+    dungeon.downstairs_location = int(x), int(y)
+    dungeon.set_tile(int(x), int(y), tile_types.downstairs)
+
+
+def build_floor(
+    generator: DungeonGenerator, engine: Engine, width: int, height: int
+) -> GameMap:
+    """Generate a floor, then make sure all of it can be reached from the player's
+    position, with the down stairs as far from it as possible.
+    """
+    dungeon = generator.generate(engine, width, height)
+    if isinstance(dungeon, ChunkedGameMap):
+        # Chunks connect to their neighbours as they are made, and come with stairs.
+        return dungeon
+    player = engine.player
+    distance = connect_regions(dungeon, (player.x, player.y))
+    place_downstairs(dungeon, distance)
+    return dungeon
+
+
+def reflect(positions: ndarray, low: int, high: int) -> ndarray:
+    """Fold positions into [low, high], as if they bounced off both ends."""
+    period = 2 * (high - low)
+    offset = (positions - low) % period
+    folded: ndarray = low + np.where(offset > high - low, period - offset, offset)
+    return folded
+
+
+class DungeonGenerator(ABC):
+    """Makes the map of a new floor, with the player, monsters, items and up stairs.
+
+    Use `build_floor` to also connect the map and place the down stairs.
+    """
+
+    @abstractmethod
+    def generate(self, engine: Engine, width: int, height: int) -> GameMap:
+        ...
+
+
+class RoomsGenerator(DungeonGenerator):
+    """Random rectangular rooms joined by L-shaped corridors."""
+
+    def __init__(self, *, max_rooms: int, room_min_size: int, room_max_size: int):
+        self.max_rooms = max_rooms
+        self.room_min_size = room_min_size
+        self.room_max_size = room_max_size
+
+    def generate(self, engine: Engine, width: int, height: int) -> GameMap:
+        return generate_dungeon(
+            max_rooms=self.max_rooms,
+            room_min_size=self.room_min_size,
+            room_max_size=self.room_max_size,
+            map_width=width,
+            map_height=height,
+            engine=engine,
+        )
+
+
+class ChunkedGenerator(DungeonGenerator):
+    """A `ChunkedGameMap` of `width` x `height`, whatever the size of other floors,
+    whose chunks are small rooms-and-corridors maps made as the player nears them.
+    """
+
+    def __init__(
+        self,
+        *,
+        width: int = 10_000,
+        height: int = 10_000,
+        max_rooms: int = 6,
+        room_min_size: int = 5,
+        room_max_size: int = 9,
+    ):
+        self.width = width
+        self.height = height
+        self.max_rooms = max_rooms
+        self.room_min_size = room_min_size
+        self.room_max_size = room_max_size
+
+    def generate(self, engine: Engine, width: int, height: int) -> GameMap:
+        return generate_chunked_dungeon(
+            map_width=self.width,
+            map_height=self.height,
+            max_rooms=self.max_rooms,
+            room_min_size=self.room_min_size,
+            room_max_size=self.room_max_size,
+            engine=engine,
+        )
+
+
+def finish_rooms_map(
+    dungeon: GameMap, rooms: list[RectangularRoom], rng: random.Random
+) -> None:
+    """Place the player in the first room and fill them all."""
+    engine = dungeon.engine
+    current_floor = engine.game_world.current_floor
+
+    engine.player.place(*rooms[0].center, game_map=dungeon)
+    occupied = {rooms[0].center}
+    for room in rooms:
+        place_entities(room, dungeon, current_floor, rng, occupied)
+
+    if current_floor > 1:
+        dungeon.upstairs_location = rooms[0].center
+        dungeon.set_tile(*rooms[0].center, tile_types.upstairs)
+
+
+CELLS_PER_AREA = 100
+
+
+def finish_open_map(
+    dungeon: GameMap, start: tuple[int, int], rng: random.Random
+) -> None:
+    """Place the player at `start` and fill a map without rooms.
+
+    Monsters and items are placed as if every `CELLS_PER_AREA` floor cells were a
+    room.
+    """
+    engine = dungeon.engine
+    current_floor = engine.game_world.current_floor
+    engine.player.place(*start, game_map=dungeon)
+
+    cells = np.argwhere(dungeon.walkable)
+    occupied = {start}
+    for _ in range(max(1, len(cells) // CELLS_PER_AREA)):
+        for entity in choose_entities(current_floor, rng):
+            x, y = (int(i) for i in cells[rng.randrange(len(cells))])
+            if (x, y) not in occupied:
+                entity.spawn(dungeon, x, y)
+                occupied.add((x, y))
+
+    if current_floor > 1:
+        dungeon.upstairs_location = start
+        dungeon.set_tile(*start, tile_types.upstairs)
+
+
+class BSPGenerator(DungeonGenerator):
+    """Rooms in the leaves of a binary space partition, joined along the tree."""
+
+    def __init__(self, *, min_leaf_size: int = 10, room_min_size: int = 5):
+        assert room_min_size < min_leaf_size
+        self.min_leaf_size = min_leaf_size
+        self.room_min_size = room_min_size
+
+    def generate(self, engine: Engine, width: int, height: int) -> GameMap:
+        dungeon = GameMap(engine, width, height, entities=[engine.player])
+        rooms: list[RectangularRoom] = []
+        self.split(dungeon, RectangularRoom(0, 0, width - 1, height - 1), rooms)
+        finish_rooms_map(dungeon, rooms, engine.rng)
+        return dungeon
+
+    def split(
+        self, dungeon: GameMap, area: RectangularRoom, rooms: list[RectangularRoom]
+    ) -> RectangularRoom:
+        """Carve the rooms in `area`, and return one of them to connect it by."""
+        rng = dungeon.engine.rng
+        width, height = area.x2 - area.x1, area.y2 - area.y1
+        can_split_x = width >= 2 * self.min_leaf_size
+        can_split_y = height >= 2 * self.min_leaf_size
+
+        if not (can_split_x or can_split_y):
+            room_width = rng.randint(self.room_min_size, width)
+            room_height = rng.randint(self.room_min_size, height)
+            x = rng.randint(area.x1, area.x2 - room_width)
+            y = rng.randint(area.y1, area.y2 - room_height)
+            room = RectangularRoom(x, y, room_width, room_height)
+            dungeon.set_tiles(room.inner, tile_types.floor)
+            rooms.append(room)
+            return room
+
+        if can_split_x and (not can_split_y or rng.random() < width / (width + height)):
+            at = rng.randint(area.x1 + self.min_leaf_size, area.x2 - self.min_leaf_size)
+            first = RectangularRoom(area.x1, area.y1, at - area.x1, height)
+            second = RectangularRoom(at, area.y1, area.x2 - at, height)
+        else:
+            at = rng.randint(area.y1 + self.min_leaf_size, area.y2 - self.min_leaf_size)
+            first = RectangularRoom(area.x1, area.y1, width, at - area.y1)
+            second = RectangularRoom(area.x1, at, width, area.y2 - at)
+
+        a = self.split(dungeon, first, rooms)
+        b = self.split(dungeon, second, rooms)
+        carve_tunnel(dungeon, a.center, b.center, rng)
+        return a if rng.random() < 0.5 else b
+
+
+class CaveGenerator(DungeonGenerator):
+    """Caves grown by a cellular automaton from random noise.
+
+    A cell becomes a wall if most of its 3x3 neighbourhood is walls. Caves not
+    connected to the player's start are filled in.
+    """
+
+    def __init__(self, *, wall_chance: float = 0.45, iterations: int = 4):
+        self.wall_chance = wall_chance
+        self.iterations = iterations
+
+    def generate(self, engine: Engine, width: int, height: int) -> GameMap:
+        rng = engine.rng
+        noise = np.random.default_rng(rng.getrandbits(64))
+        wall = noise.random((width, height)) < self.wall_chance
+        for _ in range(self.iterations):
+            wall = count_neighbours(wall) >= 5
+        wall[[0, -1], :] = True
+        wall[:, [0, -1]] = True
+
+        # Start from the open cell closest to the middle of the map.
+        cells = np.argwhere(~wall)
+        middle = width // 2, height // 2
+        start_x, start_y = cells[np.argmin(((cells - middle) ** 2).sum(axis=1))]
+        start = int(start_x), int(start_y)
+
+        dungeon = GameMap(engine, width, height, entities=[engine.player])
+        dungeon.set_tiles(reachable_from(~wall, start), tile_types.floor)
+        finish_open_map(dungeon, start, rng)
+        return dungeon
+
+
+class DrunkardsWalkGenerator(DungeonGenerator):
+    """Tunnels dug by a random walk, until `coverage` of the map is floor.
+
+    The walk is simulated in batches of steps with NumPy, bouncing off the edges.
+    """
+
+    def __init__(self, *, coverage: float = 0.4):
+        self.coverage = coverage
+
+    def generate(self, engine: Engine, width: int, height: int) -> GameMap:
+        rng = engine.rng
+        noise = np.random.default_rng(rng.getrandbits(64))
+        directions = np.array([(1, 0), (-1, 0), (0, 1), (0, -1)])
+
+        floor = np.zeros((width, height), dtype=bool, order="F")
+        start = x, y = width // 2, height // 2
+        floor[start] = True
+        target = int(self.coverage * (width - 2) * (height - 2))
+        carved = 1
+        while carved < target:
+            steps = directions[noise.integers(0, 4, size=max(1024, target - carved))]
+            path = np.cumsum(steps, axis=0) + (x, y)
+            xs = reflect(path[:, 0], 1, width - 2)
+            ys = reflect(path[:, 1], 1, height - 2)
+            floor[xs, ys] = True
+            x, y = int(xs[-1]), int(ys[-1])
+            carved = np.count_nonzero(floor)
+
+        dungeon = GameMap(engine, width, height, entities=[engine.player])
+        dungeon.set_tiles(floor, tile_types.floor)
+        finish_open_map(dungeon, start, rng)
+        return dungeon
+
+
+def default_generator(world: GameWorld, floor: int) -> DungeonGenerator:
+    """Rooms and corridors, as every floor had before there were other generators.
+
+    The others are opt-in, through `GameWorld.generators`, as they change how the
+    game plays and the draws from the seeded RNG.
+    """
+    return RoomsGenerator(
+        max_rooms=world.max_rooms,
+        room_min_size=world.room_min_size,
+        room_max_size=world.room_max_size,
+    )
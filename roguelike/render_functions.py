@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 from typing import TYPE_CHECKING
 
 from tcod import Console
@@ -11,12 +12,45 @@ if TYPE_CHECKING:
     from roguelike.game_map import GameMap
 
 
+@functools.lru_cache(maxsize=64)
+def frame_layer(width: int, height: int, title: str = "") -> Console:
+    """Pre-render a cleared, framed panel into an off-screen console.
+
+    Layers are shared between callers, so they must only be blitted, never drawn on.
+    """
+    layer = Console(width, height, order="F")
+    layer.draw_frame(
+        x=0,
+        y=0,
+        width=width,
+        height=height,
+        title=title,
+        clear=True,
+        fg=colour.WHITE,
+        bg=colour.BLACK,
+    )
+    return layer
+
+
+def render_frame(
+    console: Console, x: int, y: int, width: int, height: int, title: str = ""
+) -> None:
+    frame_layer(width, height, title).blit(console, x, y)
+
+
+@functools.lru_cache(maxsize=8)
+def bar_layer(width: int) -> Console:
+    layer = Console(width, 1, order="F")
+    layer.draw_rect(x=0, y=0, width=width, height=1, ch=1, bg=colour.BAR_EMPTY)
+    return layer
+
+
 def render_bar(
     console: Console, current_value: int, max_value: int, total_width: int
 ) -> None:
     bar_width = int(current_value / max_value * total_width)
 
-    console.draw_rect(x=0, y=45, width=20, height=1, ch=1, bg=colour.BAR_EMPTY)
+    bar_layer(20).blit(console, 0, 45)
 
     if bar_width > 0:
         console.draw_rect(
@@ -29,7 +63,7 @@ def render_bar(
 
 
 def get_names_at(game_map: GameMap, x: int, y: int) -> str:
-    if not game_map.in_bounds(x, y) or not game_map.visible[x, y]:
+    if not game_map.in_bounds(x, y) or not game_map.is_visible(x, y):
         return ""
 
     names = ", ".join(e.name for e in game_map.entities if (e.x, e.y) == (x, y))
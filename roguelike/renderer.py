@@ -0,0 +1,113 @@
+"""Backends that present finished frames.
+
+Everything is drawn into a `tcod.Console`, which is only a NumPy array of glyphs
+and colours. A renderer decides what happens to the frame once it's done: the
+tcod backend shows it in a window, while `FrameBuffer` keeps it in memory, where
+it can be compared, hashed or saved as a PNG without SDL.
+"""
+from __future__ import annotations
+
+import hashlib
+import importlib.resources
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+import tcod
+
+from roguelike import resources
+from roguelike.types import ndarray
+
+
+def load_tileset() -> tcod.tileset.Tileset:
+    with importlib.resources.path(resources, "dejavu10x10_gs_tc.png") as p:
+        return tcod.tileset.load_tilesheet(p, 32, 8, tcod.tileset.CHARMAP_TCOD)
+
+
+def write_png(path: str | Path, image: ndarray) -> None:
+    """Write an RGBA image, of shape (height, width, 4), as a PNG file."""
+    height, width, _ = image.shape
+    # Every row starts with its filter type, 0 for none.
+    rows = np.concatenate(
+        [np.zeros((height, 1), dtype=np.uint8), image.reshape(height, -1)], axis=1
+    )
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        checksum = zlib.crc32(kind + data)
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", checksum)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    Path(path).write_bytes(
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(rows.tobytes()))
+        + chunk(b"IEND", b"")
+    )
+
+
+class Renderer(ABC):
+    @abstractmethod
+    def present(self, console: tcod.Console) -> None:
+        ...
+
+    def convert_event(self, event: tcod.event.Event) -> None:
+        """Convert the pixel coordinates of mouse events to console tiles."""
+
+
+class TcodRenderer(Renderer):
+    """Shows frames in the window of a tcod context."""
+
+    def __init__(self, context: tcod.context.Context):
+        self.context = context
+
+    def present(self, console: tcod.Console) -> None:
+        self.context.present(console)
+
+    def convert_event(self, event: tcod.event.Event) -> None:
+        self.context.convert_event(event)
+
+
+class FrameBuffer(Renderer):
+    """Keeps the last two frames in memory, without any window.
+
+    Frames are copies of `tcod.Console.rgb`: a glyph, a foreground and a background
+    colour for each cell, indexed by [x, y].
+    """
+
+    def __init__(self) -> None:
+        self.frame: ndarray | None = None
+        self.previous: ndarray | None = None
+        self.frames_presented = 0
+
+    def present(self, console: tcod.Console) -> None:
+        self.previous = self.frame
+        self.frame = console.rgb.copy()
+        self.frames_presented += 1
+
+    def last_frame(self) -> ndarray:
+        assert self.frame is not None, "No frame was presented yet."
+        return self.frame
+
+    def changed(self) -> ndarray:
+        """Mask of the cells that changed since the previous frame."""
+        frame = self.last_frame()
+        if self.previous is None or self.previous.shape != frame.shape:
+            return np.full(frame.shape, fill_value=True)
+        changed: ndarray = frame != self.previous
+        return changed
+
+    def digest(self) -> str:
+        """Hash of the last frame, to compare it against a known good one."""
+        return hashlib.sha256(self.last_frame().tobytes()).hexdigest()
+
+    def save_png(
+        self, path: str | Path, tileset: tcod.tileset.Tileset | None = None
+    ) -> None:
+        """Draw the last frame with `tileset`, by default the game's, into a PNG."""
+        frame = self.last_frame()
+        width, height = frame.shape
+        console = tcod.Console(width, height, order="F")
+        console.rgb[...] = frame
+        write_png(path, (tileset or load_tileset()).render(console))
@@ -0,0 +1,287 @@
+"""Recording of player actions, and deterministic headless re-simulation of games.
+
+A game is fully determined by its seed and the player's inputs, so the `ActionLog`
+stores just those, in a compact binary format. `Replay` re-drives an `Engine` from
+a log as fast as possible, with snapshots to seek to any step.
+
+Run with `python -m roguelike.replay savegame.replay`. With `--spectate`, the game
+is played at a watchable pace and streamed to `python -m roguelike.spectate`.
+"""
+from __future__ import annotations
+
+import argparse
+import pickle
+import struct
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Sequence
+
+from roguelike import colour
+from roguelike.actions import (
+    Action,
+    BumpAction,
+    DropItem,
+    EquipAction,
+    ItemAction,
+    PickupAction,
+    TakeStairsAction,
+    WaitAction,
+)
+from roguelike.exceptions import ImpossibleActionError
+
+if TYPE_CHECKING:
+    from roguelike.engine import Engine
+    from roguelike.entity import Actor
+
+MAGIC = b"RLRP"
+VERSION = 2
+HEADER = struct.Struct("<4sBQ")
+
+OP_WAIT = 0
+OP_BUMP = 1
+OP_PICKUP = 2
+OP_ITEM = 3
+OP_DROP = 4
+OP_EQUIP = 5
+OP_STAIRS = 6
+OP_LEVEL_UP = 7
+
+# Every record starts with its opcode, followed by the opcode's arguments.
+RECORD_FORMATS = {
+    OP_WAIT: struct.Struct("<B"),
+    OP_BUMP: struct.Struct("<Bbb"),
+    OP_PICKUP: struct.Struct("<B"),
+    OP_ITEM: struct.Struct("<BHii"),
+    OP_DROP: struct.Struct("<BH"),
+    OP_EQUIP: struct.Struct("<BH"),
+    OP_STAIRS: struct.Struct("<B"),
+    OP_LEVEL_UP: struct.Struct("<BB"),
+}
+
+Record = tuple[int, ...]
+
+
+def encode_action(action: Action) -> bytes:
+    """Encode an action by the player. Items are stored as inventory indices."""
+    if isinstance(action, BumpAction):
+        return RECORD_FORMATS[OP_BUMP].pack(OP_BUMP, action.dx, action.dy)
+    if isinstance(action, WaitAction):
+        return RECORD_FORMATS[OP_WAIT].pack(OP_WAIT)
+    if isinstance(action, PickupAction):
+        return RECORD_FORMATS[OP_PICKUP].pack(OP_PICKUP)
+    if isinstance(action, TakeStairsAction):
+        return RECORD_FORMATS[OP_STAIRS].pack(OP_STAIRS)
+
+    inventory = action.entity.inventory
+    if isinstance(action, DropItem):
+        return RECORD_FORMATS[OP_DROP].pack(OP_DROP, inventory.index(action.item))
+    if isinstance(action, EquipAction):
+        return RECORD_FORMATS[OP_EQUIP].pack(OP_EQUIP, inventory.index(action.item))
+    if isinstance(action, ItemAction):
+        return RECORD_FORMATS[OP_ITEM].pack(
+            OP_ITEM, inventory.index(action.item), *action.target_xy
+        )
+    raise TypeError(f"Can't record action of type {type(action).__name__}")
+
+
+def check_record(record: Sequence[int]) -> Record:
+    """Check that `record` could have been recorded by an `ActionLog`, and return it.
+
+    Raises `ValueError` if it couldn't, e.g. if it has the wrong number of arguments
+    or a bump moves more than one tile.
+    """
+    if not record or record[0] not in RECORD_FORMATS:
+        raise ValueError(f"Unknown opcode in record: {list(record)}")
+    opcode = record[0]
+    try:
+        RECORD_FORMATS[opcode].pack(*record)
+    except struct.error as ex:
+        raise ValueError(f"Invalid record {list(record)}: {ex}") from ex
+
+    if opcode == OP_BUMP and not all(-1 <= d <= 1 for d in record[1:]):
+        raise ValueError("A bump moves at most one tile in each direction.")
+    if opcode == OP_LEVEL_UP and record[1] not in range(3):
+        raise ValueError(f"Invalid level up choice: {record[1]}")
+    return tuple(record)
+
+
+def decode_action(player: Actor, record: Record) -> Action:
+    opcode, *args = record
+    inventory = player.inventory
+    if opcode == OP_BUMP:
+        return BumpAction(player, args[0], args[1])
+    if opcode == OP_WAIT:
+        return WaitAction(player)
+    if opcode == OP_PICKUP:
+        return PickupAction(player)
+    if opcode == OP_STAIRS:
+        return TakeStairsAction(player)
+    if opcode == OP_DROP:
+        return DropItem(player, inventory.item_at(args[0]))
+    if opcode == OP_EQUIP:
+        return EquipAction(player, inventory.item_at(args[0]))
+    if opcode == OP_ITEM:
+        return ItemAction(player, inventory.item_at(args[0]), (args[1], args[2]))
+    raise ValueError(f"Unknown opcode: {opcode}")
+
+
+class ActionLog:
+    """The seed of a game and every input of its player, in order."""
+
+    def __init__(self, seed: int):
+        self.seed = seed
+        self.data = bytearray()
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def record(self, action: Action) -> None:
+        """Record an action before it's performed, as it may consume its item."""
+        self.data += encode_action(action)
+        self.length += 1
+
+    def record_level_up(self, choice: int) -> None:
+        self.data += RECORD_FORMATS[OP_LEVEL_UP].pack(OP_LEVEL_UP, choice)
+        self.length += 1
+
+    def records(self) -> Iterator[Record]:
+        offset = 0
+        while offset < len(self.data):
+            record_format = RECORD_FORMATS[self.data[offset]]
+            yield record_format.unpack_from(self.data, offset)
+            offset += record_format.size
+
+    def to_bytes(self) -> bytes:
+        return HEADER.pack(MAGIC, VERSION, self.seed) + bytes(self.data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> ActionLog:
+        magic, version, seed = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a replay file, or from an unsupported version.")
+        header_size = HEADER.size
+        log = cls(seed)
+        log.data = bytearray(data[header_size:])
+        log.length = sum(1 for _ in log.records())
+        return log
+
+    def save(self, filename: str | Path) -> None:
+        Path(filename).write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, filename: str | Path) -> ActionLog:
+        return cls.from_bytes(Path(filename).read_bytes())
+
+
+def apply_record(engine: Engine, record: Record) -> None:
+    """Replay one input the same way the event handlers would have handled it."""
+    if record[0] == OP_LEVEL_UP:
+        engine.player.level.increase_stat(record[1])
+        return
+
+    try:
+        engine.play_turn(decode_action(engine.player, record))
+    except ImpossibleActionError as ex:
+        engine.log(ex.args[0], colour.IMPOSSIBLE)
+
+
+class Replay:
+    """Re-simulates a recorded game, headlessly.
+
+    A snapshot of the engine is kept every `snapshot_interval` steps, so seeking
+    only needs to re-simulate from the nearest snapshot before the target. The
+    message log is only written if `headless` is false.
+    """
+
+    def __init__(
+        self, log: ActionLog, snapshot_interval: int = 500, headless: bool = True
+    ):
+        from roguelike.setup_game import new_game
+
+        self.records = list(log.records())
+        self.snapshot_interval = snapshot_interval
+        self.engine = new_game(seed=log.seed, floors_directory=None, headless=headless)
+        self.step = 0
+        self.snapshots = {0: pickle.dumps(self.engine)}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def advance(self) -> None:
+        apply_record(self.engine, self.records[self.step])
+        self.step += 1
+        if self.step % self.snapshot_interval == 0 and self.step not in self.snapshots:
+            self.snapshots[self.step] = pickle.dumps(self.engine)
+
+    def seek(self, step: int) -> Engine:
+        """Bring the game to the state right after `step` inputs were handled."""
+        if not 0 <= step <= len(self.records):
+            raise ValueError(f"Step must be between 0 and {len(self.records)}.")
+
+        nearest = max(s for s in self.snapshots if s <= step)
+        if step < self.step or nearest > self.step:
+            self.engine = pickle.loads(self.snapshots[nearest])
+            self.step = nearest
+
+        while self.step < step:
+            self.advance()
+        return self.engine
+
+    def run(self) -> Engine:
+        return self.seek(len(self.records))
+
+
+def spectate(replay: Replay, step: int, port: int, delay: float) -> Engine:
+    """Play the replay up to `step`, streaming a frame of every step on `port`."""
+    import tcod
+
+    from roguelike.input_handlers import MainGameEventHandler
+    from roguelike.spectate import SpectatorServer
+
+    server = SpectatorServer(port=port)
+    console = tcod.Console(80, 50, order="F")
+    print(f"Streaming on port {server.address[1]}.")
+    try:
+        while replay.step < step:
+            replay.advance()
+            console.clear()
+            MainGameEventHandler(replay.engine).on_render(console)
+            server.present(console)
+            time.sleep(delay)
+    finally:
+        server.close()
+    return replay.engine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-simulate a recorded game.")
+    parser.add_argument("replay", type=Path, help="Replay file to run.")
+    parser.add_argument("--step", type=int, help="Stop after this many inputs.")
+    parser.add_argument("--snapshot-interval", type=int, default=500)
+    parser.add_argument("--spectate", type=int, metavar="PORT", help="Stream on PORT.")
+    parser.add_argument(
+        "--delay", type=float, default=0.1, help="Seconds per step when streaming."
+    )
+    args = parser.parse_args()
+
+    log = ActionLog.load(args.replay)
+    replay = Replay(log, args.snapshot_interval, headless=args.spectate is None)
+    step = len(replay) if args.step is None else args.step
+
+    start = time.perf_counter()
+    if args.spectate is None:
+        engine = replay.seek(step)
+    else:
+        engine = spectate(replay, step, args.spectate, args.delay)
+    elapsed = time.perf_counter() - start
+
+    print(f"Replayed {step} inputs in {elapsed:.3f}s ({step / elapsed:.0f}/s).")
+    print(
+        f"Floor {engine.game_world.current_floor}, player at"
+        f" ({engine.player.x}, {engine.player.y}) with {engine.player.fighter.hp} HP."
+    )
+
+
+if __name__ == "__main__":
+    main()
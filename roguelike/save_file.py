@@ -0,0 +1,204 @@
+"""Saved games, split so that continuing one only waits for what it shows first.
+
+A save has two sections, compressed separately. The first is the engine with only
+what the first frame needs: the current floor, the entities in view and the last
+few messages. The second has everything else: the older messages, the input log,
+the other entities of the floor and the other floors. It grows with the length of
+the game, while the first section stays about the same size.
+
+A lazy load returns as soon as the first section is loaded, while the second one
+is loaded on another thread. It's merged into the engine by
+`Engine.finish_loading`, before the engine handles any input.
+"""
+from __future__ import annotations
+
+import lzma
+import os
+import pickle
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, NamedTuple
+
+from roguelike.floor_store import dumps_detached, loads_detached, serialize_floor
+from roguelike.game_map import EntitySet, GameMap
+
+if TYPE_CHECKING:
+    from roguelike.engine import Engine
+    from roguelike.entity import Entity
+    from roguelike.message_log import Message
+
+MAGIC = b"RLSV"
+VERSION = 1
+HEADER = struct.Struct("<4sBQ")
+"""Magic, version and compressed size of the first section."""
+
+# As many as the message panel shows.
+RECENT_MESSAGES = 5
+
+
+class SaveData(NamedTuple):
+    """The pickled sections of a save."""
+
+    engine: bytes
+    deferred: bytes
+
+
+class Deferred(NamedTuple):
+    """Everything left out of the first section of a save."""
+
+    messages: list[Message]
+    action_log: bytes
+    action_log_length: int
+    entities: dict[int, Entity]
+    """Entities out of view, by their index in the iteration order of the floor."""
+    floors: dict[int, bytes]
+    """The other floors, serialized, including those evicted to disk."""
+
+
+def dump_save(engine: Engine) -> SaveData:
+    """Pickle `engine` into the sections of a save.
+
+    Runs on the thread that plays the game, but leaves compressing and writing to
+    `write_save`, which can run on any thread.
+    """
+    engine.finish_loading()
+    game_map = engine.game_map
+    message_log = engine.message_log
+    action_log = engine.action_log
+    floors = engine.game_world.floors
+
+    camera = engine.camera
+    camera.follow(engine.player.x, engine.player.y, game_map)
+    entities = list(game_map.entities)
+    in_view = [e for e in entities if camera.in_view(e.x, e.y)]
+    deferred = Deferred(
+        messages=message_log.messages[:-RECENT_MESSAGES],
+        action_log=bytes(action_log.data),
+        action_log_length=len(action_log),
+        entities={i: e for i, e in enumerate(entities) if not camera.in_view(e.x, e.y)},
+        floors={
+            **floors.all_serialized(),
+            **{
+                floor: serialize_floor(other_map)
+                for floor, other_map in floors.loaded.items()
+                if other_map is not game_map
+            },
+        },
+    )
+
+    # The engine is pickled without what was deferred, then restored.
+    state = (
+        game_map.entities,
+        message_log.messages,
+        action_log.data,
+        action_log.length,
+        floors.loaded,
+        floors.serialized,
+        floors.on_disk,
+    )
+    game_map.entities = EntitySet(in_view)
+    message_log.messages = message_log.messages[-RECENT_MESSAGES:]
+    action_log.data = bytearray()
+    action_log.length = 0
+    floors.loaded = OrderedDict({engine.game_world.current_floor: game_map})
+    floors.serialized = {}
+    floors.on_disk = set()
+    try:
+        return SaveData(pickle.dumps(engine), dumps_detached(deferred, game_map))
+    finally:
+        (
+            game_map.entities,
+            message_log.messages,
+            action_log.data,
+            action_log.length,
+            floors.loaded,
+            floors.serialized,
+            floors.on_disk,
+        ) = state
+
+
+def write_save(data: SaveData, filename: str) -> None:
+    """Compress the sections of a save into `filename`.
+
+    The file is replaced in one step, so an interrupted write never leaves a broken
+    save behind. Only reads `data`, so it can run on any thread.
+    """
+    engine = lzma.compress(data.engine)
+    path = Path(filename)
+    temporary = path.with_name(path.name + ".tmp")
+    temporary.write_bytes(
+        HEADER.pack(MAGIC, VERSION, len(engine)) + engine + lzma.compress(data.deferred)
+    )
+    os.replace(temporary, path)
+
+
+def read_deferred(file: BinaryIO, game_map: GameMap) -> Deferred:
+    """Read the second section of a save from `file`, and close it."""
+    with file:
+        deferred = loads_detached(lzma.decompress(file.read()), game_map)
+    assert isinstance(deferred, Deferred)
+    return deferred
+
+
+def load_save(filename: str, lazy: bool = False) -> Engine:
+    """Load a saved game. If `lazy`, only wait for its first section."""
+    from roguelike.engine import Engine
+
+    file = open(filename, "rb")
+    header = file.read(HEADER.size)
+    if not header.startswith(MAGIC):
+        # Saves from before there were sections are a single compressed engine.
+        with file:
+            file.seek(0)
+            engine = pickle.loads(lzma.decompress(file.read()))
+        assert isinstance(engine, Engine)
+        return engine
+
+    try:
+        _, version, size = HEADER.unpack(header)
+        if version != VERSION:
+            raise ValueError(f"Unsupported save version: {version}.")
+        engine = pickle.loads(lzma.decompress(file.read(size)))
+        assert isinstance(engine, Engine)
+    except BaseException:
+        file.close()
+        raise
+
+    if not lazy:
+        merge_deferred(engine, read_deferred(file, engine.game_map))
+        return engine
+
+    pending: Future[Deferred] = Future()
+
+    def load_rest() -> None:
+        try:
+            pending.set_result(read_deferred(file, engine.game_map))
+        except BaseException as ex:
+            pending.set_exception(ex)
+
+    threading.Thread(target=load_rest, daemon=True).start()
+    engine.pending_load = pending
+    return engine
+
+
+def merge_deferred(engine: Engine, deferred: Deferred) -> None:
+    """Put what was left out of the first section of a save back into `engine`."""
+    engine.message_log.messages[:0] = deferred.messages
+    engine.action_log.data[:0] = deferred.action_log
+    engine.action_log.length += deferred.action_log_length
+
+    # Entities go back to their place in the iteration order, which decides things
+    # like which monster acts first.
+    game_map = engine.game_map
+    in_view = iter(list(game_map.entities))
+    entities = [
+        deferred.entities[i] if i in deferred.entities else next(in_view)
+        for i in range(len(game_map.entities) + len(deferred.entities))
+    ]
+    game_map.entities = EntitySet(entities)
+
+    for floor, data in deferred.floors.items():
+        engine.game_world.floors.add_serialized(floor, data)
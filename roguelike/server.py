@@ -0,0 +1,365 @@
+"""Hosting of many independent games in one process.
+
+Each session is a whole game, with its own engine, world, RNG and message log.
+Clients drive sessions over a socket, with one JSON object per line:
+
+- `{"op": "new", "seed": 1}` starts a session, the seed is optional.
+- `{"op": "act", "session": 1, "action": [1, 0, -1]}` plays an input of the
+  player, encoded as a replay record, e.g. a bump to the north.
+- `{"op": "state", "session": 1}` describes the game, like "act" does.
+- `{"op": "close", "session": 1}` ends a session.
+- `{"op": "stats"}` reports the sessions and their memory use.
+
+Every request gets a response line, with an "error" if it failed.
+
+A session only ever runs one job at a time, on a shared pool of worker threads.
+Sessions with jobs waiting take turns, one job each, so a busy session can't starve
+the others. Sessions idle for a while, or the least recently used ones when over
+the memory budget, are evicted: saved to disk in the save file format and loaded
+back by their next job.
+
+Run with `python -m roguelike.server`.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import gc
+import itertools
+import json
+import struct
+import sys
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import BuiltinFunctionType, FunctionType, ModuleType
+from typing import TYPE_CHECKING, Any, Callable
+
+from roguelike import colour
+from roguelike.exceptions import ImpossibleActionError
+from roguelike.replay import OP_LEVEL_UP, Record, check_record, decode_action
+
+if TYPE_CHECKING:
+    from roguelike.engine import Engine
+
+DEFAULT_PORT = 7778
+
+# Shared by every game in the process, so not counted towards any of them.
+SHARED_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType)
+
+Job = Callable[["Session"], Any]
+
+
+def is_int(value: Any) -> bool:
+    # JSON booleans are decoded as bool, a subclass of int.
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def memory_usage(root: object) -> int:
+    """Approximate size in bytes of everything reachable from `root`."""
+    seen: set[int] = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        # Includes the buffer of NumPy arrays that own their data.
+        total += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return total
+
+
+class Session:
+    def __init__(self, session_id: int, engine: Engine, path: Path):
+        self.id = session_id
+        self.engine: Engine | None = engine
+        self.path = path
+        """Where the game is saved while it's evicted."""
+        self.jobs: deque[tuple[Job, asyncio.Future[Any]]] = deque()
+        self.running = False
+        self.last_active = time.monotonic()
+        self.memory = 0
+        """Bytes used, as of the last accounting. Evicted sessions use none."""
+        self.messages_sent = 0
+
+    def load(self) -> Engine:
+        if self.engine is None:
+            from roguelike.setup_game import load_game
+
+            self.engine = load_game(str(self.path))
+            self.path.unlink()
+        return self.engine
+
+    def evict(self) -> None:
+        from roguelike.save_file import dump_save, write_save
+
+        if self.engine is not None:
+            write_save(dump_save(self.engine), str(self.path))
+            self.engine = None
+            self.memory = 0
+
+    def discard(self) -> None:
+        self.engine = None
+        self.path.unlink(missing_ok=True)
+
+    def account(self) -> None:
+        if self.engine is not None:
+            self.memory = memory_usage(self.engine)
+
+    def play(self, record: Record) -> dict[str, Any]:
+        """Handle an input the same way the event handlers would have."""
+        engine = self.load()
+        player = engine.player
+        if not player.is_alive:
+            raise ImpossibleActionError("The game is over.")
+
+        if record[0] == OP_LEVEL_UP:
+            if not player.level.requires_level_up:
+                raise ImpossibleActionError("There is no level up to choose.")
+            player.level.increase_stat(record[1])
+            engine.action_log.record_level_up(record[1])
+        else:
+            action = decode_action(player, record)
+            engine.action_log.record(action)
+            try:
+                engine.play_turn(action)
+            except ImpossibleActionError as ex:
+                engine.log(ex.args[0], colour.IMPOSSIBLE)
+        return self.state()
+
+    def state(self) -> dict[str, Any]:
+        """Describe the game, with the messages logged since the last time."""
+        engine = self.load()
+        player = engine.player
+        start = self.messages_sent
+        messages = engine.message_log.messages[start:]
+        self.messages_sent += len(messages)
+        return {
+            "session": self.id,
+            "floor": engine.game_world.current_floor,
+            "position": [player.x, player.y],
+            "hp": player.fighter.hp,
+            "max_hp": player.fighter.max_hp,
+            "alive": player.is_alive,
+            "level_up": player.level.requires_level_up,
+            "messages": [message.full_text for message in messages],
+        }
+
+
+class GameServer:
+    """Runs the jobs of any number of sessions on `workers` threads.
+
+    Sessions idle for `idle_timeout` seconds are evicted into `directory`, and so
+    are the least recently active ones while all sessions use more than
+    `max_memory` bytes, if given.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        workers: int = 4,
+        idle_timeout: float = 300.0,
+        max_memory: int | None = None,
+    ):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.idle_timeout = idle_timeout
+        self.max_memory = max_memory
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="session")
+        self.sessions: dict[int, Session] = {}
+        self.ids = itertools.count(1)
+        self.ready: deque[Session] = deque()
+        """Sessions with jobs waiting, in the order they get a worker."""
+        self.running = 0
+
+    async def create(self, seed: int | None = None) -> Session:
+        from roguelike.setup_game import new_game
+
+        loop = asyncio.get_running_loop()
+        engine = await loop.run_in_executor(
+            self.pool, lambda: new_game(seed=seed, floors_directory=None)
+        )
+        session_id = next(self.ids)
+        session = Session(session_id, engine, self.directory / f"{session_id}.sav")
+        self.sessions[session_id] = session
+        return session
+
+    def submit(self, session: Session, job: Job) -> asyncio.Future[Any]:
+        """Queue `job` to run with `session`, once no other job of it is running."""
+        future = asyncio.get_running_loop().create_future()
+        session.jobs.append((job, future))
+        # Sessions are waiting in `ready` while they have jobs and none is running.
+        if not session.running and len(session.jobs) == 1:
+            self.ready.append(session)
+        self.dispatch()
+        return future
+
+    def dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self.ready and self.running < self.workers:
+            session = self.ready.popleft()
+            job, future = session.jobs.popleft()
+            session.running = True
+            self.running += 1
+            task = loop.run_in_executor(self.pool, job, session)
+            task.add_done_callback(functools.partial(self.finish, session, future))
+
+    def finish(
+        self, session: Session, future: asyncio.Future[Any], task: asyncio.Future[Any]
+    ) -> None:
+        session.running = False
+        self.running -= 1
+        if not future.cancelled():
+            exception = task.exception()
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(task.result())
+        if session.jobs:
+            # To the back of the line, behind every other session that is waiting.
+            self.ready.append(session)
+        self.dispatch()
+
+    async def run_job(
+        self, session: Session, job: Callable[[Session], dict[str, Any]]
+    ) -> dict[str, Any]:
+        session.last_active = time.monotonic()
+        result: dict[str, Any] = await self.submit(session, job)
+        return result
+
+    async def close(self, session: Session) -> None:
+        del self.sessions[session.id]
+        await self.submit(session, Session.discard)
+
+    def stats(self) -> dict[str, Any]:
+        loaded = [s for s in self.sessions.values() if s.engine is not None]
+        return {
+            "sessions": len(self.sessions),
+            "loaded": len(loaded),
+            "memory": sum(s.memory for s in loaded),
+            "memory_per_session": {s.id: s.memory for s in loaded},
+        }
+
+    async def manage_memory(self, interval: float) -> None:
+        """Periodically account for the memory of sessions and evict them."""
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            loaded = [s for s in self.sessions.values() if s.engine is not None]
+            await asyncio.gather(
+                *(
+                    self.submit(s, Session.evict)
+                    for s in loaded
+                    if now - s.last_active >= self.idle_timeout
+                )
+            )
+
+            loaded = [s for s in loaded if s.engine is not None]
+            await asyncio.gather(*(self.submit(s, Session.account) for s in loaded))
+            if self.max_memory is None:
+                continue
+            total = sum(s.memory for s in loaded)
+            for session in sorted(loaded, key=lambda s: s.last_active):
+                if total <= self.max_memory:
+                    break
+                total -= session.memory
+                await self.submit(session, Session.evict)
+
+    async def handle_request(self, request: Any) -> dict[str, Any]:
+        if not isinstance(request, dict):
+            raise ValueError("A request must be a JSON object.")
+        op = request.get("op")
+        if op == "new":
+            seed = request.get("seed")
+            if seed is not None and not is_int(seed):
+                raise ValueError("The seed must be an integer.")
+            session = await self.create(seed)
+            return await self.run_job(session, Session.state)
+        if op == "stats":
+            return self.stats()
+
+        session_id = request.get("session")
+        if not is_int(session_id) or session_id not in self.sessions:
+            return {"error": f"No session {session_id}."}
+        session = self.sessions[session_id]
+        if op == "state":
+            return await self.run_job(session, Session.state)
+        if op == "act":
+            action = request.get("action")
+            if (
+                not isinstance(action, list)
+                or not action
+                or not all(map(is_int, action))
+            ):
+                raise ValueError("An action must be a non-empty list of integers.")
+            record = check_record(action)
+            return await self.run_job(session, lambda s: s.play(record))
+        if op == "close":
+            await self.close(session)
+            return {"session": session_id, "closed": True}
+        return {"error": f"Unknown op: {op!r}."}
+
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    response = await self.handle_request(json.loads(line))
+                except (
+                    ImpossibleActionError,
+                    ValueError,
+                    IndexError,
+                    struct.error,
+                ) as ex:
+                    # Bad requests, e.g. a record whose arguments are out of range.
+                    response = {"error": str(ex)}
+                except Exception as ex:
+                    traceback.print_exc()
+                    response = {"error": f"{type(ex).__name__}: {ex}"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "localhost", port: int = DEFAULT_PORT) -> None:
+        server = await asyncio.start_server(self.handle_client, host, port)
+        memory = asyncio.create_task(self.manage_memory(min(self.idle_timeout, 10)))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            memory.cancel()
+            self.pool.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Host many games in one process.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--idle-timeout", type=float, default=300.0)
+    parser.add_argument("--max-memory", type=int, help="Memory budget, in MB.")
+    parser.add_argument(
+        "--directory", type=Path, default=Path("sessions"), help="For evicted games."
+    )
+    args = parser.parse_args()
+
+    max_memory = None if args.max_memory is None else args.max_memory * 2 ** 20
+    server = GameServer(args.directory, args.workers, args.idle_timeout, max_memory)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
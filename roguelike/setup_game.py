@@ -1,20 +1,33 @@
 from __future__ import annotations
 
 import copy
+import functools
 import importlib.resources
-import lzma
-import pickle
 import traceback
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 import tcod.image
 
-from roguelike import colour, entity_factories, input_handlers, resources
-from roguelike.engine import Engine
-from roguelike.entity import Actor, Item
-from roguelike.game_map import GameWorld
+from roguelike import colour, input_handlers, resources
+from roguelike.types import ndarray
 
+if TYPE_CHECKING:
+    from roguelike.engine import Engine
+    from roguelike.entity import Actor, Item
+
+
+def new_game(
+    seed: int | None = None,
+    floors_directory: Path | None = Path("savegame.floors"),
+    headless: bool = False,
+) -> Engine:
+    # The game modules are only needed once a game starts, so they are imported
+    # here to keep them out of the path to the main menu's first frame.
+    from roguelike import entity_factories
+    from roguelike.engine import Engine
+    from roguelike.game_map import GameWorld
 
-def new_game() -> Engine:
     map_width = 80
     map_height = 43
 
@@ -23,7 +36,7 @@ def new_game() -> Engine:
     max_rooms = 30
 
     player = copy.deepcopy(entity_factories.player)
-    engine = Engine(player=player)
+    engine = Engine(player=player, seed=seed, headless=headless)
     engine.game_world = GameWorld(
         max_rooms=max_rooms,
         room_min_size=room_min_size,
@@ -31,8 +44,9 @@ def new_game() -> Engine:
         map_width=map_width,
         map_height=map_height,
         engine=engine,
+        floors_directory=floors_directory,
     )
-    engine.game_world.generate_floor()
+    engine.game_world.descend()
     engine.update_fov()
 
     engine.log("Hello and welcome, adventure", colour.WELCOME_TEXT)
@@ -45,45 +59,59 @@ def new_game() -> Engine:
 
 def grant_item(player: Actor, item: Item) -> None:
     item = copy.deepcopy(item)
-    item.parent = player.inventory
-    player.inventory.items.append(item)
+    player.inventory.add(item)
     player.equipment.toggle_equip(item, add_message=False)
 
 
-class MainMenu(input_handlers.BaseEventHandler):
-    def on_render(self, console: tcod.Console) -> None:
-        with importlib.resources.path(resources, "menu_background.png") as p:
-            background_image = tcod.image.load(p)[:, :, :3]
-        console.draw_semigraphics(background_image, 0, 0)
-
-        console.print(
-            x=console.width // 2,
-            y=console.height // 2 - 4,
-            string="TOMBS OF THE ANCIENT KINGS",
-            fg=colour.MENU_TITLE,
-            alignment=tcod.CENTER,
-        )
-        console.print(
-            x=console.width // 2,
-            y=console.height // 2,
-            string="By me",
-            fg=colour.MENU_TITLE,
+@functools.lru_cache(maxsize=None)
+def load_menu_background() -> ndarray:
+    """Decode the menu background once, as an RGB array for `draw_semigraphics`."""
+    with importlib.resources.path(resources, "menu_background.png") as p:
+        image: ndarray = tcod.image.load(p)[:, :, :3]
+    image.flags.writeable = False
+    return image
+
+
+@functools.lru_cache(maxsize=4)
+def menu_layer(width: int, height: int) -> tcod.Console:
+    """Render the whole main menu once, since none of it changes between frames."""
+    layer = tcod.Console(width, height, order="F")
+    layer.draw_semigraphics(load_menu_background(), 0, 0)
+
+    layer.print(
+        x=width // 2,
+        y=height // 2 - 4,
+        string="TOMBS OF THE ANCIENT KINGS",
+        fg=colour.MENU_TITLE,
+        alignment=tcod.CENTER,
+    )
+    layer.print(
+        x=width // 2,
+        y=height // 2,
+        string="By me",
+        fg=colour.MENU_TITLE,
+        alignment=tcod.CENTER,
+    )
+
+    menu_width = 24
+    for i, text in enumerate(
+        ["[N] Play a new game", "[C] Continue last game", "[Q] Quit"]
+    ):
+        layer.print(
+            width // 2,
+            height // 2 - 2 + i,
+            text.ljust(menu_width),
+            fg=colour.MENU_TEXT,
+            bg=colour.BLACK,
             alignment=tcod.CENTER,
+            bg_blend=tcod.BKGND_ALPHA(64),
         )
+    return layer
+
 
-        menu_width = 24
-        for i, text in enumerate(
-            ["[N] Play a new game", "[C] Continue last game", "[Q] Quit"]
-        ):
-            console.print(
-                console.width // 2,
-                console.height // 2 - 2 + i,
-                text.ljust(menu_width),
-                fg=colour.MENU_TEXT,
-                bg=colour.BLACK,
-                alignment=tcod.CENTER,
-                bg_blend=tcod.BKGND_ALPHA(64),
-            )
+class MainMenu(input_handlers.BaseEventHandler):
+    def on_render(self, console: tcod.Console) -> None:
+        menu_layer(console.width, console.height).blit(console)
 
     def ev_keydown(
         self, event: tcod.event.KeyDown
@@ -93,7 +121,8 @@ class MainMenu(input_handlers.BaseEventHandler):
             raise SystemExit()
         elif key == tcod.event.K_c:
             try:
-                return input_handlers.MainGameEventHandler(load_game("savegame.sav"))
+                engine = load_game("savegame.sav", lazy=True)
+                return input_handlers.MainGameEventHandler(engine)
             except FileNotFoundError:
                 return input_handlers.PopupMessage(self, "No saved game to load.")
             except Exception as ex:
@@ -104,8 +133,10 @@ class MainMenu(input_handlers.BaseEventHandler):
         return None
 
 
-def load_game(filename: str) -> Engine:
-    with open(filename, "rb") as f:
-        engine = pickle.loads(lzma.decompress(f.read()))
-    assert isinstance(engine, Engine)
-    return engine
+def load_game(filename: str, lazy: bool = False) -> Engine:
+    """Load a saved game. If `lazy`, return once it can be drawn, and load the rest
+    in the background.
+    """
+    from roguelike.save_file import load_save
+
+    return load_save(filename, lazy)
@@ -0,0 +1,341 @@
+"""Monte-Carlo balance simulation: many seeded games played by a bot, in parallel.
+
+Every game is independent, so they are spread over a process pool, and results are
+aggregated as they arrive. Pass `--output` to also stream each game's result to a
+JSON lines file, so partial results of long runs can be inspected at any time.
+
+Run with `python -m roguelike.simulate --games 1000`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Iterable, NamedTuple
+
+from roguelike.actions import (
+    Action,
+    BumpAction,
+    EquipAction,
+    ItemAction,
+    PickupAction,
+    TakeStairsAction,
+    WaitAction,
+)
+from roguelike.components.consumable import (
+    ConfusionConsumable,
+    FireballDamageConsumable,
+    HealingConsumable,
+    LightningDamageConsumable,
+)
+from roguelike.events import Damaged, Death, ItemUsed
+from roguelike.exceptions import ImpossibleActionError
+
+if TYPE_CHECKING:
+    from roguelike.engine import Engine
+    from roguelike.entity import Actor, Item
+
+
+class GameResult(NamedTuple):
+    seed: int
+    depth: int
+    died: bool
+    turns: int
+    turns_per_floor: list[int]
+    damage_per_floor: list[int]
+    items_used: dict[str, int]
+    kills: int
+    character_level: int
+
+
+class Bot:
+    """Plays like a cautious diver: fights what it sees, drinks potions when hurt,
+    picks up the items it sees and heads straight for the down stairs.
+
+    The bot knows where the stairs are, even before they are explored.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.player = engine.player
+
+    def visible_enemies(self) -> list[Actor]:
+        game_map = self.engine.game_map
+        return [
+            actor
+            for actor in game_map.actors
+            if actor is not self.player and game_map.is_visible(actor.x, actor.y)
+        ]
+
+    def find_item(self, consumable_type: type) -> Item | None:
+        for item in self.player.inventory:
+            if isinstance(item.consumable, consumable_type):
+                return item
+        return None
+
+    def step_towards(self, x: int, y: int) -> Action:
+        assert self.player.ai is not None
+        path = self.player.ai.get_path_to(x, y)
+        if not path:
+            return WaitAction(self.player)
+        dest_x, dest_y = path[0]
+        return BumpAction(self.player, dest_x - self.player.x, dest_y - self.player.y)
+
+    def choose_level_up(self) -> int:
+        """Cycle through HP, power and defense."""
+        return self.player.level.current_level % 3
+
+    def choose_action(self) -> Action:
+        player = self.player
+        fighter = player.fighter
+
+        if fighter.hp <= fighter.max_hp // 2:
+            potion = self.find_item(HealingConsumable)
+            if potion is not None:
+                return ItemAction(player, potion)
+
+        enemies = self.visible_enemies()
+        if enemies:
+            return self.fight(min(enemies, key=lambda a: player.distance(a.x, a.y)))
+
+        upgrade = self.find_upgrade()
+        if upgrade is not None:
+            return EquipAction(player, upgrade)
+
+        game_map = self.engine.game_map
+        if not player.inventory.is_full:
+            visible_items = [
+                item for item in game_map.items if game_map.is_visible(item.x, item.y)
+            ]
+            if visible_items:
+                item = min(visible_items, key=lambda i: player.distance(i.x, i.y))
+                if (item.x, item.y) == (player.x, player.y):
+                    return PickupAction(player)
+                return self.step_towards(item.x, item.y)
+
+        if (player.x, player.y) == game_map.downstairs_location:
+            return TakeStairsAction(player)
+        return self.step_towards(*game_map.downstairs_location)
+
+    def fight(self, target: Actor) -> Action:
+        player = self.player
+        dx, dy = target.x - player.x, target.y - player.y
+        if max(abs(dx), abs(dy)) <= 1:
+            return BumpAction(player, dx, dy)
+
+        distance = player.distance(target.x, target.y)
+        lightning = self.find_item(LightningDamageConsumable)
+        if lightning is not None:
+            assert isinstance(lightning.consumable, LightningDamageConsumable)
+            if distance <= lightning.consumable.max_range:
+                return ItemAction(player, lightning)
+
+        fireball = self.find_item(FireballDamageConsumable)
+        if fireball is not None:
+            assert isinstance(fireball.consumable, FireballDamageConsumable)
+            if distance > fireball.consumable.radius:
+                return ItemAction(player, fireball, (target.x, target.y))
+
+        confusion = self.find_item(ConfusionConsumable)
+        if confusion is not None:
+            return ItemAction(player, confusion, (target.x, target.y))
+
+        return self.step_towards(target.x, target.y)
+
+    def find_upgrade(self) -> Item | None:
+        """An unequipped item with better bonuses than what's in its slot."""
+        equipment = self.player.equipment
+        for item in self.player.inventory:
+            if item.equippable is None or equipment.item_is_equipped(item):
+                continue
+            current = equipment.items.get(item.equippable.equipment_type)
+            bonus = item.equippable.power_bonus + item.equippable.defense_bonus
+            current_bonus = 0
+            if current is not None and current.equippable is not None:
+                current_bonus = (
+                    current.equippable.power_bonus + current.equippable.defense_bonus
+                )
+            if bonus > current_bonus:
+                return item
+        return None
+
+
+class GameStats:
+    """Collects the statistics of one game from its events."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.turns_on_floor: Counter[int] = Counter()
+        self.damage_on_floor: Counter[int] = Counter()
+        self.items_used: Counter[str] = Counter()
+        self.kills = 0
+
+        engine.events.subscribe(Damaged, self.on_damaged)
+        engine.events.subscribe(Death, self.on_death)
+        engine.events.subscribe(ItemUsed, self.on_item_used)
+
+    def on_damaged(self, event: Damaged) -> None:
+        if event.actor is self.engine.player:
+            self.damage_on_floor[self.engine.game_world.current_floor] += event.amount
+
+    def on_death(self, event: Death) -> None:
+        if event.actor is not self.engine.player:
+            self.kills += 1
+
+    def on_item_used(self, event: ItemUsed) -> None:
+        self.items_used[event.item.name] += 1
+
+
+def simulate_game(
+    seed: int, max_turns: int = 5000, max_turns_per_floor: int = 1000
+) -> GameResult:
+    """Play a whole game headlessly, until the bot dies or runs out of turns.
+
+    A bot that spends `max_turns_per_floor` on one floor is considered stuck.
+    """
+    from roguelike.setup_game import new_game
+
+    engine = new_game(seed=seed, floors_directory=None, headless=True)
+    bot = Bot(engine)
+    stats = GameStats(engine)
+    player = engine.player
+
+    turns = 0
+    while player.is_alive and turns < max_turns:
+        floor = engine.game_world.current_floor
+        if stats.turns_on_floor[floor] >= max_turns_per_floor:
+            break
+        if player.level.requires_level_up:
+            player.level.increase_stat(bot.choose_level_up())
+            continue
+
+        try:
+            engine.play_turn(bot.choose_action())
+        except ImpossibleActionError:
+            engine.play_turn(WaitAction(player))
+        turns += 1
+        stats.turns_on_floor[floor] += 1
+
+    depth = engine.game_world.current_floor
+    return GameResult(
+        seed=seed,
+        depth=depth,
+        died=not player.is_alive,
+        turns=turns,
+        turns_per_floor=[stats.turns_on_floor[f] for f in range(1, depth + 1)],
+        damage_per_floor=[stats.damage_on_floor[f] for f in range(1, depth + 1)],
+        items_used=dict(stats.items_used),
+        kills=stats.kills,
+        character_level=player.level.current_level,
+    )
+
+
+class BalanceReport:
+    """Aggregate statistics over any number of game results, updated incrementally."""
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.deaths = 0
+        self.depths: Counter[int] = Counter()
+        self.turns_on_floor: dict[int, list[int]] = {}
+        self.damage_on_floor: dict[int, list[int]] = {}
+        self.items_used: Counter[str] = Counter()
+        self.kills: list[int] = []
+        self.character_levels: list[int] = []
+
+    def add(self, result: GameResult) -> None:
+        self.games += 1
+        self.deaths += result.died
+        self.depths[result.depth] += 1
+        self.kills.append(result.kills)
+        self.character_levels.append(result.character_level)
+        self.items_used.update(result.items_used)
+        for floor, (turns, damage) in enumerate(
+            zip(result.turns_per_floor, result.damage_per_floor), start=1
+        ):
+            self.turns_on_floor.setdefault(floor, []).append(turns)
+            self.damage_on_floor.setdefault(floor, []).append(damage)
+
+    def summary(self) -> str:
+        depths = list(self.depths.elements())
+        lines = [
+            f"Games: {self.games}, died: {self.deaths / self.games:.1%}",
+            f"Depth: mean {statistics.mean(depths):.2f},"
+            f" median {statistics.median(depths)}, max {max(depths)}",
+            f"Kills: mean {statistics.mean(self.kills):.2f}",
+            f"Character level: mean {statistics.mean(self.character_levels):.2f}",
+            "",
+            "Floor  reached  died here  turns (mean)  damage taken (mean)",
+        ]
+        for floor in sorted(self.turns_on_floor):
+            turns = self.turns_on_floor[floor]
+            damage = self.damage_on_floor[floor]
+            lines.append(
+                f"{floor:5}  {len(turns):7}  {self.depths[floor]:9}"
+                f"  {statistics.mean(turns):12.1f}  {statistics.mean(damage):19.1f}"
+            )
+
+        lines += ["", "Items used per game:"]
+        for name, count in self.items_used.most_common():
+            lines.append(f"  {name:<24} {count / self.games:.2f}")
+        return "\n".join(lines)
+
+
+def _simulate_seed(args: tuple[int, int, int]) -> GameResult:
+    return simulate_game(*args)
+
+
+def run_simulations(
+    seeds: Iterable[int],
+    processes: int | None = None,
+    max_turns: int = 5000,
+    max_turns_per_floor: int = 1000,
+) -> Iterable[GameResult]:
+    """Yield the results of games, in the order they finish."""
+    tasks = ((seed, max_turns, max_turns_per_floor) for seed in seeds)
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap_unordered(_simulate_seed, tasks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate many games with a bot.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game.")
+    parser.add_argument("--processes", type=int, help="Defaults to the CPU count.")
+    parser.add_argument("--max-turns", type=int, default=5000)
+    parser.add_argument("--max-turns-per-floor", type=int, default=1000)
+    parser.add_argument("--report-every", type=int, default=100)
+    parser.add_argument("--output", help="JSON lines file to stream results to.")
+    args = parser.parse_args()
+
+    report = BalanceReport()
+    output = open(args.output, "w") if args.output else None
+    start = time.perf_counter()
+    try:
+        seeds = range(args.seed, args.seed + args.games)
+        for result in run_simulations(
+            seeds, args.processes, args.max_turns, args.max_turns_per_floor
+        ):
+            report.add(result)
+            if output is not None:
+                output.write(json.dumps(result._asdict()) + "\n")
+                output.flush()
+            if report.games % args.report_every == 0 and report.games < args.games:
+                elapsed = time.perf_counter() - start
+                print(f"{report.games} games in {elapsed:.1f}s", file=sys.stderr)
+                print(report.summary() + "\n", file=sys.stderr)
+    finally:
+        if output is not None:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{report.games} games in {elapsed:.1f}s ({report.games / elapsed:.1f}/s)")
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Streaming of frames to spectators over a socket, and a terminal client to watch.
+
+A frame is sent as only the cells that changed since the previous one, so the cost
+of streaming grows with how much changes, not with the size of the screen. Each
+message is a header with the screen size and the number of cells, followed by the
+cells: their index, glyph, foreground and background colours.
+
+Every spectator has its own queue of messages, sent from its own thread, so a slow
+spectator never holds up the game. When it falls too far behind, its queue is
+dropped, and it's sent the whole screen once it has caught up.
+
+Watch with `python -m roguelike.spectate`, e.g. a replay run with `--spectate`.
+"""
+from __future__ import annotations
+
+import argparse
+import queue
+import socket
+import struct
+import sys
+import threading
+from typing import BinaryIO, NamedTuple, TextIO
+
+import numpy as np
+import tcod
+
+from roguelike.renderer import FrameBuffer, Renderer
+from roguelike.types import ndarray
+
+DEFAULT_PORT = 7777
+
+HEADER = struct.Struct("<HHI")
+"""Width and height of the screen, and number of cells that follow."""
+CELL = np.dtype([("index", "<u4"), ("ch", "<i4"), ("fg", "u1", 3), ("bg", "u1", 3)])
+"""A changed cell. Its index is `x + y * width`."""
+
+MAX_QUEUED_MESSAGES = 60
+
+
+class FrameDiff(NamedTuple):
+    width: int
+    height: int
+    cells: ndarray
+
+
+def encode_diff(frame: ndarray, changed: ndarray) -> bytes:
+    """Encode the cells of `frame`, a `tcod.Console.rgb` array, where `changed` is
+    set.
+    """
+    width, height = frame.shape
+    xs, ys = np.nonzero(changed)
+    cells = np.empty(len(xs), dtype=CELL)
+    cells["index"] = xs + ys * width
+    changed_cells = frame[xs, ys]
+    for field in ("ch", "fg", "bg"):
+        cells[field] = changed_cells[field]
+    return HEADER.pack(width, height, len(cells)) + cells.tobytes()
+
+
+def read_diff(stream: BinaryIO) -> FrameDiff | None:
+    """Read the next message from `stream`, or None if it's over."""
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    width, height, count = HEADER.unpack(header)
+    data = stream.read(count * CELL.itemsize)
+    if len(data) < count * CELL.itemsize:
+        return None
+    return FrameDiff(width, height, np.frombuffer(data, dtype=CELL))
+
+
+def apply_diff(frame: ndarray | None, diff: FrameDiff) -> ndarray:
+    """Update `frame` with the cells of `diff`, in place if it has the same size,
+    and return it.
+    """
+    if frame is None or frame.shape != (diff.width, diff.height):
+        frame = tcod.Console(diff.width, diff.height, order="F").rgb
+    ys, xs = np.divmod(diff.cells["index"], diff.width)
+    for field in ("ch", "fg", "bg"):
+        frame[field][xs, ys] = diff.cells[field]
+    return frame
+
+
+class Spectator:
+    def __init__(self, connection: socket.socket):
+        self.connection = connection
+        self.messages: queue.Queue[bytes | None] = queue.Queue(MAX_QUEUED_MESSAGES)
+        self.needs_whole_frame = True
+        self.closed = False
+        threading.Thread(target=self.send_messages, daemon=True).start()
+
+    def send(self, message: bytes) -> None:
+        try:
+            self.messages.put_nowait(message)
+        except queue.Full:
+            # Whatever is still queued is stale now, so skip straight to a new frame.
+            # The sending thread may take the last message at any point, so the
+            # queue is drained until it's found empty, rather than checked first.
+            try:
+                while True:
+                    self.messages.get_nowait()
+            except queue.Empty:
+                pass
+            self.needs_whole_frame = True
+
+    def send_messages(self) -> None:
+        try:
+            while (message := self.messages.get()) is not None:
+                self.connection.sendall(message)
+        except OSError:
+            pass
+        finally:
+            self.closed = True
+            self.connection.close()
+
+    def close(self) -> None:
+        self.closed = True
+        try:
+            self.messages.put_nowait(None)
+        except queue.Full:
+            self.connection.close()
+
+
+class SpectatorServer(FrameBuffer):
+    """Streams frames to any number of spectators, connecting at any time.
+
+    Frames are also presented to `renderer`, if given, e.g. to show them in a
+    window as well. Pass port 0 to pick any free port, which is then in `address`.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = DEFAULT_PORT,
+        renderer: Renderer | None = None,
+    ):
+        super().__init__()
+        self.renderer = renderer
+        self.listener = socket.create_server((host, port))
+        self.address: tuple[str, int] = self.listener.getsockname()[:2]
+        self.spectators: list[Spectator] = []
+        self.lock = threading.Lock()
+        threading.Thread(target=self.accept, daemon=True).start()
+
+    def accept(self) -> None:
+        while True:
+            try:
+                connection, _ = self.listener.accept()
+            except OSError:
+                return
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self.lock:
+                self.spectators.append(Spectator(connection))
+
+    def present(self, console: tcod.Console) -> None:
+        super().present(console)
+        if self.renderer is not None:
+            self.renderer.present(console)
+
+        with self.lock:
+            self.spectators = [s for s in self.spectators if not s.closed]
+            spectators = list(self.spectators)
+        if not spectators:
+            return
+
+        frame = self.last_frame()
+        changes = self.changed()
+        diff = encode_diff(frame, changes) if changes.any() else None
+        whole_frame = None
+        for spectator in spectators:
+            if spectator.needs_whole_frame:
+                if whole_frame is None:
+                    whole_frame = encode_diff(frame, np.ones(frame.shape, dtype=bool))
+                spectator.needs_whole_frame = False
+                spectator.send(whole_frame)
+            elif diff is not None:
+                spectator.send(diff)
+
+    def convert_event(self, event: tcod.event.Event) -> None:
+        if self.renderer is not None:
+            self.renderer.convert_event(event)
+
+    def close(self) -> None:
+        self.listener.close()
+        with self.lock:
+            for spectator in self.spectators:
+                spectator.close()
+            self.spectators.clear()
+
+
+class TerminalView:
+    """Draws the frames of a stream in a terminal with 24-bit colour."""
+
+    def __init__(self, output: TextIO):
+        self.output = output
+        self.frame: ndarray | None = None
+
+    def draw(self, diff: FrameDiff) -> None:
+        if self.frame is None or self.frame.shape != (diff.width, diff.height):
+            self.output.write("\x1b[2J")
+        self.frame = apply_diff(self.frame, diff)
+
+        parts = []
+        for index, ch, fg, bg in diff.cells.tolist():
+            y, x = divmod(index, diff.width)
+            parts.append(
+                f"\x1b[{y + 1};{x + 1}H\x1b[38;2;{fg[0]};{fg[1]};{fg[2]}m"
+                f"\x1b[48;2;{bg[0]};{bg[1]};{bg[2]}m{chr(ch or 0x20)}"
+            )
+        self.output.write("".join(parts) + "\x1b[0m")
+        self.output.flush()
+
+    def watch(self, stream: BinaryIO) -> None:
+        """Draw every message from `stream`, until it's over."""
+        self.output.write("\x1b[?25l")
+        try:
+            while (diff := read_diff(stream)) is not None:
+                self.draw(diff)
+        finally:
+            self.output.write("\x1b[0m\x1b[?25h\n")
+            self.output.flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Watch a game being streamed.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    with socket.create_connection((args.host, args.port)) as connection:
+        with connection.makefile("rb") as stream:
+            try:
+                TerminalView(sys.stdout).watch(stream)
+            except KeyboardInterrupt:
+                pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Area queries for targeting: which actors are near a point, or hit by a blast.
+
+The map keeps the positions of its actors in arrays, so finding the actors in an
+area is a NumPy query, not a loop over every actor. Queries only look at the
+window of the map around the point, so they also work on chunked maps.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from tcod.map import compute_fov
+
+from roguelike.types import ndarray
+
+if TYPE_CHECKING:
+    from roguelike.entity import Actor
+    from roguelike.game_map import GameMap
+
+
+def window(game_map: GameMap, x: int, y: int, radius: int) -> tuple[int, int, int, int]:
+    """The square region of the map within `radius` of (x, y), as (x0, y0, x1, y1)."""
+    return game_map.clip(x - radius, y - radius, x + radius + 1, y + radius + 1)
+
+
+def actor_positions(actors: list[Actor]) -> tuple[ndarray, ndarray]:
+    xy = np.array([(a.x, a.y) for a in actors], dtype=np.intp).reshape(-1, 2)
+    return xy[:, 0], xy[:, 1]
+
+
+def actors_in_mask(
+    game_map: GameMap, origin: tuple[int, int], mask: ndarray
+) -> list[Actor]:
+    """Living actors standing on a tile where `mask` is set. `mask[0, 0]` is at
+    `origin`.
+    """
+    return [a for a in game_map.entities.actors_in_mask(origin, mask) if a.is_alive]
+
+
+def disc_mask(
+    x: int, y: int, radius: int, bounds: tuple[int, int, int, int]
+) -> ndarray:
+    """Tiles in `bounds` within Euclidean distance `radius` of (x, y)."""
+    x0, y0, x1, y1 = bounds
+    dx = np.arange(x0, x1)[:, np.newaxis] - x
+    dy = np.arange(y0, y1)[np.newaxis, :] - y
+    mask: ndarray = dx ** 2 + dy ** 2 <= radius ** 2
+    return mask
+
+
+def actors_within(game_map: GameMap, x: int, y: int, radius: int) -> list[Actor]:
+    """Actors within `radius` of (x, y), walls or not."""
+    bounds = window(game_map, x, y, radius)
+    return actors_in_mask(game_map, bounds[:2], disc_mask(x, y, radius, bounds))
+
+
+def nearest_visible_actor(
+    game_map: GameMap, x: int, y: int, radius: int, exclude: Actor | None = None
+) -> Actor | None:
+    """The visible actor closest to (x, y), within `radius` of it.
+
+    Ties are broken by the order of the map's entities, like every other iteration
+    over them.
+    """
+    bounds = window(game_map, x, y, radius)
+    mask = disc_mask(x, y, radius, bounds) & game_map.get_visible(*bounds)
+    candidates = [
+        a for a in actors_in_mask(game_map, bounds[:2], mask) if a is not exclude
+    ]
+    if not candidates:
+        return None
+
+    xs, ys = actor_positions(candidates)
+    return candidates[int(np.argmin((xs - x) ** 2 + (ys - y) ** 2))]
+
+
+def blast_mask(
+    game_map: GameMap, x: int, y: int, radius: int
+) -> tuple[tuple[int, int], ndarray]:
+    """Tiles reached by a blast of `radius` at (x, y), which walls stop.
+
+    Returns the mask and the map position of its first element.
+    """
+    bounds = window(game_map, x, y, radius)
+    x0, y0 = bounds[:2]
+    transparent = game_map.get_transparent(*bounds)
+    reached = compute_fov(transparent, (x - x0, y - y0), radius=radius)
+    return (x0, y0), reached & disc_mask(x, y, radius, bounds)
+
+
+def actors_in_blast(game_map: GameMap, x: int, y: int, radius: int) -> list[Actor]:
+    return actors_in_mask(game_map, *blast_mask(game_map, x, y, radius))
@@ -1,3 +1,8 @@
+"""Tile types, and the registry that maps tile IDs to them.
+
+Maps store one `uint8` tile ID per cell. Properties of the tiles are looked up in
+`TILES`, e.g. `TILES["walkable"][ids]` gives an array of the same shape as `ids`.
+"""
 import numpy as np
 
 from roguelike.colour import RGB, WHITE
@@ -21,14 +26,23 @@ tile_dt = np.dtype(
 )
 
 
+TILES: ndarray = np.empty(0, dtype=tile_dt)
+"""The tile type of each tile ID."""
+
+
 def new_tile(
     *,
     walkable: int,
     transparent: int,
     dark: tuple[int, RGB, RGB],
     light: tuple[int, RGB, RGB]
-) -> ndarray:
-    return np.array((walkable, transparent, dark, light), dtype=tile_dt)
+) -> int:
+    """Register a new tile type and return its ID."""
+    global TILES
+    assert len(TILES) <= np.iinfo(np.uint8).max, "Too many tile types."
+    tile = np.array((walkable, transparent, dark, light), dtype=tile_dt)
+    TILES = np.append(TILES, tile)
+    return len(TILES) - 1
 
 
 SPACE = ord(" ")
@@ -51,3 +65,9 @@ downstairs = new_tile(
     dark=(ord(">"), (0, 0, 100), (50, 50, 150)),
     light=(ord(">"), WHITE, (200, 180, 50)),
 )
+upstairs = new_tile(
+    walkable=True,
+    transparent=True,
+    dark=(ord("<"), (0, 0, 100), (50, 50, 150)),
+    light=(ord("<"), WHITE, (200, 180, 50)),
+)
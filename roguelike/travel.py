@@ -0,0 +1,109 @@
+"""Walking the player over many turns with a single command.
+
+The player follows a path down one of the floor's distance maps, and stops as soon
+as something needs their attention. All the turns are played before the next
+frame is drawn, so a long walk costs one redraw instead of one per step.
+"""
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING
+
+from roguelike import colour
+from roguelike.actions import Action, BumpAction
+
+if TYPE_CHECKING:
+    from roguelike.engine import Engine
+    from roguelike.entity import Item
+
+# Stop after this many turns, so that a command can't freeze the game for long.
+MAX_TRAVEL_TURNS = 1000
+
+
+class Travel:
+    """Leads the player to the closest source of the distance map `map_name`.
+
+    The path is only re-planned when it runs out or, when exploring, once the tile
+    it leads to has been seen.
+    """
+
+    def __init__(self, engine: Engine, map_name: str):
+        self.engine = engine
+        self.map_name = map_name
+        self.path: deque[tuple[int, int]] = deque()
+        self.turns = 0
+        self.hp = engine.player.fighter.hp
+        # Items the player already knows about. Seeing them again is no surprise.
+        game_map = engine.game_map
+        self.seen_items = {
+            item for item in game_map.items if game_map.is_explored(item.x, item.y)
+        }
+
+    def visible_items(self) -> list[Item]:
+        game_map = self.engine.game_map
+        return [item for item in game_map.items if game_map.is_visible(item.x, item.y)]
+
+    def stop(self, reason: str) -> None:
+        self.engine.log(reason, colour.IMPOSSIBLE)
+
+    def interrupted(self) -> bool:
+        """Whether anything happened that the player should see, e.g. an enemy."""
+        player = self.engine.player
+        game_map = self.engine.game_map
+        for actor in game_map.actors:
+            if actor is not player and game_map.is_visible(actor.x, actor.y):
+                self.stop(f"{actor.name} is in view.")
+                return True
+
+        new_items = [
+            item for item in self.visible_items() if item not in self.seen_items
+        ]
+        if new_items:
+            self.stop(f"You see a {new_items[0].name}.")
+            return True
+
+        if player.fighter.hp < self.hp:
+            self.stop("You are hurt.")
+            return True
+        if player.level.requires_level_up:
+            self.stop("You can level up.")
+            return True
+        return False
+
+    def needs_plan(self) -> bool:
+        if not self.path:
+            return True
+        if self.map_name == "unexplored":
+            x, y = self.path[-1]
+            return self.engine.game_map.is_explored(x, y)
+        return False
+
+    def next_action(self) -> Action | None:
+        """The next step, or None if the player should stop."""
+        if self.turns >= MAX_TRAVEL_TURNS:
+            self.stop("You stop to rest after a long walk.")
+            return None
+        if self.interrupted():
+            return None
+
+        player = self.engine.player
+        if self.needs_plan():
+            distance_map = self.engine.game_map.distance_maps[self.map_name]
+            self.path = deque(distance_map.path_from(player.x, player.y))
+            if not self.path:
+                if distance_map.at(player.x, player.y) != 0:
+                    self.stop(
+                        "There is nothing left to explore."
+                        if self.map_name == "unexplored"
+                        else "You can't find a way there."
+                    )
+                return None
+
+        game_map = self.engine.game_map
+        if game_map.get_blocking_entity_at(*self.path[0]):
+            self.stop("The way is blocked.")
+            return None
+
+        x, y = self.path.popleft()
+        self.turns += 1
+        return BumpAction(player, x - player.x, y - player.y)
@@ -0,0 +1,46 @@
+"""Games played by the simulation bot, and summaries of their state to compare."""
+from __future__ import annotations
+
+from typing import Any
+
+from roguelike import colour
+from roguelike.engine import Engine
+from roguelike.exceptions import ImpossibleActionError
+from roguelike.simulate import Bot
+
+
+def play(engine: Engine, turns: int) -> None:
+    """Let the bot play `turns` inputs, recorded like the event handlers do."""
+    bot = Bot(engine)
+    player = engine.player
+    for _ in range(turns):
+        if not player.is_alive:
+            return
+        if player.level.requires_level_up:
+            choice = bot.choose_level_up()
+            engine.action_log.record_level_up(choice)
+            player.level.increase_stat(choice)
+            continue
+
+        action = bot.choose_action()
+        engine.action_log.record(action)
+        try:
+            engine.play_turn(action)
+        except ImpossibleActionError as ex:
+            engine.log(ex.args[0], colour.IMPOSSIBLE)
+
+
+def describe(engine: Engine) -> dict[str, Any]:
+    """Everything about a game that playing it could have changed."""
+    player = engine.player
+    game_map = engine.game_map
+    return {
+        "floor": engine.game_world.current_floor,
+        "rng": engine.rng.getstate(),
+        "player": (player.x, player.y, player.fighter.hp, player.level.current_xp),
+        "inventory": [item.name for item in player.inventory],
+        "entities": [(e.name, e.x, e.y) for e in game_map.entities],
+        "tiles": game_map.tiles.tobytes(),
+        "explored": game_map.explored.tobytes(),
+        "messages": [m.full_text for m in engine.message_log.messages],
+    }
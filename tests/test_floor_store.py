@@ -0,0 +1,109 @@
+import pickle
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from roguelike import procgen
+from roguelike.chunked_map import CHUNK_SIZE, ChunkedGameMap
+from roguelike.game_map import GameMap
+from roguelike.setup_game import new_game
+
+
+def describe_floor(game_map: GameMap) -> dict[str, Any]:
+    player = game_map.engine.player
+    return {
+        "tiles": game_map.tiles.tobytes(),
+        "explored": game_map.explored.tobytes(),
+        "visible": game_map.visible.tobytes(),
+        "stairs": (game_map.downstairs_location, game_map.upstairs_location),
+        "entities": [(e.name, e.x, e.y) for e in game_map.entities if e is not player],
+    }
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_evicted_floor_comes_back_unchanged(tmp_path: Path, on_disk: bool) -> None:
+    engine = new_game(seed=1, floors_directory=tmp_path if on_disk else None)
+    world = engine.game_world
+    floors = world.floors
+    floors.max_loaded = 1
+    first_floor = describe_floor(engine.game_map)
+
+    world.descend()
+    assert list(floors.loaded) == [2]
+    assert 1 in floors
+    assert (1 in floors.on_disk) == on_disk
+    assert (tmp_path / "floor-1.npz").exists() == on_disk
+
+    world.ascend()
+    game_map = engine.game_map
+    assert describe_floor(game_map) == first_floor
+    assert engine.player in game_map.entities
+    assert (engine.player.x, engine.player.y) == game_map.downstairs_location
+    assert all(e.parent is game_map for e in game_map.entities)
+    assert list(floors.loaded) == [1]
+    assert 2 in floors and 1 not in floors.serialized and 1 not in floors.on_disk
+
+
+def test_least_recently_visited_floor_is_evicted() -> None:
+    engine = new_game(seed=2, floors_directory=None)
+    world = engine.game_world
+    world.floors.max_loaded = 2
+
+    world.descend()
+    world.ascend()
+    world.change_floor(3)
+    assert list(world.floors.loaded) == [1, 3]
+    assert list(world.floors.serialized) == [2]
+
+
+def test_pickled_store_carries_its_floors(tmp_path: Path) -> None:
+    engine = new_game(seed=3, floors_directory=tmp_path)
+    world = engine.game_world
+    world.floors.max_loaded = 1
+    first_floor = describe_floor(engine.game_map)
+    world.descend()
+
+    copy = pickle.loads(pickle.dumps(engine))
+    # Files left in the directory by another game must not matter.
+    (tmp_path / "floor-1.npz").write_bytes(b"")
+
+    copy.game_world.ascend()
+    assert describe_floor(copy.game_map) == first_floor
+
+
+def test_chunked_floor_comes_back_with_its_evicted_chunks(tmp_path: Path) -> None:
+    engine = new_game(seed=4, floors_directory=tmp_path)
+    world = engine.game_world
+    world.floors.max_loaded = 1
+    world.generators[2] = procgen.ChunkedGenerator(width=1024, height=1024)
+    world.descend()
+    game_map = engine.game_map
+    assert isinstance(game_map, ChunkedGameMap)
+    player = engine.player
+    start = player.x, player.y
+    player.place(player.x + 10 * CHUNK_SIZE, player.y)
+    game_map.stream_around(player.x, player.y)
+    assert game_map.evicted_on_disk
+
+    def describe_chunks(game_map: ChunkedGameMap) -> dict[str, Any]:
+        return {
+            "loaded": {k: c.tiles.tobytes() for k, c in game_map.chunks.items()},
+            "evicted": game_map.all_evicted(),
+            "entities": [
+                (e.name, e.x, e.y) for e in game_map.entities if e is not player
+            ],
+        }
+
+    before = describe_chunks(game_map)
+    world.ascend()
+    world.descend()
+    game_map = engine.game_map
+    assert isinstance(game_map, ChunkedGameMap)
+    assert describe_chunks(game_map) == before
+
+    # Walking back restores the evicted chunks, with their entities.
+    player.place(*start)
+    game_map.stream_around(*start)
+    assert all(e.parent is game_map for e in game_map.entities)
+    assert game_map.is_walkable(*start)
@@ -0,0 +1,38 @@
+import pytest
+
+from roguelike.replay import ActionLog, Replay
+from roguelike.setup_game import new_game
+from tests.helpers import describe, play
+
+
+@pytest.mark.parametrize("headless", [True, False])
+def test_replay_reaches_the_same_state(headless: bool) -> None:
+    engine = new_game(seed=3, floors_directory=None, headless=headless)
+    play(engine, 400)
+    assert engine.game_world.current_floor > 1
+
+    replay = Replay(engine.action_log, snapshot_interval=50, headless=headless)
+    assert len(replay) == len(engine.action_log)
+    assert describe(replay.run()) == describe(engine)
+
+
+def test_seeking_back_matches_replaying_from_the_start() -> None:
+    engine = new_game(seed=5, floors_directory=None, headless=True)
+    play(engine, 400)
+
+    replay = Replay(engine.action_log, snapshot_interval=50)
+    replay.run()
+    step = len(replay) // 2 + 10
+    seeked = describe(replay.seek(step))
+    assert seeked == describe(Replay(engine.action_log).seek(step))
+    assert describe(replay.seek(len(replay))) == describe(engine)
+
+
+def test_action_log_round_trips_through_bytes() -> None:
+    engine = new_game(seed=5, floors_directory=None, headless=True)
+    play(engine, 100)
+
+    log = ActionLog.from_bytes(engine.action_log.to_bytes())
+    assert log.seed == 5
+    assert len(log) == len(engine.action_log)
+    assert list(log.records()) == list(engine.action_log.records())
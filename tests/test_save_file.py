@@ -0,0 +1,91 @@
+import lzma
+import pickle
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from roguelike.engine import Engine
+from roguelike.floor_store import deserialize_floor
+from roguelike.save_file import RECENT_MESSAGES
+from roguelike.setup_game import load_game, new_game
+from tests.helpers import describe, play
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> Engine:
+    """A game spread over floors loaded and on disk, with more messages than a
+    save's first section holds.
+    """
+    engine = new_game(seed=9, floors_directory=tmp_path / "floors")
+    world = engine.game_world
+    world.floors.max_loaded = 2
+    play(engine, 40)
+    # Larger than the camera, so some of the entities are out of view.
+    world.map_width, world.map_height = 200, 150
+    for _ in range(3):
+        world.descend()
+        play(engine, 10)
+    world.ascend()
+    assert engine.player.is_alive
+    assert world.floors.on_disk
+    assert len(engine.message_log.messages) > RECENT_MESSAGES
+    return engine
+
+
+def describe_game(engine: Engine) -> dict[str, Any]:
+    """The state of the current floor, and the tiles and entities of every floor."""
+    floors = engine.game_world.floors
+    maps = {
+        **{
+            f: deserialize_floor(data, engine)
+            for f, data in floors.all_serialized().items()
+        },
+        **floors.loaded,
+    }
+    return {
+        **describe(engine),
+        "action_log": bytes(engine.action_log.data),
+        "action_log_length": len(engine.action_log),
+        "floors": {
+            floor: (
+                maps[floor].tiles.tobytes(),
+                [(e.name, e.x, e.y) for e in maps[floor].entities],
+            )
+            for floor in sorted(maps)
+        },
+    }
+
+
+def test_lazy_load_matches_full_load(engine: Engine, tmp_path: Path) -> None:
+    engine.save_as(str(tmp_path / "game.sav"))
+    expected = describe(engine)
+
+    full = load_game(str(tmp_path / "game.sav"))
+    lazy = load_game(str(tmp_path / "game.sav"), lazy=True)
+    assert lazy.pending_load is not None
+    assert len(lazy.message_log.messages) == RECENT_MESSAGES
+    assert len(lazy.game_map.entities) < len(engine.game_map.entities)
+
+    lazy.finish_loading()
+    assert lazy.pending_load is None
+    assert describe(full) == expected
+    assert describe(lazy) == expected
+    assert describe_game(lazy) == describe_game(full) == describe_game(engine)
+
+
+def test_lazily_loaded_game_plays_on_the_same(engine: Engine, tmp_path: Path) -> None:
+    engine.save_as(str(tmp_path / "game.sav"))
+    lazy = load_game(str(tmp_path / "game.sav"), lazy=True)
+    lazy.finish_loading()
+
+    play(engine, 50)
+    play(lazy, 50)
+    assert describe(lazy) == describe(engine)
+
+
+def test_save_from_before_sections_still_loads(engine: Engine, tmp_path: Path) -> None:
+    expected = describe_game(engine)
+    assert len(expected["floors"]) == 4
+    (tmp_path / "old.sav").write_bytes(lzma.compress(pickle.dumps(engine)))
+    assert describe_game(load_game(str(tmp_path / "old.sav"))) == expected
@@ -0,0 +1,137 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import pytest
+
+from roguelike.replay import ActionLog, Replay, check_record
+from roguelike.server import GameServer, Session
+from tests.helpers import describe
+
+Request = Callable[[Any], Awaitable[dict[str, Any]]]
+
+
+def serve(
+    directory: Path, test: Callable[[GameServer, Request], Awaitable[None]]
+) -> None:
+    """Run `test` with a server, and a function to send it requests over a socket.
+
+    Requests are sent as JSON, unless they already are bytes.
+    """
+
+    async def run() -> None:
+        server = GameServer(directory, workers=2)
+        listener = await asyncio.start_server(server.handle_client, "localhost", 0)
+        reader, writer = await asyncio.open_connection(
+            *listener.sockets[0].getsockname()[:2]
+        )
+
+        async def request(message: Any) -> dict[str, Any]:
+            line = (
+                message if isinstance(message, bytes) else json.dumps(message).encode()
+            )
+            writer.write(line + b"\n")
+            response: dict[str, Any] = json.loads(await reader.readline())
+            return response
+
+        try:
+            await test(server, request)
+        finally:
+            writer.close()
+            listener.close()
+            await listener.wait_closed()
+            server.pool.shutdown()
+
+    asyncio.run(run())
+
+
+def test_session_plays_like_its_replay(tmp_path: Path) -> None:
+    async def test(server: GameServer, request: Request) -> None:
+        state = await request({"op": "new", "seed": 7})
+        assert state["floor"] == 1 and state["alive"]
+        session = state["session"]
+        for dx, dy in [(1, 0), (0, 1), (-1, 0), (0, -1), (1, 1)] * 4:
+            state = await request(
+                {"op": "act", "session": session, "action": [1, dx, dy]}
+            )
+            assert "error" not in state
+
+        engine = server.sessions[session].engine
+        assert engine is not None
+        assert len(engine.action_log) == 20
+        log = ActionLog.from_bytes(engine.action_log.to_bytes())
+        assert describe(Replay(log, headless=False).run()) == describe(engine)
+
+    serve(tmp_path, test)
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        b"not json",
+        b"[1]",
+        {"op": "new", "seed": "x"},
+        {"op": "dance", "session": 1},
+        {"op": "state", "session": 99},
+        {"op": "act", "session": [1], "action": [0]},
+        {"op": "act", "session": 1, "action": []},
+        {"op": "act", "session": 1, "action": [1, "a", 0]},
+        {"op": "act", "session": 1, "action": [1, 500, 0]},
+        {"op": "act", "session": 1, "action": [1, 5, 5]},
+        {"op": "act", "session": 1, "action": [1, 1]},
+        {"op": "act", "session": 1, "action": [0, 0]},
+        {"op": "act", "session": 1, "action": [3, 9, 0, 0]},
+        {"op": "act", "session": 1, "action": [7, 5]},
+        {"op": "act", "session": 1, "action": [7, 0]},
+        {"op": "act", "session": 1, "action": [99]},
+    ],
+)
+def test_bad_request_is_rejected_without_playing(tmp_path: Path, message: Any) -> None:
+    async def test(server: GameServer, request: Request) -> None:
+        await request({"op": "new", "seed": 1})
+        engine = server.sessions[1].engine
+        assert engine is not None
+        before = describe(engine)
+
+        assert "error" in await request(message)
+        assert describe(engine) == before
+        assert len(engine.action_log) == 0
+        assert "error" not in await request({"op": "state", "session": 1})
+
+    serve(tmp_path, test)
+
+
+def test_check_record_accepts_what_a_log_records() -> None:
+    assert check_record([1, -1, 1]) == (1, -1, 1)
+    assert check_record([3, 2, 10, 20]) == (3, 2, 10, 20)
+    assert check_record([7, 2]) == (7, 2)
+    with pytest.raises(ValueError):
+        check_record([1, 2, 0])
+
+
+def test_evicted_session_is_loaded_back(tmp_path: Path) -> None:
+    async def test(server: GameServer, request: Request) -> None:
+        await request({"op": "new", "seed": 3})
+        await request({"op": "act", "session": 1, "action": [1, 1, 0]})
+        session = server.sessions[1]
+        assert session.engine is not None
+        before = describe(session.engine)
+
+        await server.submit(session, Session.evict)
+        assert session.engine is None
+        assert session.path.exists()
+        stats = await request({"op": "stats"})
+        assert stats["sessions"] == 1 and stats["loaded"] == 0
+
+        state = await request({"op": "state", "session": 1})
+        assert "error" not in state
+        assert session.engine is not None
+        assert describe(session.engine) == before
+        assert not session.path.exists()
+
+        assert (await request({"op": "close", "session": 1}))["closed"]
+        assert "error" in await request({"op": "state", "session": 1})
+        assert not server.sessions
+
+    serve(tmp_path, test)
@@ -0,0 +1,103 @@
+import io
+import socket
+import time
+from typing import Iterator
+
+import numpy as np
+import tcod
+
+from roguelike.actions import BumpAction
+from roguelike.exceptions import ImpossibleActionError
+from roguelike.input_handlers import MainGameEventHandler
+from roguelike.setup_game import new_game
+from roguelike.spectate import (
+    MAX_QUEUED_MESSAGES,
+    Spectator,
+    SpectatorServer,
+    apply_diff,
+    encode_diff,
+    read_diff,
+)
+from roguelike.types import ndarray
+
+
+def screens(seed: int) -> Iterator[tcod.Console]:
+    """The screen of a game where the player walks around, after each turn."""
+    engine = new_game(seed=seed, floors_directory=None)
+    handler = MainGameEventHandler(engine)
+    console = tcod.Console(80, 50, order="F")
+    for dx, dy in [(1, 0), (0, 1), (-1, 0), (0, -1)] * 5:
+        try:
+            engine.play_turn(BumpAction(engine.player, dx, dy))
+        except ImpossibleActionError:
+            pass
+        console.clear()
+        handler.on_render(console)
+        yield console
+
+
+def connect(server: SpectatorServer) -> socket.socket:
+    """Connect a spectator, once it's been accepted."""
+    count = len(server.spectators)
+    connection = socket.create_connection(server.address)
+    deadline = time.monotonic() + 5
+    while len(server.spectators) == count:
+        assert time.monotonic() < deadline, "The spectator was never accepted."
+        time.sleep(0.01)
+    return connection
+
+
+def watch(connection: socket.socket) -> ndarray | None:
+    """The last frame a spectator was sent, once the stream is over."""
+    frame = None
+    with connection, connection.makefile("rb") as stream:
+        while (diff := read_diff(stream)) is not None:
+            frame = apply_diff(frame, diff)
+    return frame
+
+
+def test_diff_turns_the_previous_frame_into_the_next() -> None:
+    consoles = screens(1)
+    previous = next(consoles).rgb.copy()
+    current = next(consoles).rgb
+    changed = previous != current
+    assert changed.any() and not changed.all()
+
+    diff = read_diff(io.BytesIO(encode_diff(current, changed)))
+    assert diff is not None
+    assert len(diff.cells) == np.count_nonzero(changed)
+    assert np.array_equal(apply_diff(previous, diff), current)
+
+
+def test_spectators_see_the_presented_frame() -> None:
+    server = SpectatorServer(port=0)
+    first = connect(server)
+    late = None
+    try:
+        for turn, console in enumerate(screens(2)):
+            if turn == 10:
+                late = connect(server)
+            server.present(console)
+        last = console.rgb.copy()
+    finally:
+        server.close()
+
+    assert late is not None
+    for connection in (first, late):
+        frame = watch(connection)
+        assert frame is not None
+        assert np.array_equal(frame, last)
+
+
+def test_slow_spectator_skips_to_a_whole_frame() -> None:
+    connection, other_end = socket.socketpair()
+    with other_end:
+        spectator = Spectator(connection)
+        spectator.needs_whole_frame = False
+        # Never read, so the spectator's thread is stuck sending this.
+        spectator.send(bytes(10_000_000))
+        for _ in range(MAX_QUEUED_MESSAGES + 1):
+            spectator.send(b"diff")
+
+        assert spectator.needs_whole_frame
+        assert spectator.messages.qsize() < MAX_QUEUED_MESSAGES
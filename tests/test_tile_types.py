@@ -0,0 +1,74 @@
+from typing import Any
+
+import numpy as np
+import pytest
+
+from roguelike import procgen, tile_types
+from roguelike.chunked_map import ChunkedGameMap
+from roguelike.game_map import GameMap
+from roguelike.setup_game import new_game
+
+# Every kind of index that maps are set with: masks, slices, points and arrays.
+INDICES: list[Any] = [
+    (slice(20, 70), slice(30, 34)),
+    (45, 63),
+    (np.array([0, 31, 32, 64, 127]), np.array([127, 32, 31, 64, 0])),
+    np.eye(128, dtype=bool),
+]
+
+
+def test_new_tile_is_looked_up_by_its_id(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(tile_types, "TILES", tile_types.TILES)
+    lava = tile_types.new_tile(
+        walkable=False,
+        transparent=True,
+        dark=(ord("~"), (255, 0, 0), (50, 0, 0)),
+        light=(ord("~"), (255, 255, 0), (150, 0, 0)),
+    )
+    ids = np.array([[tile_types.floor, lava], [tile_types.wall, lava]], np.uint8)
+
+    assert lava == len(tile_types.TILES) - 1
+    assert tile_types.TILES["walkable"][ids].tolist() == [[True, False], [False, False]]
+    assert tile_types.TILES["transparent"][ids].tolist() == [
+        [True, True],
+        [False, True],
+    ]
+    assert tile_types.TILES["light"]["ch"][lava] == ord("~")
+
+
+def test_map_keeps_its_tile_properties_up_to_date() -> None:
+    engine = new_game(seed=1, floors_directory=None, headless=True)
+    game_map = GameMap(engine, 128, 128)
+    assert not game_map.walkable.any()
+
+    for i, index in enumerate(INDICES):
+        game_map.set_tiles(index, [tile_types.floor, tile_types.downstairs][i % 2])
+        assert np.array_equal(
+            game_map.walkable, tile_types.TILES["walkable"][game_map.tiles]
+        )
+        assert np.array_equal(
+            game_map.transparent, tile_types.TILES["transparent"][game_map.tiles]
+        )
+
+
+def test_chunked_map_sets_tiles_like_a_whole_map() -> None:
+    engine = new_game(seed=2, floors_directory=None, headless=True)
+    world = engine.game_world
+    world.generators[2] = procgen.ChunkedGenerator(width=128, height=128)
+    world.descend()
+    engine.update_fov()
+    chunked = engine.game_map
+    assert isinstance(chunked, ChunkedGameMap)
+    assert len(chunked.chunks) == 16, "The whole map should be loaded."
+
+    whole = GameMap(engine, 128, 128)
+    whole.tiles = chunked.get_tiles(0, 0, 128, 128)
+    whole.invalidate_tiles()
+    for index in INDICES:
+        chunked.set_tiles(index, tile_types.wall)
+        whole.set_tiles(index, tile_types.wall)
+        assert np.array_equal(chunked.get_tiles(0, 0, 128, 128), whole.tiles)
+        assert np.array_equal(chunked.get_walkable(0, 0, 128, 128), whole.walkable)
+        assert np.array_equal(
+            chunked.get_transparent(16, 8, 100, 120), whole.transparent[16:100, 8:120]
+        )